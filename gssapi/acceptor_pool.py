@@ -0,0 +1,195 @@
+import concurrent.futures
+import threading
+import time
+
+from six.moves import queue
+
+import gssapi.base as gss
+
+
+_SHUTDOWN = object()
+
+
+class AcceptorPool(object):
+    """
+    A pool of threads accepting security contexts
+
+    This class runs acceptSecContext on a fixed number of worker threads,
+    all sharing a single set of acceptor credentials.  Since
+    acceptSecContext releases the GIL, the workers run in parallel on
+    multiple cores.
+
+    Requests are placed on a bounded queue.  When the queue is full, new
+    requests are rejected immediately (raising :class:`queue.Full`)
+    instead of piling up, so that a burst of logins sheds load instead of
+    driving up latency for everyone.
+    """
+
+    def __init__(self, acceptor_cred=None, workers=4, max_queue=128):
+        """
+        Create and start a new AcceptorPool
+
+        :param acceptor_cred: the credentials shared by all workers
+                              (or None to use the default credentials)
+        :type acceptor_cred: :class:`gssapi.base.Creds`
+        :param int workers: the number of worker threads
+        :param int max_queue: the maximum number of queued requests
+        """
+
+        self.acceptor_cred = acceptor_cred
+        self.max_queue = max_queue
+
+        self._queue = queue.Queue(max_queue)
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self._in_flight = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._total_latency = 0.0
+        self._max_latency = 0.0
+
+        self._workers = []
+        for i in range(workers):
+            worker = threading.Thread(target=self._run,
+                                      name='AcceptorPool-{0}'.format(i))
+            worker.daemon = True
+            worker.start()
+            self._workers.append(worker)
+
+    def submit(self, input_token, context=None, channel_bindings=None):
+        """
+        Queue a token to be accepted
+
+        The parameters behave like those of
+        :func:`gssapi.base.acceptSecContext`.
+
+        :returns: a future for the result of acceptSecContext
+        :rtype: :class:`concurrent.futures.Future`
+        :raises: :class:`queue.Full` if the queue is full
+        """
+
+        future = concurrent.futures.Future()
+        item = (future, input_token, context, channel_bindings, time.time())
+
+        # checked under the lock, so that nothing is queued after close()
+        # has queued the shutdown sentinels
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('Cannot submit to a closed AcceptorPool')
+
+            try:
+                self._queue.put_nowait(item)
+            except queue.Full:
+                self._rejected += 1
+                raise
+
+        return future
+
+    def accept(self, input_token, context=None, channel_bindings=None,
+               timeout=None):
+        """
+        Accept a token, waiting for the result
+
+        Like :meth:`submit`, but waits for and returns the result.
+        """
+
+        future = self.submit(input_token, context=context,
+                             channel_bindings=channel_bindings)
+        return future.result(timeout)
+
+    def stats(self):
+        """
+        Get the current statistics for this pool
+
+        The statistics include the current queue depth, the number of
+        requests currently being processed, the number of completed,
+        failed, and rejected requests, and the average and maximum latency
+        (in seconds, including time spent in the queue) of finished
+        requests.
+
+        :rtype: dict
+        """
+
+        with self._lock:
+            finished = self._completed + self._failed
+            return {
+                'queue_depth': self._queue.qsize(),
+                'in_flight': self._in_flight,
+                'completed': self._completed,
+                'failed': self._failed,
+                'rejected': self._rejected,
+                'average_latency': (self._total_latency / finished
+                                    if finished else 0.0),
+                'max_latency': self._max_latency,
+            }
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _SHUTDOWN:
+                return
+
+            future, input_token, context, channel_bindings, queued_at = item
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            with self._lock:
+                self._in_flight += 1
+
+            error = None
+            try:
+                res = gss.acceptSecContext(input_token,
+                                           acceptor_cred=self.acceptor_cred,
+                                           context=context,
+                                           channel_bindings=channel_bindings)
+            except Exception as e:
+                error = e
+
+            # update the statistics before resolving the future, so that
+            # callers woken by the future see them
+            latency = time.time() - queued_at
+            with self._lock:
+                self._in_flight -= 1
+                if error is not None:
+                    self._failed += 1
+                else:
+                    self._completed += 1
+                self._total_latency += latency
+                self._max_latency = max(self._max_latency, latency)
+
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(res)
+
+    def close(self, wait=True):
+        """
+        Stop the pool
+
+        Requests already in the queue are still processed.
+
+        :param bool wait: whether to wait for the workers to finish
+        """
+
+        with self._lock:
+            if self._closed:
+                return
+
+            self._closed = True
+
+        # the workers take the lock too, so don't hold it while waiting
+        # for room in the queue
+        for worker in self._workers:
+            self._queue.put(_SHUTDOWN)
+
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
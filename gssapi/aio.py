@@ -0,0 +1,208 @@
+"""
+Asynchronous (asyncio) versions of the blocking GSSAPI calls
+
+The functions in this module mirror their counterparts in
+:mod:`gssapi.base`, but return awaitables which run the underlying call
+on a dedicated, size-bounded thread pool, so that keytab/ccache I/O and
+KDC round trips do not stall the event loop.  The GSSAPI calls release
+the GIL, so they run in parallel with the event loop.  As with
+coroutines, the call only starts once the result is awaited.
+
+If the awaiting task is cancelled while its call is still running, the
+call is allowed to finish, and any security context or credentials that
+it produced are then released, instead of being leaked half-built.
+
+Note: this module requires Python 3.7 or newer (it avoids the async and
+await keywords, so that it can still be parsed, and the package
+byte-compiled, by the older versions which the rest of the package
+supports).
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+import threading
+
+import gssapi.base as gss
+
+
+DEFAULT_MAX_WORKERS = 4
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Get the executor used to run blocking GSSAPI calls
+
+    If no executor has been set, a thread pool of DEFAULT_MAX_WORKERS
+    threads is created.
+
+    :rtype: :class:`concurrent.futures.Executor`
+    """
+
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=DEFAULT_MAX_WORKERS)
+        return _executor
+
+
+def set_executor(executor):
+    """
+    Set the executor used to run blocking GSSAPI calls
+
+    This may be used to change the number of threads available for
+    GSSAPI calls.  The previous executor (if any) is shut down once
+    its pending calls have finished.
+
+    :param executor: the new executor
+    :type executor: :class:`concurrent.futures.Executor`
+    """
+
+    global _executor
+    with _executor_lock:
+        old_executor = _executor
+        _executor = executor
+
+    if old_executor is not None:
+        old_executor.shutdown(wait=False)
+
+
+def _release_result(cleanup, future):
+    if future.cancelled() or future.exception() is not None:
+        return
+
+    try:
+        cleanup(future.result())
+    except gss.GSSError:
+        pass  # nothing else can be done at this point
+
+
+def _delete_context(res):
+    gss.deleteSecContext(res[0])
+
+
+def _release_creds(res):
+    gss.releaseCred(res[0])
+
+
+class _BlockingCallIterator(object):
+    # delegates to the iterator of a shielded future, releasing the call's
+    # result if the awaiting task is cancelled -- whether the call is
+    # still running or has finished but not yet been delivered (this
+    # must be a plain iterator, since generators can't return values on
+    # the older Python versions which need to parse this module)
+
+    def __init__(self, call, it):
+        self._call = call
+        self._it = it
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self._it.send(None)
+
+    next = __next__
+
+    def send(self, value):
+        return self._it.send(value)
+
+    def throw(self, *args):
+        exc = args[0]
+        if isinstance(exc, type):
+            cancelled = issubclass(exc, asyncio.CancelledError)
+        else:
+            cancelled = isinstance(exc, asyncio.CancelledError)
+
+        if cancelled and self._call.cleanup is not None:
+            # the call itself can't be interrupted, so clean up after it
+            # instead (this runs soon, if the call is already done)
+            self._call._future.add_done_callback(functools.partial(
+                _release_result, self._call.cleanup))
+
+        return self._it.throw(*args)
+
+    def close(self):
+        self._it.close()
+
+
+class _BlockingCall(object):
+    """
+    An awaitable which runs a blocking call on the executor
+
+    The call is submitted when first awaited; awaiting again waits for
+    the same call.
+    """
+
+    def __init__(self, cleanup, func, *args, **kwargs):
+        self.cleanup = cleanup
+        self.func = functools.partial(func, *args, **kwargs)
+        self._future = None
+
+    def __await__(self):
+        if self._future is None:
+            loop = asyncio.get_running_loop()
+            self._future = loop.run_in_executor(get_executor(), self.func)
+
+        shielded = asyncio.shield(self._future)
+        return _BlockingCallIterator(self, shielded.__await__())
+
+
+def acquireCred(*args, **kwargs):
+    """
+    Asynchronous version of :func:`gssapi.base.acquireCred`
+
+    If cancelled, the acquired credentials are released.
+    """
+
+    return _BlockingCall(_release_creds, gss.acquireCred, *args, **kwargs)
+
+
+def initSecContext(*args, **kwargs):
+    """
+    Asynchronous version of :func:`gssapi.base.initSecContext`
+
+    If cancelled, the resulting security context is deleted (including
+    a context passed in to be updated, since the token needed to continue
+    the exchange is lost).
+    """
+
+    return _BlockingCall(_delete_context, gss.initSecContext,
+                         *args, **kwargs)
+
+
+def acceptSecContext(*args, **kwargs):
+    """
+    Asynchronous version of :func:`gssapi.base.acceptSecContext`
+
+    If cancelled, the resulting security context is deleted (including
+    a context passed in to be updated, since the token needed to continue
+    the exchange is lost).
+    """
+
+    return _BlockingCall(_delete_context, gss.acceptSecContext,
+                         *args, **kwargs)
+
+
+def wrap(*args, **kwargs):
+    """Asynchronous version of :func:`gssapi.base.wrap`"""
+    return _BlockingCall(None, gss.wrap, *args, **kwargs)
+
+
+def unwrap(*args, **kwargs):
+    """Asynchronous version of :func:`gssapi.base.unwrap`"""
+    return _BlockingCall(None, gss.unwrap, *args, **kwargs)
+
+
+def getMIC(*args, **kwargs):
+    """Asynchronous version of :func:`gssapi.base.getMIC`"""
+    return _BlockingCall(None, gss.getMIC, *args, **kwargs)
+
+
+def verifyMIC(*args, **kwargs):
+    """Asynchronous version of :func:`gssapi.base.verifyMIC`"""
+    return _BlockingCall(None, gss.verifyMIC, *args, **kwargs)
@@ -1,3 +1,4 @@
+from gssapi.base.buffers import *  # noqa
 from gssapi.base.creds import *  # noqa
 from gssapi.base.message import *  # noqa
 from gssapi.base.misc import *  # noqa
@@ -10,3 +11,21 @@ try:
     from gssapi.base.s4u import *  # noqa
 except ImportError:
     pass  # no s4u support in the system's GSSAPI library
+
+# optional DCE (IOV) support
+try:
+    from gssapi.base.dce import *  # noqa
+except ImportError:
+    pass  # no DCE support in the system's GSSAPI library
+
+# optional credential import/export support
+try:
+    from gssapi.base.cred_imp_exp import *  # noqa
+except ImportError:
+    pass  # no credential import/export support in the system's GSSAPI library
+
+# optional credential store support
+try:
+    from gssapi.base.cred_store import *  # noqa
+except ImportError:
+    pass  # no credential store support in the system's GSSAPI library
@@ -0,0 +1,9 @@
+from gssapi.base.cython_types cimport gss_buffer_desc
+
+
+cdef class GSSBuffer:
+    cdef gss_buffer_desc raw_buffer
+    cdef Py_ssize_t _exports
+
+
+cdef object c_make_output_buffer(gss_buffer_desc *buff, bint as_buffer)
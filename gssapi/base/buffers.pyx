@@ -0,0 +1,119 @@
+GSSAPI="BASE"  # This ensures that a full module is generated by Cython
+
+from cpython.buffer cimport PyBuffer_FillInfo
+
+from gssapi.base.cython_types cimport *
+
+from gssapi.base.misc import GSSError
+
+
+cdef class GSSBuffer:
+    """
+    A GSSAPI-allocated Buffer
+
+    This class wraps an output buffer allocated by the GSSAPI library,
+    exposing it via the buffer protocol without copying it into a Python
+    bytes object.  The underlying memory is released with gss_release_buffer
+    when the object is deallocated (or when release is called).
+
+    A GSSBuffer may be used anywhere a buffer is accepted, such as with
+    memoryview, bytearray.extend, socket.sendall, or as the input to
+    another gssapi.base call.
+    """
+    # defined in pxd
+    # cdef gss_buffer_desc raw_buffer
+    # cdef Py_ssize_t _exports
+
+    def __cinit__(self):
+        self.raw_buffer = gss_buffer_desc(0, NULL)
+        self._exports = 0
+
+    def __dealloc__(self):
+        cdef OM_uint32 min_stat
+        if self.raw_buffer.value is not NULL:
+            with nogil:
+                gss_release_buffer(&min_stat, &self.raw_buffer)
+            self.raw_buffer.value = NULL
+            self.raw_buffer.length = 0
+
+    def __getbuffer__(self, Py_buffer *view, int flags):
+        PyBuffer_FillInfo(view, self, self.raw_buffer.value,
+                          self.raw_buffer.length, 0, flags)
+        self._exports += 1
+
+    def __releasebuffer__(self, Py_buffer *view):
+        self._exports -= 1
+
+    def __len__(self):
+        return self.raw_buffer.length
+
+    def __bytes__(self):
+        return self.tobytes()
+
+    def tobytes(self):
+        """
+        tobytes() -> bytes
+        Copy the contents of this buffer into a bytes object.
+        """
+
+        if self.raw_buffer.value is NULL:
+            return b''
+
+        return self.raw_buffer.value[:self.raw_buffer.length]
+
+    def release(self):
+        """
+        release()
+        Release the underlying GSSAPI buffer.
+
+        This method releases the underlying buffer immediately, instead of
+        waiting for the object to be deallocated.  The buffer may not be
+        released while a memoryview (or other export) of it is still alive.
+
+        Raises:
+            BufferError: if the buffer is still exported
+            GSSError
+        """
+
+        if self._exports > 0:
+            raise BufferError('Cannot release a GSSBuffer while it '
+                              'is still exported')
+
+        cdef OM_uint32 maj_stat, min_stat
+        if self.raw_buffer.value is not NULL:
+            with nogil:
+                maj_stat = gss_release_buffer(&min_stat, &self.raw_buffer)
+            if maj_stat != GSS_S_COMPLETE:
+                raise GSSError(maj_stat, min_stat)
+
+        self.raw_buffer.value = NULL
+        self.raw_buffer.length = 0
+
+    def __repr__(self):
+        return '<{0} of length {1}>'.format(type(self).__name__,
+                                            self.raw_buffer.length)
+
+
+cdef object c_make_output_buffer(gss_buffer_desc *buff, bint as_buffer):
+    """Convert a GSSAPI output buffer into bytes or a GSSBuffer.
+
+    If as_buffer is False, the contents are copied into a bytes object and
+    the buffer is released.  Otherwise, ownership of the buffer is passed
+    to a new GSSBuffer.  Either way, the input buffer is reset to empty.
+    """
+
+    cdef OM_uint32 min_stat
+    cdef GSSBuffer res
+    if as_buffer:
+        res = GSSBuffer()
+        res.raw_buffer = buff[0]
+        buff.value = NULL
+        buff.length = 0
+        return res
+
+    if buff.value is NULL:
+        return b''
+
+    res_bytes = buff.value[:buff.length]
+    gss_release_buffer(&min_stat, buff)
+    return res_bytes
@@ -0,0 +1,102 @@
+GSSAPI="BASE"  # This ensures that a full module is generated by Cython
+
+from gssapi.base.cython_types cimport *
+from gssapi.base.buffers cimport c_make_output_buffer
+from gssapi.base.cython_converters cimport c_get_input_buffer
+from gssapi.base.cython_converters cimport c_release_input_buffer
+from gssapi.base.creds cimport Creds
+
+from gssapi.base.misc import GSSError
+
+
+cdef extern from "gssapi/gssapi_ext.h":
+    OM_uint32 gss_export_cred(OM_uint32 *min_stat,
+                              gss_cred_id_t cred_handle,
+                              gss_buffer_t token) nogil
+
+    OM_uint32 gss_import_cred(OM_uint32 *min_stat,
+                              gss_buffer_t token,
+                              gss_cred_id_t *cred_handle) nogil
+
+
+def exportCred(Creds creds not None, as_buffer=False):
+    """
+    exportCred(creds, as_buffer=False) -> bytes or GSSBuffer
+    Export GSSAPI credentials.
+
+    This method exports GSSAPI credentials into a token
+    which may be transmitted between different processes
+    (and imported with importCred).  Unlike exporting a
+    security context, the credentials remain usable
+    afterwards.
+
+    Note that the token contains the credentials' secrets
+    (for instance, Kerberos session keys), so it must be
+    transmitted securely.
+
+    Args:
+        creds (Creds): the credentials to export
+        as_buffer (bool): return the token as a GSSBuffer wrapping the
+            GSSAPI-allocated memory instead of copying it into bytes
+
+    Returns:
+        bytes or GSSBuffer: the exported credential token
+
+    Raises:
+        GSSError
+    """
+
+    # GSS_C_EMPTY_BUFFER
+    cdef gss_buffer_desc exported_creds = gss_buffer_desc(0, NULL)
+
+    cdef OM_uint32 maj_stat, min_stat
+
+    with nogil:
+        maj_stat = gss_export_cred(&min_stat, creds.raw_creds,
+                                   &exported_creds)
+
+    if maj_stat == GSS_S_COMPLETE:
+        return c_make_output_buffer(&exported_creds, as_buffer)
+    else:
+        raise GSSError(maj_stat, min_stat)
+
+
+def importCred(token not None):
+    """
+    importCred(token) -> Creds
+    Import GSSAPI credentials from a token.
+
+    This method imports a credentials object from a token
+    previously exported by exportCred.
+
+    Args:
+        token (buffer): the token to import (any contiguous buffer,
+            such as bytes, bytearray, or memoryview)
+
+    Returns:
+        Creds: the imported credentials
+
+    Raises:
+        GSSError
+    """
+
+    cdef Py_buffer token_view
+    cdef gss_buffer_desc token_buffer
+    c_get_input_buffer(token, &token_view, &token_buffer)
+
+    cdef gss_cred_id_t creds
+
+    cdef OM_uint32 maj_stat, min_stat
+
+    with nogil:
+        maj_stat = gss_import_cred(&min_stat, &token_buffer, &creds)
+
+    c_release_input_buffer(&token_view)
+
+    cdef Creds res
+    if maj_stat == GSS_S_COMPLETE:
+        res = Creds()
+        res.raw_creds = creds
+        return res
+    else:
+        raise GSSError(maj_stat, min_stat)
@@ -0,0 +1,155 @@
+GSSAPI="BASE"  # This ensures that a full module is generated by Cython
+
+from libc.stdlib cimport calloc, free
+
+from gssapi.base.cython_types cimport *
+from gssapi.base.cython_converters cimport _OIDSet, c_get_mech_oid_set
+from gssapi.base.cython_converters cimport c_create_mech_list
+from gssapi.base.cython_converters cimport c_py_ttl_to_c, c_c_ttl_to_py
+from gssapi.base.creds cimport Creds
+from gssapi.base.names cimport Name
+
+from gssapi.base.misc import GSSError
+
+
+cdef extern from "gssapi/gssapi_ext.h":
+    ctypedef struct gss_key_value_element_desc:
+        const char *key
+        const char *value
+
+    ctypedef struct gss_key_value_set_desc:
+        OM_uint32 count
+        gss_key_value_element_desc *elements
+
+    OM_uint32 gss_acquire_cred_from(OM_uint32 *min_stat,
+                                    const gss_name_t name,
+                                    OM_uint32 ttl,
+                                    const gss_OID_set mechs,
+                                    gss_cred_usage_t cred_usage,
+                                    const gss_key_value_set_desc *cred_store,
+                                    gss_cred_id_t *creds,
+                                    gss_OID_set *actual_mechs,
+                                    OM_uint32 *actual_ttl) nogil
+
+
+cdef object c_store_item_to_bytes(object item):
+    if isinstance(item, unicode):
+        return item.encode('utf-8')
+    elif isinstance(item, bytes):
+        return item
+    else:
+        raise TypeError('Credential store keys and values must be '
+                        'strings or bytes, not {0}'.format(
+                            type(item).__name__))
+
+
+def acquireCredFrom(store, Name name, ttl=None, mechs=None,
+                    cred_usage='both'):
+    """
+    acquireCredFrom(store, name, ttl=None, mechs=None,
+                    cred_usage='both') -> (Creds, [MechType], int)
+    Get GSSAPI credentials from the given credential store.
+
+    This method works like acquireCred, except that the credentials
+    are acquired from the given credential store instead of from the
+    default keytab and credentials cache for the process.  This allows
+    different threads to use different keytabs or credentials caches
+    (such as MEMORY: caches) without modifying the environment.
+
+    The valid store keys depend on the mechanism.  For Kerberos, these
+    are 'ccache', 'client_keytab', 'keytab', and 'rcache' (the latter
+    requiring a newer version of MIT Kerberos).
+
+    Args:
+        store (dict): the credential store, as a dict mapping keys to
+            values (both str or bytes), or None for the default store
+        name (Name): the name for which to acquire the credentials (or None
+            for the "no name" functionality)
+        ttl (int): the lifetime for the credentials (or None for indefinite)
+        mechs ([MechType]): the desired mechanisms for which the credentials
+            should work, or None for the default set
+        cred_usage (str): the usage type for the credentials: may be
+            'initiate', 'accept', or 'both'
+
+    Returns:
+        (Creds, [MechType], int): the resulting credentials, the actual
+            mechanisms with which they may be used, and their actual
+            lifetime (or None for indefinite or not supported)
+
+    Raises:
+        GSSError
+        TypeError: a store key or value is not a string
+    """
+
+    # the encoded keys and values, which must outlive the call
+    cdef list items = []
+    if store is not None:
+        for key, value in store.items():
+            items.append((c_store_item_to_bytes(key),
+                          c_store_item_to_bytes(value)))
+
+    cdef _OIDSet mech_set
+    cdef gss_OID_set desired_mechs
+    if mechs is not None:
+        mech_set = c_get_mech_oid_set(mechs)
+        desired_mechs = mech_set.oid_set
+    else:
+        desired_mechs = GSS_C_NO_OID_SET
+
+    cdef OM_uint32 input_ttl = c_py_ttl_to_c(ttl)
+    cdef gss_cred_usage_t usage
+
+    cdef gss_name_t c_name
+    if name is None:
+        c_name = GSS_C_NO_NAME
+    else:
+        c_name = name.raw_name
+
+    if cred_usage == 'initiate':
+        usage = GSS_C_INITIATE
+    elif cred_usage == 'accept':
+        usage = GSS_C_ACCEPT
+    else:
+        usage = GSS_C_BOTH
+
+    cdef gss_key_value_set_desc c_store
+    cdef gss_key_value_set_desc *c_store_ptr = NULL
+    cdef size_t i
+    cdef bytes key_bytes, value_bytes
+    # allocated last, since nothing may raise between here and the free
+    if store is not None:
+        c_store.count = len(items)
+        # calloc(0, ...) may return NULL, so always allocate at least one slot
+        c_store.elements = <gss_key_value_element_desc*>calloc(
+            max(len(items), 1), sizeof(gss_key_value_element_desc))
+        if c_store.elements is NULL:
+            raise MemoryError()
+
+        for i in range(len(items)):
+            key_bytes, value_bytes = items[i]
+            c_store.elements[i].key = key_bytes
+            c_store.elements[i].value = value_bytes
+
+        c_store_ptr = &c_store
+
+    cdef gss_cred_id_t creds
+    cdef gss_OID_set actual_mechs
+    cdef OM_uint32 actual_ttl
+
+    cdef OM_uint32 maj_stat, min_stat
+
+    with nogil:
+        maj_stat = gss_acquire_cred_from(&min_stat, c_name, input_ttl,
+                                         desired_mechs, usage, c_store_ptr,
+                                         &creds, &actual_mechs, &actual_ttl)
+
+    if c_store_ptr is not NULL:
+        free(c_store.elements)
+
+    cdef Creds rc = Creds()
+    if maj_stat == GSS_S_COMPLETE:
+        rc.raw_creds = creds
+        return (rc, c_create_mech_list(actual_mechs),
+                c_c_ttl_to_py(actual_ttl))
+    else:
+        raise GSSError(maj_stat, min_stat)
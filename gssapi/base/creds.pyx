@@ -1,7 +1,8 @@
 GSSAPI="BASE"  # This ensures that a full module is generated by Cython
 
 from gssapi.base.cython_types cimport *
-from gssapi.base.cython_converters cimport c_get_mech_oid_set
+from gssapi.base.cython_converters cimport _OIDSet, c_get_mech_oid_set
+from gssapi.base.cython_converters cimport c_get_mech_oid
 from gssapi.base.cython_converters cimport c_create_mech_list
 from gssapi.base.cython_converters cimport c_py_ttl_to_c, c_c_ttl_to_py
 from gssapi.base.names cimport Name
@@ -70,23 +71,42 @@ cdef class Creds:
         # methods
         cdef OM_uint32 maj_stat, min_stat
         if self.raw_creds is not NULL and self._free_on_dealloc:
-            maj_stat = gss_release_cred(&min_stat, &self.raw_creds)
+            with nogil:
+                maj_stat = gss_release_cred(&min_stat, &self.raw_creds)
             if maj_stat != GSS_S_COMPLETE:
                 raise GSSError(maj_stat, min_stat)
             self.raw_creds = NULL
 
+    def __reduce__(self):
+        # the credentials remain usable here after being exported
+        if self.raw_creds is NULL:
+            raise TypeError('Cannot pickle empty Creds')
 
-def acquireCred(Name name, ttl=None, mechs=None, cred_usage='both'):
+        try:
+            from gssapi.base.cred_imp_exp import exportCred, importCred
+        except ImportError:
+            raise TypeError('Pickling credentials requires credential '
+                            'import/export support in the system\'s '
+                            'GSSAPI library')
+
+        return (importCred, (exportCred(self),))
+
+
+def acquireCred(Name name, ttl=None, mechs=None, cred_usage='both',
+                store=None):
     """
-    acquireCred(name, ttl=None, mechs=None, cred_usage='both') -> (Creds,
-                                                                   [MechType],
-                                                                int)
+    acquireCred(name, ttl=None, mechs=None, cred_usage='both',
+                store=None) -> (Creds, [MechType], int)
     Get GSSAPI credentials for the given name and mechanisms.
 
     This method gets GSSAPI credentials corresponding to the given name
     and mechanims.  The desired TTL and usage for the the credential may also
     be specified.
 
+    If a credential store is given, the credentials are acquired from
+    it instead of from the process's default keytab and credentials cache
+    (see acquireCredFrom).
+
     Args:
         name (Name): the name for which to acquire the credentials (or None
             for the "no name" functionality)
@@ -95,6 +115,8 @@ def acquireCred(Name name, ttl=None, mechs=None, cred_usage='both'):
             should work, or None for the default set
         cred_usage (str): the usage type for the credentials: may be
             'initiate', 'accept', or 'both'
+        store (dict): the credential store to use (e.g. {'keytab': ...,
+            'ccache': 'MEMORY:...'}), or None for the default store
 
     Returns:
         (Creds, [MechType], int): the resulting credentials, the actual
@@ -103,11 +125,24 @@ def acquireCred(Name name, ttl=None, mechs=None, cred_usage='both'):
 
     Raises:
         GSSError
+        NotImplementedError: a store was given, but the system's GSSAPI
+            library does not support credential stores
     """
 
+    if store is not None:
+        try:
+            from gssapi.base.cred_store import acquireCredFrom
+        except ImportError:
+            raise NotImplementedError('No credential store support found '
+                                      'in the native GSSAPI library')
+
+        return acquireCredFrom(store, name, ttl, mechs, cred_usage)
+
+    cdef _OIDSet mech_set
     cdef gss_OID_set desired_mechs
     if mechs is not None:
-        desired_mechs = c_get_mech_oid_set(mechs)
+        mech_set = c_get_mech_oid_set(mechs)
+        desired_mechs = mech_set.oid_set
     else:
         desired_mechs = GSS_C_NO_OID_SET
 
@@ -138,10 +173,6 @@ def acquireCred(Name name, ttl=None, mechs=None, cred_usage='both'):
                                     desired_mechs, usage, &creds,
                                     &actual_mechs, &actual_ttl)
 
-    cdef OM_uint32 tmp_min_stat
-    if mechs is not None:
-        gss_release_oid_set(&tmp_min_stat, &desired_mechs)
-
     cdef Creds rc = Creds()
     if maj_stat == GSS_S_COMPLETE:
         rc.raw_creds = creds
@@ -166,7 +197,173 @@ def releaseCred(Creds creds not None):
     """
 
     cdef OM_uint32 maj_stat, min_stat
-    maj_stat = gss_release_cred(&min_stat, &creds.raw_creds)
+    with nogil:
+        maj_stat = gss_release_cred(&min_stat, &creds.raw_creds)
     if maj_stat != GSS_S_COMPLETE:
         raise GSSError(maj_stat, min_stat)
     creds.raw_creds = NULL
+
+
+cdef object c_create_cred_usage(gss_cred_usage_t usage):
+    if usage == GSS_C_INITIATE:
+        return 'initiate'
+    elif usage == GSS_C_ACCEPT:
+        return 'accept'
+    else:
+        return 'both'
+
+
+def inquireCred(Creds creds not None, name=True, ttl=True, cred_usage=True,
+                mechs=True):
+    """
+    inquireCred(creds, name=True, ttl=True, cred_usage=True,
+                mechs=True) -> (Name, int, str, [MechType])
+    Inspect GSSAPI credentials for information.
+
+    This method inspects a set of GSSAPI credentials for information
+    about their name, remaining lifetime, usage, and mechanisms.  Only
+    the requested pieces of information are retrieved.
+
+    Args:
+        creds (Creds): the credentials to inspect
+        name (bool): get the name associated with the credentials
+        ttl (bool): get the remaining lifetime of the credentials
+        cred_usage (bool): get the usage of the credentials
+        mechs (bool): get the mechanisms with which the credentials may
+            be used
+
+    Returns:
+        (Name, int, str, [MechType]): the name, the remaining lifetime
+            (or None for indefinite or not supported), the usage
+            ('initiate', 'accept', or 'both'), and the mechanisms of the
+            credentials (each is None when not requested)
+
+    Raises:
+        GSSError
+    """
+
+    cdef gss_name_t res_name
+    cdef gss_name_t *res_name_ptr = NULL
+    if name:
+        res_name_ptr = &res_name
+
+    cdef OM_uint32 res_ttl
+    cdef OM_uint32 *res_ttl_ptr = NULL
+    if ttl:
+        res_ttl_ptr = &res_ttl
+
+    cdef gss_cred_usage_t res_usage
+    cdef gss_cred_usage_t *res_usage_ptr = NULL
+    if cred_usage:
+        res_usage_ptr = &res_usage
+
+    cdef gss_OID_set res_mechs
+    cdef gss_OID_set *res_mechs_ptr = NULL
+    if mechs:
+        res_mechs_ptr = &res_mechs
+
+    cdef OM_uint32 maj_stat, min_stat
+
+    with nogil:
+        maj_stat = gss_inquire_cred(&min_stat, creds.raw_creds, res_name_ptr,
+                                    res_ttl_ptr, res_usage_ptr, res_mechs_ptr)
+
+    cdef Name rn
+    if maj_stat == GSS_S_COMPLETE:
+        if name:
+            rn = Name()
+            rn.raw_name = res_name
+        else:
+            rn = None
+
+        py_ttl = c_c_ttl_to_py(res_ttl) if ttl else None
+        py_usage = c_create_cred_usage(res_usage) if cred_usage else None
+        py_mechs = c_create_mech_list(res_mechs) if mechs else None
+
+        return (rn, py_ttl, py_usage, py_mechs)
+    else:
+        raise GSSError(maj_stat, min_stat)
+
+
+def inquireCredByMech(Creds creds not None, mech_type, name=True,
+                      initiator_ttl=True, acceptor_ttl=True,
+                      cred_usage=True):
+    """
+    inquireCredByMech(creds, mech_type, name=True, initiator_ttl=True,
+                      acceptor_ttl=True, cred_usage=True) -> (Name, int,
+                                                              int, str)
+    Inspect GSSAPI credentials for information about a specific mechanism.
+
+    This method inspects a set of GSSAPI credentials for information
+    about their name, remaining lifetimes, and usage for a particular
+    mechanism.  Only the requested pieces of information are retrieved.
+
+    Args:
+        creds (Creds): the credentials to inspect
+        mech_type (MechType): the desired mechanism
+        name (bool): get the name associated with the credentials
+        initiator_ttl (bool): get the remaining initiator lifetime of the
+            credentials
+        acceptor_ttl (bool): get the remaining acceptor lifetime of the
+            credentials
+        cred_usage (bool): get the usage of the credentials
+
+    Returns:
+        (Name, int, int, str): the name, the remaining initiator and
+            acceptor lifetimes (or None for indefinite or not supported),
+            and the usage ('initiate', 'accept', or 'both') of the
+            credentials (each is None when not requested)
+
+    Raises:
+        GSSError
+    """
+
+    cdef gss_OID_desc desired_mech_desc
+    cdef gss_OID desired_mech = c_get_mech_oid(mech_type, &desired_mech_desc)
+
+    cdef gss_name_t res_name
+    cdef gss_name_t *res_name_ptr = NULL
+    if name:
+        res_name_ptr = &res_name
+
+    cdef OM_uint32 res_initiator_ttl
+    cdef OM_uint32 *res_initiator_ttl_ptr = NULL
+    if initiator_ttl:
+        res_initiator_ttl_ptr = &res_initiator_ttl
+
+    cdef OM_uint32 res_acceptor_ttl
+    cdef OM_uint32 *res_acceptor_ttl_ptr = NULL
+    if acceptor_ttl:
+        res_acceptor_ttl_ptr = &res_acceptor_ttl
+
+    cdef gss_cred_usage_t res_usage
+    cdef gss_cred_usage_t *res_usage_ptr = NULL
+    if cred_usage:
+        res_usage_ptr = &res_usage
+
+    cdef OM_uint32 maj_stat, min_stat
+
+    with nogil:
+        maj_stat = gss_inquire_cred_by_mech(&min_stat, creds.raw_creds,
+                                            desired_mech, res_name_ptr,
+                                            res_initiator_ttl_ptr,
+                                            res_acceptor_ttl_ptr,
+                                            res_usage_ptr)
+
+    cdef Name rn
+    if maj_stat == GSS_S_COMPLETE:
+        if name:
+            rn = Name()
+            rn.raw_name = res_name
+        else:
+            rn = None
+
+        py_initiator_ttl = (c_c_ttl_to_py(res_initiator_ttl)
+                            if initiator_ttl else None)
+        py_acceptor_ttl = (c_c_ttl_to_py(res_acceptor_ttl)
+                           if acceptor_ttl else None)
+        py_usage = c_create_cred_usage(res_usage) if cred_usage else None
+
+        return (rn, py_initiator_ttl, py_acceptor_ttl, py_usage)
+    else:
+        raise GSSError(maj_stat, min_stat)
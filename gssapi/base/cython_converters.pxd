@@ -1,15 +1,23 @@
 from gssapi.base.cython_types cimport gss_OID, gss_OID_set, gss_OID_desc
-from gssapi.base.cython_types cimport OM_uint32
+from gssapi.base.cython_types cimport OM_uint32, gss_buffer_desc
 
 from gssapi.base.types import MechType, NameType
 
 
-cdef gss_OID_set c_get_mech_oid_set(object mechs)
-cdef gss_OID c_get_name_type_oid(object name_type)
+cdef class _OIDSet:
+    cdef gss_OID_set oid_set
+
+
+cdef _OIDSet c_get_mech_oid_set(object mechs)
+cdef gss_OID c_get_name_type_oid(object name_type, gss_OID_desc *tmp)
 cdef object c_create_name_type(gss_OID name_type)
-cdef gss_OID c_get_mech_oid(object mech_type)
+cdef gss_OID c_get_mech_oid(object mech_type, gss_OID_desc *tmp)
+cdef object c_register_oid(object value, bytes elements, bint is_mech)
 cdef inline bint c_compare_oids(gss_OID a, gss_OID b)
 cdef object c_create_mech_type(gss_OID_desc mech_type)
 cdef object c_create_mech_list(gss_OID_set mech_set, bint free=*)
 cdef inline OM_uint32 c_py_ttl_to_c(object ttl)
 cdef inline object c_c_ttl_to_py(OM_uint32 ttl)
+cdef int c_get_input_buffer(object obj, Py_buffer *view,
+                            gss_buffer_desc *buff) except -1
+cdef void c_release_input_buffer(Py_buffer *view)
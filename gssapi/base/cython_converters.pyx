@@ -1,74 +1,193 @@
 from libc.string cimport memcmp
+from cpython.buffer cimport PyObject_GetBuffer, PyBuffer_Release, PyBUF_SIMPLE
 
 from gssapi.base.cython_types cimport *
 
 from gssapi.base.types import MechType, NameType
 
 
-cdef gss_OID_set c_get_mech_oid_set(object mechs):
-    """Convert a list of MechType values into an OID set."""
+# OIDs are looked up in hash tables keyed on their DER-encoded elements
+# (for C -> Python) or on their Python values (for Python -> C).  The
+# built-in mechanisms and name types are registered below, and others may
+# be added at runtime with c_register_oid.
 
-    cdef gss_OID_set res_set
-    cdef OM_uint32 min_stat
-    gss_create_empty_oid_set(&min_stat, &res_set)
-
-    if MechType.kerberos in mechs:
-        gss_add_oid_set_member(&min_stat, gss_mech_krb5, &res_set)
-
-    return res_set
-
-
-cdef gss_OID c_get_name_type_oid(object name_type):
-    """Get a GSS name type OID from a NameType."""
-
-    if name_type is NameType.hostbased_service:
-        return GSS_C_NT_HOSTBASED_SERVICE
-    elif name_type is NameType.principal:
-        return GSS_KRB5_NT_PRINCIPAL_NAME
-    elif name_type is NameType.user:
-        return GSS_C_NT_USER_NAME
-    elif name_type is NameType.anonymous:
-        return GSS_C_NT_ANONYMOUS
-    elif name_type is NameType.machine_uid:
-        return GSS_C_NT_MACHINE_UID_NAME
-    elif name_type is NameType.string_uid:
-        return GSS_C_NT_STRING_UID_NAME
-    elif name_type is NameType.export:
-        return GSS_C_NT_EXPORT_NAME
+
+cdef class _OID:
+    """An OID which stays valid for as long as this object is alive."""
+
+    cdef gss_OID oid
+    cdef gss_OID_desc desc
+    cdef bytes elements
+
+
+cdef _OID _oid_from_ptr(gss_OID oid):
+    cdef _OID res = _OID()
+    res.oid = oid
+    res.elements = (<char*>oid.elements)[:oid.length]
+    return res
+
+
+cdef _OID _oid_from_bytes(bytes elements):
+    cdef _OID res = _OID()
+    res.elements = elements
+    res.desc.length = len(elements)
+    res.desc.elements = <char*>res.elements
+    res.oid = &res.desc
+    return res
+
+
+cdef class _OIDSet:
+    """An OID set which is released when this object is deallocated."""
+
+    def __cinit__(self):
+        self.oid_set = GSS_C_NO_OID_SET
+
+    def __dealloc__(self):
+        cdef OM_uint32 min_stat
+        if self.oid_set is not GSS_C_NO_OID_SET:
+            gss_release_oid_set(&min_stat, &self.oid_set)
+
+
+_mechs_by_value = {}
+_mechs_by_oid = {}
+_name_types_by_value = {}
+_name_types_by_oid = {}
+
+# precomputed sets of registered mechanisms, keyed by frozensets of
+# mechanism values
+_mech_sets = {}
+
+
+cdef _register(by_value, by_oid, object value, _OID oid):
+    existing = by_value.get(value)
+    if existing is not None and (<_OID>existing).elements != oid.elements:
+        raise ValueError('{0!r} is already registered with a different '
+                         'OID'.format(value))
+
+    if oid.elements in by_oid and by_oid[oid.elements] != value:
+        raise ValueError('The OID for {0!r} is already registered as '
+                         '{1!r}'.format(value, by_oid[oid.elements]))
+
+    by_value[value] = oid
+    by_oid[oid.elements] = value
+
+
+cdef object c_register_oid(object value, bytes elements, bint is_mech):
+    """Register a mechanism or name type with the given OID elements."""
+
+    if is_mech:
+        _register(_mechs_by_value, _mechs_by_oid, value,
+                  _oid_from_bytes(elements))
     else:
+        _register(_name_types_by_value, _name_types_by_oid, value,
+                  _oid_from_bytes(elements))
+
+
+_register(_mechs_by_value, _mechs_by_oid, MechType.kerberos,
+          _oid_from_ptr(gss_mech_krb5))
+# 1.3.6.1.5.5.2
+_register(_mechs_by_value, _mechs_by_oid, MechType.spnego,
+          _oid_from_bytes(b'\x2b\x06\x01\x05\x05\x02'))
+# 1.3.6.1.5.2.5
+_register(_mechs_by_value, _mechs_by_oid, MechType.iakerb,
+          _oid_from_bytes(b'\x2b\x06\x01\x05\x02\x05'))
+
+_register(_name_types_by_value, _name_types_by_oid,
+          NameType.hostbased_service,
+          _oid_from_ptr(GSS_C_NT_HOSTBASED_SERVICE))
+_register(_name_types_by_value, _name_types_by_oid, NameType.principal,
+          _oid_from_ptr(GSS_KRB5_NT_PRINCIPAL_NAME))
+_register(_name_types_by_value, _name_types_by_oid, NameType.user,
+          _oid_from_ptr(GSS_C_NT_USER_NAME))
+_register(_name_types_by_value, _name_types_by_oid, NameType.anonymous,
+          _oid_from_ptr(GSS_C_NT_ANONYMOUS))
+_register(_name_types_by_value, _name_types_by_oid, NameType.machine_uid,
+          _oid_from_ptr(GSS_C_NT_MACHINE_UID_NAME))
+_register(_name_types_by_value, _name_types_by_oid, NameType.string_uid,
+          _oid_from_ptr(GSS_C_NT_STRING_UID_NAME))
+_register(_name_types_by_value, _name_types_by_oid, NameType.export,
+          _oid_from_ptr(GSS_C_NT_EXPORT_NAME))
+
+
+cdef gss_OID _lookup_oid(by_value, object value, gss_OID_desc *tmp):
+    cdef _OID res = by_value.get(value)
+    if res is not None:
+        return res.oid
+
+    if not isinstance(value, bytes):
         # TODO(sross): raise exception?
         return GSS_C_NO_OID
 
+    # unregistered OIDs are represented by their raw elements -- these
+    # aren't cached (so that arbitrary values can't grow the tables), so
+    # point the caller's descriptor at the value itself instead
+    tmp.length = len(value)
+    tmp.elements = <char*><bytes>value
+    return tmp
+
+
+cdef object _lookup_value(by_oid, gss_OID oid):
+    elements = (<char*>oid.elements)[:oid.length]
+    return by_oid.get(elements, elements)
+
+
+cdef _OIDSet c_get_mech_oid_set(object mechs):
+    """Convert a list of MechType values into an OID set.
+
+    The OID set is valid for as long as the returned object is alive.
+    Sets containing only registered mechanisms are shared, so the OID set
+    must not be released or modified.
+    """
+
+    key = frozenset(mechs)
+    cdef _OIDSet res = _mech_sets.get(key)
+    if res is not None:
+        return res
+
+    cdef OM_uint32 min_stat
+    cdef gss_OID mech_oid
+    cdef gss_OID_desc mech_oid_desc
+    cdef bint registered = True
+    res = _OIDSet()
+    gss_create_empty_oid_set(&min_stat, &res.oid_set)
+    for mech in key:
+        mech_oid = c_get_mech_oid(mech, &mech_oid_desc)
+        if mech_oid is GSS_C_NO_OID:
+            raise ValueError('Unknown mechanism {0!r}'.format(mech))
+        gss_add_oid_set_member(&min_stat, mech_oid, &res.oid_set)
+        registered = registered and mech_oid != &mech_oid_desc
+
+    if not registered:
+        # don't cache sets of unregistered OIDs, which could be anything
+        return res
+
+    # if another thread got here first, use its set instead
+    return _mech_sets.setdefault(key, res)
+
+
+cdef gss_OID c_get_name_type_oid(object name_type, gss_OID_desc *tmp):
+    """Get a GSS name type OID from a NameType.
+
+    Unregistered name types are described in tmp, so the returned OID is
+    only valid for as long as both tmp and name_type are.
+    """
+    return _lookup_oid(_name_types_by_value, name_type, tmp)
+
 
 cdef object c_create_name_type(gss_OID name_type):
     """Convert a GSSAPI name type OID into a NameType."""
-
-    if c_compare_oids(name_type, GSS_C_NT_HOSTBASED_SERVICE):
-        return NameType.hostbased_service
-    elif c_compare_oids(name_type, GSS_KRB5_NT_PRINCIPAL_NAME):
-        return NameType.principal
-    elif c_compare_oids(name_type, GSS_C_NT_USER_NAME):
-        return NameType.user
-    elif c_compare_oids(name_type, GSS_C_NT_ANONYMOUS):
-        return NameType.anonymous
-    elif c_compare_oids(name_type, GSS_C_NT_MACHINE_UID_NAME):
-        return NameType.machine_uid
-    elif c_compare_oids(name_type, GSS_C_NT_STRING_UID_NAME):
-        return NameType.string_uid
-    elif c_compare_oids(name_type, GSS_C_NT_EXPORT_NAME):
-        return NameType.export
-    else:
+    if name_type is GSS_C_NO_OID:
         return None
+    return _lookup_value(_name_types_by_oid, name_type)
 
 
-cdef gss_OID c_get_mech_oid(object mech_type):
-    """Get a mechanism's OID from a MechType."""
+cdef gss_OID c_get_mech_oid(object mech_type, gss_OID_desc *tmp):
+    """Get a mechanism's OID from a MechType.
 
-    if mech_type is MechType.kerberos:
-        return gss_mech_krb5
-    else:
-        # TODO(sross): raise exception?
-        return GSS_C_NO_OID
+    Unregistered mechanisms are described in tmp, so the returned OID is
+    only valid for as long as both tmp and mech_type are.
+    """
+    return _lookup_oid(_mechs_by_value, mech_type, tmp)
 
 cdef inline bint c_compare_oids(gss_OID a, gss_OID b):
     """Compare two OIDs to see if they are the same."""
@@ -78,11 +197,7 @@ cdef inline bint c_compare_oids(gss_OID a, gss_OID b):
 
 cdef object c_create_mech_type(gss_OID_desc mech_type):
     """Convert a GSS mechanism OID into a MechType."""
-
-    if c_compare_oids(&mech_type, gss_mech_krb5):
-        return MechType.kerberos
-    else:
-        return None
+    return _lookup_value(_mechs_by_oid, &mech_type)
 
 cdef object c_create_mech_list(gss_OID_set mech_set, bint free=True):
     """Convert a set of GSS mechanism OIDs to a list of MechType values."""
@@ -90,9 +205,7 @@ cdef object c_create_mech_list(gss_OID_set mech_set, bint free=True):
     l = []
     cdef i
     for i in range(mech_set.count):
-        mech_type = c_create_mech_type(mech_set.elements[i])
-        if mech_type is not None:
-            l.append(mech_type)
+        l.append(c_create_mech_type(mech_set.elements[i]))
 
     cdef OM_uint32 tmp_min_stat
     if free:
@@ -115,3 +228,23 @@ cdef inline object c_c_ttl_to_py(OM_uint32 ttl):
         return None
     else:
         return ttl
+
+
+cdef int c_get_input_buffer(object obj, Py_buffer *view,
+                            gss_buffer_desc *buff) except -1:
+    """Pin a contiguous buffer-protocol object as a GSSAPI input buffer.
+
+    The buffer is not copied -- the returned gss_buffer_desc points directly
+    at the memory of the input object, which remains pinned (e.g. a bytearray
+    may not be resized) until c_release_input_buffer is called on the view.
+    """
+
+    PyObject_GetBuffer(obj, view, PyBUF_SIMPLE)
+    buff.length = view.len
+    buff.value = <char*>view.buf
+    return 0
+
+
+cdef void c_release_input_buffer(Py_buffer *view):
+    """Release a buffer pinned with c_get_input_buffer."""
+    PyBuffer_Release(view)
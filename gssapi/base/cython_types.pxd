@@ -46,18 +46,19 @@ cdef extern from "gssapi.h":
     ctypedef gss_channel_bindings_struct* gss_channel_bindings_t
 
     # util methods
-    OM_uint32 gss_release_buffer(OM_uint32 *min_stat, gss_buffer_t buff)
+    OM_uint32 gss_release_buffer(OM_uint32 *min_stat,
+                                 gss_buffer_t buff) nogil
     OM_uint32 gss_create_empty_oid_set(OM_uint32 *min_stat,
-                                       gss_OID_set *target_set)
+                                       gss_OID_set *target_set) nogil
     OM_uint32 gss_release_oid_set(OM_uint32 *min_stat,
-                                  gss_OID_set *target_set)
+                                  gss_OID_set *target_set) nogil
     OM_uint32 gss_add_oid_set_member(OM_uint32 *min_stat,
                                      const gss_OID member,
-                                     gss_OID_set *target_set)
+                                     gss_OID_set *target_set) nogil
     OM_uint32 gss_test_oid_set_member(OM_uint32 *min_stat,
                                       const gss_OID member,
                                       const gss_OID_set target_set,
-                                      int *present)
+                                      int *present) nogil
 
     # misc int constants
     # status code types
@@ -67,6 +68,13 @@ cdef extern from "gssapi.h":
     OM_uint32 GSS_S_COMPLETE
     OM_uint32 GSS_S_CONTINUE_NEEDED
     OM_uint32 GSS_S_DUPLICATE_TOKEN
+    OM_uint32 GSS_S_OLD_TOKEN
+    OM_uint32 GSS_S_UNSEQ_TOKEN
+    OM_uint32 GSS_S_GAP_TOKEN
+
+    # status code macros
+    OM_uint32 GSS_ERROR(OM_uint32 status) nogil
+    OM_uint32 GSS_SUPPLEMENTARY_INFO(OM_uint32 status) nogil
 
     # cred_usage constants
     gss_cred_usage_t GSS_C_BOTH
@@ -0,0 +1,450 @@
+GSSAPI="BASE"  # This ensures that a full module is generated by Cython
+
+from libc.stdlib cimport calloc, free
+from cpython.buffer cimport PyObject_GetBuffer, PyBuffer_Release
+from cpython.buffer cimport PyBUF_SIMPLE, PyBUF_WRITABLE
+
+from gssapi.base.cython_types cimport *
+from gssapi.base.buffers cimport c_make_output_buffer
+from gssapi.base.cython_converters cimport c_get_input_buffer
+from gssapi.base.cython_converters cimport c_release_input_buffer
+from gssapi.base.sec_contexts cimport SecurityContext
+
+from gssapi.base.misc import GSSError
+
+from flufl.enum import IntEnum
+
+
+cdef extern from "gssapi/gssapi_ext.h":
+    ctypedef struct gss_iov_buffer_desc:
+        OM_uint32 type
+        gss_buffer_desc buffer
+
+    OM_uint32 gss_wrap_iov(OM_uint32 *min_stat,
+                           gss_ctx_id_t context,
+                           int conf_req,
+                           gss_qop_t qop,
+                           int *conf_used,
+                           gss_iov_buffer_desc *iov,
+                           int iov_count) nogil
+
+    OM_uint32 gss_unwrap_iov(OM_uint32 *min_stat,
+                             gss_ctx_id_t context,
+                             int *conf_used,
+                             gss_qop_t *qop_state,
+                             gss_iov_buffer_desc *iov,
+                             int iov_count) nogil
+
+    OM_uint32 gss_wrap_iov_length(OM_uint32 *min_stat,
+                                  gss_ctx_id_t context,
+                                  int conf_req,
+                                  gss_qop_t qop,
+                                  int *conf_used,
+                                  gss_iov_buffer_desc *iov,
+                                  int iov_count) nogil
+
+    OM_uint32 gss_wrap_aead(OM_uint32 *min_stat,
+                            gss_ctx_id_t context,
+                            int conf_req,
+                            gss_qop_t qop,
+                            gss_buffer_t input_assoc_buffer,
+                            gss_buffer_t input_payload_buffer,
+                            int *conf_used,
+                            gss_buffer_t output_message_buffer) nogil
+
+    OM_uint32 gss_unwrap_aead(OM_uint32 *min_stat,
+                              gss_ctx_id_t context,
+                              gss_buffer_t input_message_buffer,
+                              gss_buffer_t input_assoc_buffer,
+                              gss_buffer_t output_payload_buffer,
+                              int *conf_used,
+                              gss_qop_t *qop_state) nogil
+
+    # IOV buffer type constants
+    OM_uint32 GSS_IOV_BUFFER_TYPE_EMPTY
+    OM_uint32 GSS_IOV_BUFFER_TYPE_DATA
+    OM_uint32 GSS_IOV_BUFFER_TYPE_HEADER
+    OM_uint32 GSS_IOV_BUFFER_TYPE_MECH_PARAMS
+    OM_uint32 GSS_IOV_BUFFER_TYPE_TRAILER
+    OM_uint32 GSS_IOV_BUFFER_TYPE_PADDING
+    OM_uint32 GSS_IOV_BUFFER_TYPE_STREAM
+    OM_uint32 GSS_IOV_BUFFER_TYPE_SIGN_ONLY
+
+
+class IOVBufferType(IntEnum):
+    """
+    GSSAPI IOV Buffer Types
+
+    This IntEnum represents the types of buffers that may be
+    passed to wrapIOV, unwrapIOV, and wrapIOVLength.
+
+    The numbers behind the values correspond directly
+    to their C counterparts.
+    """
+
+    empty = GSS_IOV_BUFFER_TYPE_EMPTY
+    data = GSS_IOV_BUFFER_TYPE_DATA
+    header = GSS_IOV_BUFFER_TYPE_HEADER
+    mech_params = GSS_IOV_BUFFER_TYPE_MECH_PARAMS
+    trailer = GSS_IOV_BUFFER_TYPE_TRAILER
+    padding = GSS_IOV_BUFFER_TYPE_PADDING
+    stream = GSS_IOV_BUFFER_TYPE_STREAM
+    sign_only = GSS_IOV_BUFFER_TYPE_SIGN_ONLY
+
+
+cdef class _IOVArray:
+    """
+    An array of GSSAPI IOV buffers, pinned from Python buffers
+
+    Each entry of the input sequence is a (IOVBufferType, value) pair.
+    The value may be None (for a zero-length buffer), or any contiguous
+    buffer-protocol object.  Buffers are pinned without copying, and must
+    be writable unless they are sign_only or mech_params buffers.  When
+    lengths_only is set, values may also be ints, and no memory is pinned
+    at all (only the lengths are used).
+    """
+
+    cdef int count
+    cdef gss_iov_buffer_desc *iov
+    cdef Py_buffer *views
+    cdef bint *pinned
+
+    def __cinit__(self, buffers, bint lengths_only=False):
+        self.count = len(buffers)
+
+        # calloc(0, ...) may return NULL, so always allocate at least one slot
+        cdef size_t slots = self.count or 1
+        self.iov = <gss_iov_buffer_desc*>calloc(slots,
+                                                sizeof(gss_iov_buffer_desc))
+        self.views = <Py_buffer*>calloc(slots, sizeof(Py_buffer))
+        self.pinned = <bint*>calloc(slots, sizeof(bint))
+
+        if self.iov is NULL or self.views is NULL or self.pinned is NULL:
+            raise MemoryError()
+
+        cdef int i
+        cdef int flags
+        for i in range(self.count):
+            buffer_type, value = buffers[i]
+            buffer_type = IOVBufferType(buffer_type)
+            if buffer_type is IOVBufferType.stream:
+                raise ValueError('Stream IOV buffers are not supported -- '
+                                 'use unwrap to unwrap a complete token')
+
+            self.iov[i].type = buffer_type
+            if value is None:
+                continue
+            elif lengths_only:
+                try:
+                    self.iov[i].buffer.length = len(value)
+                except TypeError:
+                    self.iov[i].buffer.length = value  # an int length
+                continue
+
+            if (buffer_type is IOVBufferType.sign_only or
+                    buffer_type is IOVBufferType.mech_params):
+                flags = PyBUF_SIMPLE
+            else:
+                flags = PyBUF_WRITABLE
+
+            PyObject_GetBuffer(value, &self.views[i], flags)
+            self.pinned[i] = True
+            self.iov[i].buffer.length = self.views[i].len
+            self.iov[i].buffer.value = <char*>self.views[i].buf
+
+    def __dealloc__(self):
+        cdef int i
+        if self.pinned is not NULL:
+            for i in range(self.count):
+                if self.pinned[i]:
+                    PyBuffer_Release(&self.views[i])
+
+        free(self.iov)
+        free(self.views)
+        free(self.pinned)
+
+    cdef list lengths(self):
+        return [self.iov[i].buffer.length for i in range(self.count)]
+
+
+def wrapIOVLength(SecurityContext context not None, buffers,
+                  confidential=True, qop=None):
+    """
+    wrapIOVLength(context, buffers, confidential=True, qop=None) -> [int]
+    Calculate the buffer lengths needed for wrapIOV.
+
+    This method calculates the lengths of the header, padding, and trailer
+    buffers needed to wrap the given data buffers with wrapIOV, so that the
+    caller can preallocate them.  The buffers are passed as a sequence of
+    (IOVBufferType, value) pairs, as with wrapIOV.  Here, however, the
+    values may also be ints (the length of a data or sign_only buffer),
+    or None (for header, padding, and trailer buffers).
+
+    Args:
+        context (SecurityContext): the current security context
+        buffers ([(IOVBufferType, buffer or int)]): the buffers in question
+        confidential (bool): whether or not encryption will be used
+        qop (int): the QoP that will be used when actually calling wrapIOV
+            (or None for the default QoP)
+
+    Returns:
+        [int]: the required length of each buffer, in order
+
+    Raises:
+        GSSError
+    """
+
+    cdef int conf_req = confidential
+    cdef gss_qop_t qop_req = qop if qop is not None else GSS_C_QOP_DEFAULT
+
+    cdef _IOVArray iov = _IOVArray(buffers, lengths_only=True)
+
+    cdef int conf_used
+
+    cdef OM_uint32 maj_stat, min_stat
+
+    with nogil:
+        maj_stat = gss_wrap_iov_length(&min_stat, context.raw_ctx, conf_req,
+                                       qop_req, &conf_used, iov.iov,
+                                       iov.count)
+
+    if maj_stat == GSS_S_COMPLETE:
+        return iov.lengths()
+    else:
+        raise GSSError(maj_stat, min_stat)
+
+
+def wrapIOV(SecurityContext context not None, buffers, confidential=True,
+            qop=None):
+    """
+    wrapIOV(context, buffers, confidential=True, qop=None) -> (bool, [int])
+    Wrap/Encrypt a set of buffers in-place.
+
+    This method wraps or encrypts a message (depending on the value of
+    confidential) which has been split up into several buffers.  The
+    buffers are passed as a sequence of (IOVBufferType, buffer) pairs,
+    and are modified in-place, so no memory is allocated for the output.
+    Data buffers are encrypted, and the header, padding, and trailer
+    buffers are filled in.  Use wrapIOVLength to determine the sizes of
+    the header, padding, and trailer buffers ahead of time.
+
+    Each buffer may be any writable contiguous buffer (such as a bytearray
+    or writable memoryview), except for sign_only buffers, which are
+    only read.  A value of None indicates a zero-length buffer.
+
+    Args:
+        context (SecurityContext): the current security context
+        buffers ([(IOVBufferType, buffer)]): the buffers to wrap
+        confidential (bool): whether or not to encrypt the data (True),
+            or just wrap it with a MIC (False)
+        qop (int): the desired Quality of Protection
+            (or None for the default QoP)
+
+    Returns:
+        (bool, [int]): whether or not encryption was actually used, and
+            the actual length of the contents of each buffer, in order
+
+    Raises:
+        GSSError
+    """
+
+    cdef int conf_req = confidential
+    cdef gss_qop_t qop_req = qop if qop is not None else GSS_C_QOP_DEFAULT
+
+    cdef _IOVArray iov = _IOVArray(buffers)
+
+    cdef int conf_used
+
+    cdef OM_uint32 maj_stat, min_stat
+
+    with nogil:
+        maj_stat = gss_wrap_iov(&min_stat, context.raw_ctx, conf_req,
+                                qop_req, &conf_used, iov.iov, iov.count)
+
+    if maj_stat == GSS_S_COMPLETE:
+        return (<bint>conf_used, iov.lengths())
+    else:
+        raise GSSError(maj_stat, min_stat)
+
+
+def unwrapIOV(SecurityContext context not None, buffers):
+    """
+    unwrapIOV(context, buffers) -> (bool, int)
+    Unwrap/Decrypt a set of buffers in-place.
+
+    This method unwraps or decrypts a message which has been split up
+    into several buffers, as produced by wrapIOV.  The buffers are passed
+    as a sequence of (IOVBufferType, buffer) pairs, and the data buffers
+    are decrypted in-place.
+
+    Each buffer may be any writable contiguous buffer (such as a bytearray
+    or writable memoryview), except for sign_only buffers, which are
+    only read.  A value of None indicates a zero-length buffer.
+
+    Args:
+        context (SecurityContext): the current security context
+        buffers ([(IOVBufferType, buffer)]): the buffers to unwrap
+
+    Returns:
+        (bool, int): whether or not encryption was used, and the QoP used
+
+    Raises:
+        GSSError
+    """
+
+    cdef _IOVArray iov = _IOVArray(buffers)
+
+    cdef int conf_used
+    cdef gss_qop_t qop_used
+
+    cdef OM_uint32 maj_stat, min_stat
+
+    with nogil:
+        maj_stat = gss_unwrap_iov(&min_stat, context.raw_ctx, &conf_used,
+                                  &qop_used, iov.iov, iov.count)
+
+    if maj_stat == GSS_S_COMPLETE:
+        return (<bint>conf_used, qop_used)
+    else:
+        raise GSSError(maj_stat, min_stat)
+
+
+def wrapAEAD(SecurityContext context not None, assoc_data, message,
+             confidential=True, qop=None, as_buffer=False):
+    """
+    wrapAEAD(context, assoc_data, message, confidential=True, qop=None,
+             as_buffer=False) -> (bytes or GSSBuffer, bool)
+    Wrap/Encrypt a message with associated data.
+
+    This method wraps or encrypts a message (depending on the value of
+    confidential), additionally protecting the integrity of the given
+    associated data.  The associated data is not included in the output
+    token, and must be sent separately (e.g. in the clear, as a header),
+    and passed again to unwrapAEAD.  This allows a single pass to protect
+    both the message and its header.
+
+    Args:
+        context (SecurityContext): the current security context
+        assoc_data (buffer): the associated data to integrity-protect
+            (any contiguous buffer, such as bytes, bytearray, or
+            memoryview), or None for no associated data
+        message (buffer): the message to wrap or encrypt (any contiguous
+            buffer, such as bytes, bytearray, or memoryview)
+        confidential (bool): whether or not to encrypt the message (True),
+            or just wrap it with a MIC (False)
+        qop (int): the desired Quality of Protection
+            (or None for the default QoP)
+        as_buffer (bool): return the wrapped message as a GSSBuffer
+            wrapping the GSSAPI-allocated memory instead of copying
+            it into bytes
+
+    Returns:
+        (bytes or GSSBuffer, bool): the wrapped/encrypted message, and
+            whether or not encryption was actually used
+
+    Raises:
+        GSSError
+    """
+
+    cdef int conf_req = confidential
+    cdef gss_qop_t qop_req = qop if qop is not None else GSS_C_QOP_DEFAULT
+
+    cdef int conf_used
+    # GSS_C_EMPTY_BUFFER
+    cdef gss_buffer_desc output_buffer = gss_buffer_desc(0, NULL)
+
+    cdef OM_uint32 maj_stat, min_stat
+
+    cdef Py_buffer message_view, assoc_view
+    cdef gss_buffer_desc message_buffer
+    cdef gss_buffer_desc assoc_buffer = gss_buffer_desc(0, NULL)
+    cdef gss_buffer_t assoc_buffer_ptr = GSS_C_NO_BUFFER
+    c_get_input_buffer(message, &message_view, &message_buffer)
+    if assoc_data is not None:
+        try:
+            c_get_input_buffer(assoc_data, &assoc_view, &assoc_buffer)
+        except:
+            c_release_input_buffer(&message_view)
+            raise
+        assoc_buffer_ptr = &assoc_buffer
+
+    with nogil:
+        maj_stat = gss_wrap_aead(&min_stat, context.raw_ctx, conf_req,
+                                 qop_req, assoc_buffer_ptr, &message_buffer,
+                                 &conf_used, &output_buffer)
+
+    c_release_input_buffer(&message_view)
+    if assoc_data is not None:
+        c_release_input_buffer(&assoc_view)
+
+    if maj_stat == GSS_S_COMPLETE:
+        output_message = c_make_output_buffer(&output_buffer, as_buffer)
+        return (output_message, <bint>conf_used)
+    else:
+        raise GSSError(maj_stat, min_stat)
+
+
+def unwrapAEAD(SecurityContext context not None, assoc_data, message,
+               as_buffer=False):
+    """
+    unwrapAEAD(context, assoc_data, message,
+               as_buffer=False) -> (bytes or GSSBuffer, bool, int)
+    Unwrap/Decrypt a message with associated data.
+
+    This method unwraps or decrypts a message produced by wrapAEAD,
+    verifying the integrity of both the message and the given
+    associated data.
+
+    Args:
+        context (SecurityContext): the current security context
+        assoc_data (buffer): the associated data that was passed to wrapAEAD
+            (any contiguous buffer, such as bytes, bytearray, or
+            memoryview), or None for no associated data
+        message (buffer): the message to unwrap/decrypt (any contiguous
+            buffer, such as bytes, bytearray, or memoryview)
+        as_buffer (bool): return the unwrapped message as a GSSBuffer
+            wrapping the GSSAPI-allocated memory instead of copying
+            it into bytes
+
+    Returns:
+        (bytes or GSSBuffer, bool, int): the unwrapped/decrypted message,
+            whether or on encryption was used, and the QoP used
+
+    Raises:
+        GSSError
+    """
+
+    # GSS_C_EMPTY_BUFFER
+    cdef gss_buffer_desc output_buffer = gss_buffer_desc(0, NULL)
+    cdef int conf_state
+    cdef gss_qop_t qop_state
+
+    cdef OM_uint32 maj_stat, min_stat
+
+    cdef Py_buffer message_view, assoc_view
+    cdef gss_buffer_desc message_buffer
+    cdef gss_buffer_desc assoc_buffer = gss_buffer_desc(0, NULL)
+    cdef gss_buffer_t assoc_buffer_ptr = GSS_C_NO_BUFFER
+    c_get_input_buffer(message, &message_view, &message_buffer)
+    if assoc_data is not None:
+        try:
+            c_get_input_buffer(assoc_data, &assoc_view, &assoc_buffer)
+        except:
+            c_release_input_buffer(&message_view)
+            raise
+        assoc_buffer_ptr = &assoc_buffer
+
+    with nogil:
+        maj_stat = gss_unwrap_aead(&min_stat, context.raw_ctx,
+                                   &message_buffer, assoc_buffer_ptr,
+                                   &output_buffer, &conf_state, &qop_state)
+
+    c_release_input_buffer(&message_view)
+    if assoc_data is not None:
+        c_release_input_buffer(&assoc_view)
+
+    if maj_stat == GSS_S_COMPLETE:
+        output_message = c_make_output_buffer(&output_buffer, as_buffer)
+        return (output_message, <bint>conf_state, qop_state)
+    else:
+        raise GSSError(maj_stat, min_stat)
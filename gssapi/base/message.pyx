@@ -1,8 +1,17 @@
 GSSAPI="BASE"  # This ensures that a full module is generated by Cython
 
+from libc.stdlib cimport calloc, free
+from cpython cimport array
+from cpython.bytearray cimport PyByteArray_AS_STRING
+
 from gssapi.base.cython_types cimport *
+from gssapi.base.buffers cimport c_make_output_buffer
+from gssapi.base.cython_converters cimport c_get_input_buffer
+from gssapi.base.cython_converters cimport c_release_input_buffer
 from gssapi.base.sec_contexts cimport SecurityContext
 
+import array
+
 from gssapi.base.misc import GSSError
 
 
@@ -42,9 +51,105 @@ cdef extern from "gssapi.h":
                          gss_qop_t *qop) nogil
 
 
-def getMIC(SecurityContext context not None, message, qop=None):
+cdef inline void c_discard_output_buffer(gss_buffer_desc *buff):
+    """Release an output buffer which will not be returned."""
+    cdef OM_uint32 min_stat
+    if buff.value is not NULL:
+        gss_release_buffer(&min_stat, buff)
+
+
+cdef class _MessageBatch:
+    """
+    Pinned input buffers and output slots for a batch of message calls
+
+    This holds everything that the batch methods touch while the GIL is
+    released, so that the loop over the batch can run entirely in C.
+    Any pinned inputs and unconsumed outputs are released on dealloc.
+
+    If a second sequence (of tokens) is passed, it is pinned alongside
+    the messages, and made available as the tokens array.
     """
-    getMIC(context, message, qop) -> bytes
+
+    cdef Py_ssize_t count
+    cdef Py_ssize_t pinned
+    cdef Py_buffer *views
+    cdef gss_buffer_desc *inputs
+    cdef gss_buffer_desc *tokens
+    cdef gss_buffer_desc *outputs
+    cdef OM_uint32 *maj_stats
+    cdef OM_uint32 *min_stats
+    cdef int *conf_states
+    cdef gss_qop_t *qop_states
+
+    def __cinit__(self, messages, tokens=None):
+        self.count = len(messages)
+        self.pinned = 0
+
+        if tokens is not None and len(tokens) != self.count:
+            raise ValueError('The number of tokens must match the number '
+                             'of messages')
+
+        # calloc(0, ...) may return NULL, so always allocate at least one slot
+        cdef size_t slots = self.count or 1
+        cdef size_t input_slots = slots
+        if tokens is not None:
+            input_slots = slots * 2
+
+        self.views = <Py_buffer*>calloc(input_slots, sizeof(Py_buffer))
+        self.inputs = <gss_buffer_desc*>calloc(input_slots,
+                                               sizeof(gss_buffer_desc))
+        self.outputs = <gss_buffer_desc*>calloc(slots,
+                                                sizeof(gss_buffer_desc))
+        self.maj_stats = <OM_uint32*>calloc(slots, sizeof(OM_uint32))
+        self.min_stats = <OM_uint32*>calloc(slots, sizeof(OM_uint32))
+        self.conf_states = <int*>calloc(slots, sizeof(int))
+        self.qop_states = <gss_qop_t*>calloc(slots, sizeof(gss_qop_t))
+
+        if (self.views is NULL or self.inputs is NULL or
+                self.outputs is NULL or self.maj_stats is NULL or
+                self.min_stats is NULL or self.conf_states is NULL or
+                self.qop_states is NULL):
+            raise MemoryError()
+
+        cdef Py_ssize_t i
+        for i in range(self.count):
+            c_get_input_buffer(messages[i], &self.views[i], &self.inputs[i])
+            self.pinned += 1
+
+        if tokens is not None:
+            self.tokens = self.inputs + self.count
+            for i in range(self.count):
+                c_get_input_buffer(tokens[i], &self.views[self.count + i],
+                                   &self.tokens[i])
+                self.pinned += 1
+
+    def __dealloc__(self):
+        cdef Py_ssize_t i
+        cdef OM_uint32 min_stat
+
+        if self.views is not NULL:
+            for i in range(self.pinned):
+                c_release_input_buffer(&self.views[i])
+
+        if self.outputs is not NULL:
+            for i in range(self.count):
+                if self.outputs[i].value is not NULL:
+                    gss_release_buffer(&min_stat, &self.outputs[i])
+
+        free(self.views)
+        free(self.inputs)
+        free(self.outputs)
+        free(self.maj_stats)
+        free(self.min_stats)
+        free(self.conf_states)
+        free(self.qop_states)
+
+
+def getMIC(SecurityContext context not None, message, qop=None,
+           as_buffer=False, return_status=False):
+    """
+    getMIC(context, message, qop=None, as_buffer=False,
+           return_status=False) -> bytes or GSSBuffer
     Generate a MIC for a message.
 
     This method generates a Message Integrity Check token for the
@@ -54,44 +159,60 @@ def getMIC(SecurityContext context not None, message, qop=None):
 
     Args:
         context (SecurityContext): the current security context
-        message (bytes): the message for which to generate the MIC
+        message (buffer): the message for which to generate the MIC (any
+            contiguous buffer, such as bytes, bytearray, or memoryview)
         qop (int): the requested Quality of Protection
             (or None to use the default)
+        as_buffer (bool): return the token as a GSSBuffer wrapping the
+            GSSAPI-allocated memory instead of copying it into bytes
+        return_status (bool): instead of raising a GSSError, return a
+            tuple of the usual result (or None on error) along with the
+            major and minor status codes
 
     Returns:
-        bytes: the generated MIC token
+        bytes or GSSBuffer: the generated MIC token
 
     Raises:
-        GSSError
+        GSSError: only if return_status is False
     """
 
-    cdef gss_buffer_desc message_buffer = gss_buffer_desc(len(message),
-                                                          message)
     cdef gss_qop_t qop_req = qop if qop is not None else GSS_C_QOP_DEFAULT
 
     # GSS_C_EMPYT_BUFFER
     cdef gss_buffer_desc token_buffer = gss_buffer_desc(0, NULL)
 
+    cdef Py_buffer message_view
+    cdef gss_buffer_desc message_buffer
+    c_get_input_buffer(message, &message_view, &message_buffer)
+
     cdef OM_uint32 maj_stat, min_stat
 
     with nogil:
         maj_stat = gss_get_mic(&min_stat, context.raw_ctx, qop_req,
                                &message_buffer, &token_buffer)
 
+    c_release_input_buffer(&message_view)
+
     if maj_stat == GSS_S_COMPLETE:
-        res = token_buffer.value[:token_buffer.length]
-        gss_release_buffer(&min_stat, &token_buffer)
-        return res
+        res = c_make_output_buffer(&token_buffer, as_buffer)
+    elif return_status:
+        c_discard_output_buffer(&token_buffer)
+        res = None
     else:
         raise GSSError(maj_stat, min_stat)
 
+    if return_status:
+        return (res, maj_stat, min_stat)
+    else:
+        return res
+
 
 # TODO(sross): should this method have two ways to run it?
 def verifyMIC(SecurityContext context not None, message, token,
-              return_bool=False):
+              return_bool=False, return_status=False):
     """
-    verifyMIC(context, message, token, return_bool=False) -> int or (bool, int,
-                                                                     int, int)
+    verifyMIC(context, message, token, return_bool=False,
+              return_status=False) -> int or (bool, int, int, int)
     Verify that a MIC matches a message.
 
     This method verifies that the given MIC matches the given message.
@@ -109,9 +230,13 @@ def verifyMIC(SecurityContext context not None, message, token,
 
     Args:
         context (SecurityContext): the current security context
-        message (bytes): the message in question
-        token (bytes): the MIC token in question
+        message (buffer): the message in question (any contiguous buffer,
+            such as bytes, bytearray, or memoryview)
+        token (buffer): the MIC token in question
         return_bool (bool): which return type to use (see main description)
+        return_status (bool): instead of raising a GSSError, return a
+            tuple of the QoP (or None on error) along with the major and
+            minor status codes (takes precedence over return_bool)
 
     Returns:
         int or (bool, int, int, int): either the QoP used or whether or not the
@@ -119,12 +244,17 @@ def verifyMIC(SecurityContext context not None, message, token,
             status code
 
     Raises:
-        GSSError: only if return_bool is False
+        GSSError: only if return_bool and return_status are both False
     """
 
-    cdef gss_buffer_desc message_buffer = gss_buffer_desc(len(message),
-                                                          message)
-    cdef gss_buffer_desc token_buffer = gss_buffer_desc(len(token), token)
+    cdef Py_buffer message_view, token_view
+    cdef gss_buffer_desc message_buffer, token_buffer
+    c_get_input_buffer(message, &message_view, &message_buffer)
+    try:
+        c_get_input_buffer(token, &token_view, &token_buffer)
+    except:
+        c_release_input_buffer(&message_view)
+        raise
 
     cdef gss_qop_t qop_state
 
@@ -134,6 +264,15 @@ def verifyMIC(SecurityContext context not None, message, token,
         maj_stat = gss_verify_mic(&min_stat, context.raw_ctx, &message_buffer,
                                   &token_buffer, &qop_state)
 
+    c_release_input_buffer(&message_view)
+    c_release_input_buffer(&token_view)
+
+    if return_status:
+        if GSS_ERROR(maj_stat):
+            return (None, maj_stat, min_stat)
+        else:
+            return (qop_state, maj_stat, min_stat)
+
     if maj_stat == GSS_S_COMPLETE or maj_stat == GSS_S_DUPLICATE_TOKEN:
         if return_bool:
             return (True, qop_state, maj_stat, min_stat)
@@ -187,9 +326,10 @@ def wrapSizeLimit(SecurityContext context not None, OM_uint32 output_size,
 
 
 def wrap(SecurityContext context not None, message, confidential=True,
-         qop=None):
+         qop=None, as_buffer=False, return_status=False):
     """
-    wrap(context, message, confidential=True, qop=None) -> (bytes, bool)
+    wrap(context, message, confidential=True, qop=None, as_buffer=False,
+         return_status=False) -> (bytes or GSSBuffer, bool)
     Wrap/Encrypt a message.
 
     This method wraps or encrypts a message (depending on the value
@@ -197,24 +337,33 @@ def wrap(SecurityContext context not None, message, confidential=True,
 
     Args:
         context (SecurityContext): the current security context
-        message (bytes): the message to wrap or encrypt
+        message (buffer): the message to wrap or encrypt (any contiguous
+            buffer, such as bytes, bytearray, or memoryview)
         confidential (bool): whether or not to encrypt the message (True),
             or just wrap it with a MIC (False)
         qop (int): the desired Quality of Protection
             (or None for the default QoP)
+        as_buffer (bool): return the wrapped message as a GSSBuffer
+            wrapping the GSSAPI-allocated memory instead of copying
+            it into bytes
+        return_status (bool): instead of raising a GSSError, return a
+            tuple of the usual result (or None on error) along with the
+            major and minor status codes
 
     Returns:
-        (bytes, bool): the wrapped/encrypted message, and whether or not
-            encryption was actually used
+        (bytes or GSSBuffer, bool): the wrapped/encrypted message, and
+            whether or not encryption was actually used
 
     Raises:
-        GSSError
+        GSSError: only if return_status is False
     """
 
     cdef int conf_req = confidential
     cdef gss_qop_t qop_req = qop if qop is not None else GSS_C_QOP_DEFAULT
-    cdef gss_buffer_desc message_buffer = gss_buffer_desc(len(message),
-                                                          message)
+
+    cdef Py_buffer message_view
+    cdef gss_buffer_desc message_buffer
+    c_get_input_buffer(message, &message_view, &message_buffer)
 
     cdef int conf_used
     # GSS_C_EMPTY_BUFFER
@@ -226,15 +375,28 @@ def wrap(SecurityContext context not None, message, confidential=True,
         maj_stat = gss_wrap(&min_stat, context.raw_ctx, conf_req, qop_req,
                             &message_buffer, &conf_used, &output_buffer)
 
+    c_release_input_buffer(&message_view)
+
     if maj_stat == GSS_S_COMPLETE:
-        output_message = output_buffer.value[:output_buffer.length]
-        gss_release_buffer(&min_stat, &output_buffer)
-        return (output_message, <bint>conf_used)
+        output_message = c_make_output_buffer(&output_buffer, as_buffer)
+        res = (output_message, <bint>conf_used)
+    elif return_status:
+        c_discard_output_buffer(&output_buffer)
+        res = None
+    else:
+        raise GSSError(maj_stat, min_stat)
+
+    if return_status:
+        return (res, maj_stat, min_stat)
+    else:
+        return res
 
 
-def unwrap(SecurityContext context not None, message):
+def unwrap(SecurityContext context not None, message, as_buffer=False,
+           return_status=False):
     """
-    unwrap(context, message) -> (bytes, bool, qop)
+    unwrap(context, message, as_buffer=False,
+           return_status=False) -> (bytes or GSSBuffer, bool, int)
     Unwrap/Decrypt a message.
 
     This method unwraps or decrypts a message, depending
@@ -242,18 +404,30 @@ def unwrap(SecurityContext context not None, message):
 
     Args:
         context (SecurityContext): the current security context
-        message (bytes): the message to unwrap/decrypt
+        message (buffer): the message to unwrap/decrypt (any contiguous
+            buffer, such as bytes, bytearray, or memoryview)
+        as_buffer (bool): return the unwrapped message as a GSSBuffer
+            wrapping the GSSAPI-allocated memory instead of copying
+            it into bytes
+        return_status (bool): instead of raising a GSSError, return a
+            tuple of the usual result along with the major and minor
+            status codes.  The result is None only if the major status
+            code indicates an error, so messages flagged with supplementary
+            status bits (such as duplicate or out-of-sequence tokens) are
+            still returned.
 
     Returns:
-        (bytes, bool, qop): the unwrapped/decrypted message,
+        (bytes or GSSBuffer, bool, int): the unwrapped/decrypted message,
             whether or on encryption was used,
             and the QoP used
 
     Raises:
-        GSSError
+        GSSError: only if return_status is False
     """
 
-    cdef gss_buffer_desc input_buffer = gss_buffer_desc(len(message), message)
+    cdef Py_buffer input_view
+    cdef gss_buffer_desc input_buffer
+    c_get_input_buffer(message, &input_view, &input_buffer)
 
     # GSS_C_EMPTY_BUFFER
     cdef gss_buffer_desc output_buffer = gss_buffer_desc(0, NULL)
@@ -266,9 +440,260 @@ def unwrap(SecurityContext context not None, message):
         maj_stat = gss_unwrap(&min_stat, context.raw_ctx, &input_buffer,
                               &output_buffer, &conf_state, &qop_state)
 
+    c_release_input_buffer(&input_view)
+
+    if return_status:
+        if GSS_ERROR(maj_stat):
+            c_discard_output_buffer(&output_buffer)
+            res = None
+        else:
+            output_message = c_make_output_buffer(&output_buffer, as_buffer)
+            res = (output_message, <bint>conf_state, qop_state)
+
+        return (res, maj_stat, min_stat)
+
     if maj_stat == GSS_S_COMPLETE:
-        output_message = output_buffer.value[:output_buffer.length]
-        gss_release_buffer(&min_stat, &output_buffer)
+        output_message = c_make_output_buffer(&output_buffer, as_buffer)
         return (output_message, <bint>conf_state, qop_state)
     else:
+        c_discard_output_buffer(&output_buffer)
         raise GSSError(maj_stat, min_stat)
+
+
+def wrapMany(SecurityContext context not None, messages, confidential=True,
+             qop=None, as_buffer=False):
+    """
+    wrapMany(context, messages, confidential=True, qop=None,
+             as_buffer=False) -> [(bytes or GSSBuffer, bool) or GSSError]
+    Wrap/Encrypt a batch of messages.
+
+    This method works like wrap, but wraps every message in the given
+    sequence in a single call, releasing the GIL only once for the
+    whole batch.  An error wrapping one message does not stop the
+    batch -- instead, the corresponding GSSError is placed in the output
+    list in the position of that message.
+
+    Args:
+        context (SecurityContext): the current security context
+        messages ([buffer]): the messages to wrap or encrypt (each may be any
+            contiguous buffer, such as bytes, bytearray, or memoryview)
+        confidential (bool): whether or not to encrypt the messages (True),
+            or just wrap them with a MIC (False)
+        qop (int): the desired Quality of Protection
+            (or None for the default QoP)
+        as_buffer (bool): return the wrapped messages as GSSBuffers wrapping
+            the GSSAPI-allocated memory instead of copying them into bytes
+
+    Returns:
+        [(bytes or GSSBuffer, bool) or GSSError]: one entry per message,
+            in order: either the wrapped/encrypted message and whether or
+            not encryption was actually used (as returned by wrap), or
+            the error wrapping that message
+
+    Raises:
+        TypeError: if a message does not support the buffer protocol
+    """
+
+    cdef int conf_req = confidential
+    cdef gss_qop_t qop_req = qop if qop is not None else GSS_C_QOP_DEFAULT
+
+    cdef _MessageBatch batch = _MessageBatch(messages)
+
+    cdef Py_ssize_t i
+    with nogil:
+        for i in range(batch.count):
+            batch.maj_stats[i] = gss_wrap(&batch.min_stats[i],
+                                          context.raw_ctx, conf_req, qop_req,
+                                          &batch.inputs[i],
+                                          &batch.conf_states[i],
+                                          &batch.outputs[i])
+
+    res = []
+    for i in range(batch.count):
+        if batch.maj_stats[i] == GSS_S_COMPLETE:
+            output_message = c_make_output_buffer(&batch.outputs[i],
+                                                  as_buffer)
+            res.append((output_message, <bint>batch.conf_states[i]))
+        else:
+            res.append(GSSError(batch.maj_stats[i], batch.min_stats[i]))
+
+    return res
+
+
+def unwrapMany(SecurityContext context not None, messages, as_buffer=False):
+    """
+    unwrapMany(context, messages, as_buffer=False)
+        -> [(bytes or GSSBuffer, bool, int) or GSSError]
+    Unwrap/Decrypt a batch of messages.
+
+    This method works like unwrap, but unwraps every message in the
+    given sequence in a single call, releasing the GIL only once for the
+    whole batch.  An error unwrapping one message does not stop the
+    batch -- instead, the corresponding GSSError is placed in the output
+    list in the position of that message.
+
+    Note:
+        As with unwrap, any major status other than GSS_S_COMPLETE
+        produces a GSSError, so messages flagged with supplementary
+        status bits (such as duplicate or out-of-sequence tokens) are
+        reported as errors instead of being returned.
+
+    Args:
+        context (SecurityContext): the current security context
+        messages ([buffer]): the messages to unwrap/decrypt (each may be any
+            contiguous buffer, such as bytes, bytearray, or memoryview)
+        as_buffer (bool): return the unwrapped messages as GSSBuffers
+            wrapping the GSSAPI-allocated memory instead of copying them
+            into bytes
+
+    Returns:
+        [(bytes or GSSBuffer, bool, int) or GSSError]: one entry per
+            message, in order: either the unwrapped/decrypted message,
+            whether or not encryption was used, and the QoP used (as
+            returned by unwrap), or the error unwrapping that message
+
+    Raises:
+        TypeError: if a message does not support the buffer protocol
+    """
+
+    cdef _MessageBatch batch = _MessageBatch(messages)
+
+    cdef Py_ssize_t i
+    with nogil:
+        for i in range(batch.count):
+            batch.maj_stats[i] = gss_unwrap(&batch.min_stats[i],
+                                            context.raw_ctx,
+                                            &batch.inputs[i],
+                                            &batch.outputs[i],
+                                            &batch.conf_states[i],
+                                            &batch.qop_states[i])
+
+    res = []
+    for i in range(batch.count):
+        if batch.maj_stats[i] == GSS_S_COMPLETE:
+            output_message = c_make_output_buffer(&batch.outputs[i],
+                                                  as_buffer)
+            res.append((output_message, <bint>batch.conf_states[i],
+                        batch.qop_states[i]))
+        else:
+            # any partial output is released along with the batch
+            res.append(GSSError(batch.maj_stats[i], batch.min_stats[i]))
+
+    return res
+
+
+def getMICMany(SecurityContext context not None, messages, qop=None,
+               as_buffer=False):
+    """
+    getMICMany(context, messages, qop=None,
+               as_buffer=False) -> [bytes or GSSBuffer or GSSError]
+    Generate MICs for a batch of messages.
+
+    This method works like getMIC, but generates a MIC for every message
+    in the given sequence in a single call, releasing the GIL only once
+    for the whole batch.  An error for one message does not stop the
+    batch -- instead, the corresponding GSSError is placed in the output
+    list in the position of that message.
+
+    Args:
+        context (SecurityContext): the current security context
+        messages ([buffer]): the messages for which to generate MICs (each
+            may be any contiguous buffer, such as bytes, bytearray, or
+            memoryview)
+        qop (int): the requested Quality of Protection
+            (or None to use the default)
+        as_buffer (bool): return the tokens as GSSBuffers wrapping the
+            GSSAPI-allocated memory instead of copying them into bytes
+
+    Returns:
+        [bytes or GSSBuffer or GSSError]: the generated MIC tokens
+            (or errors), in order
+
+    Raises:
+        TypeError: if a message does not support the buffer protocol
+    """
+
+    cdef gss_qop_t qop_req = qop if qop is not None else GSS_C_QOP_DEFAULT
+
+    cdef _MessageBatch batch = _MessageBatch(messages)
+
+    cdef Py_ssize_t i
+    with nogil:
+        for i in range(batch.count):
+            batch.maj_stats[i] = gss_get_mic(&batch.min_stats[i],
+                                             context.raw_ctx, qop_req,
+                                             &batch.inputs[i],
+                                             &batch.outputs[i])
+
+    res = []
+    for i in range(batch.count):
+        if batch.maj_stats[i] == GSS_S_COMPLETE:
+            res.append(c_make_output_buffer(&batch.outputs[i], as_buffer))
+        else:
+            res.append(GSSError(batch.maj_stats[i], batch.min_stats[i]))
+
+    return res
+
+
+def verifyMICMany(SecurityContext context not None, messages, tokens,
+                  return_codes=False):
+    """
+    verifyMICMany(context, messages, tokens,
+                  return_codes=False) -> bytearray or (bytearray, array)
+    Verify a batch of MICs against their messages.
+
+    This method works like verifyMIC, but verifies every message/token
+    pair in a single call, releasing the GIL only once for the whole
+    batch.  No exceptions are raised for invalid MICs.  Instead, a
+    bytearray is returned with one byte per message, which is 1 if the
+    MIC was valid and 0 otherwise.  If return_codes is True, an
+    array.array('I') of the major status code for each message is
+    returned as well.
+
+    Note:
+        As with verifyMIC, GSS_S_DUPLICATE_TOKEN is considered "success".
+        Set return_codes to True and examine the major status codes to
+        distinguish between this and GSS_S_COMPLETE.
+
+    Args:
+        context (SecurityContext): the current security context
+        messages ([buffer]): the messages in question (each may be any
+            contiguous buffer, such as bytes, bytearray, or memoryview)
+        tokens ([buffer]): the MIC tokens in question, in the same order
+            as the messages
+        return_codes (bool): whether to also return the major status codes
+
+    Returns:
+        bytearray or (bytearray, array): the validity of each MIC, and,
+            if requested, the major status code for each MIC
+
+    Raises:
+        TypeError: if a message or token does not support the buffer protocol
+        ValueError: if the number of tokens and messages differ
+    """
+
+    cdef _MessageBatch batch = _MessageBatch(messages, tokens)
+
+    valid = bytearray(batch.count)
+    cdef char *valid_buff = PyByteArray_AS_STRING(valid)
+
+    cdef Py_ssize_t i
+    with nogil:
+        for i in range(batch.count):
+            batch.maj_stats[i] = gss_verify_mic(&batch.min_stats[i],
+                                                context.raw_ctx,
+                                                &batch.inputs[i],
+                                                &batch.tokens[i],
+                                                &batch.qop_states[i])
+            valid_buff[i] = (batch.maj_stats[i] == GSS_S_COMPLETE or
+                             batch.maj_stats[i] == GSS_S_DUPLICATE_TOKEN)
+
+    if not return_codes:
+        return valid
+
+    cdef array.array codes = array.clone(array.array('I'), batch.count,
+                                         zero=False)
+    for i in range(batch.count):
+        codes.data.as_uints[i] = batch.maj_stats[i]
+
+    return (valid, codes)
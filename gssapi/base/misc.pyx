@@ -2,8 +2,12 @@ GSSAPI="BASE"  # This ensures that a full module is generated by Cython
 
 from gssapi.base.cython_types cimport *
 from gssapi.base.cython_converters cimport c_create_mech_list, c_get_mech_oid
+from gssapi.base.cython_converters cimport c_register_oid
 
-from gssapi.base.types import MechType
+import collections
+import threading
+
+from gssapi.base.types import MechType, SupplementaryStatus
 
 
 cdef extern from "gssapi.h":
@@ -12,10 +16,10 @@ cdef extern from "gssapi.h":
                                  int status_type,
                                  const gss_OID mech_type,
                                  OM_uint32 *message_context,
-                                 gss_buffer_t status_string)
+                                 gss_buffer_t status_string) nogil
 
     OM_uint32 gss_indicate_mechs(OM_uint32 *minor_status,
-                                 gss_OID_set *mech_set)
+                                 gss_OID_set *mech_set) nogil
 
 
 def indicateMechs():
@@ -24,14 +28,16 @@ def indicateMechs():
     Get the currently supported mechanisms.
 
     This method retrieves the currently supported GSSAPI mechanisms.
-    Note that if unknown mechanims are found, those will be skipped.
+    Note that unknown mechanisms (see registerMechType) are returned
+    as their raw OID bytes.
     """
 
     cdef gss_OID_set mech_set
 
     cdef OM_uint32 maj_stat, min_stat
 
-    maj_stat = gss_indicate_mechs(&min_stat, &mech_set)
+    with nogil:
+        maj_stat = gss_indicate_mechs(&min_stat, &mech_set)
 
     if maj_stat == GSS_S_COMPLETE:
         return c_create_mech_list(mech_set)
@@ -39,6 +45,89 @@ def indicateMechs():
         raise GSSError(maj_stat, min_stat)
 
 
+def registerMechType(value, bytes oid not None):
+    """
+    registerMechType(value, oid)
+    Register a mechanism type.
+
+    This method allows mechanisms other than those in MechType to be used.
+    Once registered, the given value may be passed anywhere a MechType is
+    accepted, and is returned in place of the mechanism's OID.  Mechanisms
+    which are not registered are represented by their raw OID bytes.
+
+    Args:
+        value: the (hashable) value used to represent the mechanism
+        oid (bytes): the DER-encoded elements of the mechanism's OID
+            (not including the tag and length)
+
+    Raises:
+        ValueError: the value or the OID is already registered
+    """
+
+    c_register_oid(value, oid, True)
+
+
+def registerNameType(value, bytes oid not None):
+    """
+    registerNameType(value, oid)
+    Register a name type.
+
+    Like registerMechType, but for name types (see NameType).
+
+    Args:
+        value: the (hashable) value used to represent the name type
+        oid (bytes): the DER-encoded elements of the name type's OID
+            (not including the tag and length)
+
+    Raises:
+        ValueError: the value or the OID is already registered
+    """
+
+    c_register_oid(value, oid, False)
+
+
+def isErrorStatus(OM_uint32 maj_code):
+    """
+    isErrorStatus(maj_code) -> bool
+    Check whether a major status code indicates an error.
+
+    Major status codes consisting only of supplementary information
+    bits (see SupplementaryStatus) are not errors.
+
+    Args:
+        maj_code (int): the major status code in question
+
+    Returns:
+        bool: whether or not the code contains a calling or routine error
+    """
+
+    return GSS_ERROR(maj_code) != 0
+
+
+_SUPPLEMENTARY_VALUES = tuple((int(status), status)
+                              for status in SupplementaryStatus)
+
+
+def supplementaryStatus(OM_uint32 maj_code):
+    """
+    supplementaryStatus(maj_code) -> [SupplementaryStatus]
+    Get the supplementary information bits set in a major status code.
+
+    Args:
+        maj_code (int): the major status code in question
+
+    Returns:
+        [SupplementaryStatus]: the supplementary bits which are set
+    """
+
+    cdef OM_uint32 info = GSS_SUPPLEMENTARY_INFO(maj_code)
+    if not info:
+        return []
+
+    return [status for value, status in _SUPPLEMENTARY_VALUES
+            if value & info]
+
+
 def displayStatus(unsigned int error_code, bint is_major_code,
                   mech_type=None, unsigned int message_context=0):
     """
@@ -72,6 +161,7 @@ def displayStatus(unsigned int error_code, bint is_major_code,
 
     cdef int status_type
     cdef gss_OID c_mech_type
+    cdef gss_OID_desc mech_type_desc
 
     if is_major_code:
         status_type = GSS_C_GSS_CODE
@@ -81,15 +171,16 @@ def displayStatus(unsigned int error_code, bint is_major_code,
     if mech_type is None:
         c_mech_type = GSS_C_NO_OID
     else:
-        c_mech_type = c_get_mech_oid(mech_type)
+        c_mech_type = c_get_mech_oid(mech_type, &mech_type_desc)
 
     cdef OM_uint32 maj_stat
     cdef OM_uint32 min_stat
     cdef OM_uint32 msg_ctx_out = message_context
     cdef gss_buffer_desc msg_buff
 
-    maj_stat = gss_display_status(&min_stat, error_code, status_type,
-                                  c_mech_type, &msg_ctx_out, &msg_buff)
+    with nogil:
+        maj_stat = gss_display_status(&min_stat, error_code, status_type,
+                                      c_mech_type, &msg_ctx_out, &msg_buff)
 
     if maj_stat == GSS_S_COMPLETE:
         call_again = bool(msg_ctx_out)
@@ -101,6 +192,12 @@ def displayStatus(unsigned int error_code, bint is_major_code,
         raise GSSError(maj_stat, min_stat)
 
 
+# decoded major status strings, keyed by (code, is_major, mech)
+STATUS_CACHE_SIZE = 256
+_status_cache = collections.OrderedDict()
+_status_cache_lock = threading.Lock()
+
+
 class GSSError(Exception):
     """
     GSSAPI Error
@@ -110,16 +207,19 @@ class GSSError(Exception):
     returned by the method which caused the error, and can
     generate human-readable string messages from the error
     codes
+
+    The message is only generated when it is first needed (e.g. when
+    the error is converted to a string), so catching a GSSError and
+    checking its codes is cheap.
     """
 
     def __init__(self, maj_code, min_code):
         """
         Create a new GSSError.
 
-        This method creates a new GSSError,
-        retrieves the releated human-readable
-        string messages, and uses the results to construct an
-        exception message
+        This method creates a new GSSError.  The related human-readable
+        string messages are retrieved when the exception message is
+        first accessed.
 
         Args:
             maj_code (int): the major code associated with this error
@@ -128,29 +228,66 @@ class GSSError(Exception):
 
         self.maj_code = maj_code
         self.min_code = min_code
+        self._args = None
+
+        super(GSSError, self).__init__()
 
-        super(GSSError, self).__init__(self.gen_message())
+    @property
+    def args(self):
+        if self._args is None:
+            self._args = (self.gen_message(),)
+        return self._args
 
-    def get_all_statuses(self, code, is_maj):
+    @args.setter
+    def args(self, value):
+        self._args = tuple(value)
+
+    def __str__(self):
+        args = self.args
+        if len(args) == 1:
+            return str(args[0])
+        return str(args)
+
+    def __repr__(self):
+        return '{0}({1!r}, {2!r})'.format(type(self).__name__,
+                                          self.maj_code, self.min_code)
+
+    def __reduce__(self):
+        return (type(self), (self.maj_code, self.min_code))
+
+    def get_all_statuses(self, code, is_maj, mech_type=None):
         """
         Retrieve all messages for a status code.
 
         This method retrieves all human-readable messages
-        available for the given status code.
+        available for the given status code.  Messages for
+        major status codes are cached (messages for minor
+        codes are not, since they may contain details specific
+        to the particular error).
 
         Args:
             code (int): the status code in question
             is_maj (bool): whether this is a major status code (True)
                 or minor status code (False)
+            mech_type (MechType): the mechanism which returned the code
+                (or None for the default mechanism)
 
         Returns:
             [bytes]: A list of string messages associated with the
                 given code
         """
 
+        key = (code, is_maj, mech_type)
+        if is_maj:
+            with _status_cache_lock:
+                cached = _status_cache.pop(key, None)
+                if cached is not None:
+                    _status_cache[key] = cached
+                    return list(cached)
+
         res = []
         try:
-            msg, ctx, cont = displayStatus(code, is_maj)
+            msg, ctx, cont = displayStatus(code, is_maj, mech_type)
             res.append(msg)
         except GSSError:
             res.append('issue decoding code: {0}'.format(code).encode('utf-8'))
@@ -158,7 +295,7 @@ class GSSError(Exception):
 
         while cont:
             try:
-                msg, ctx, cont = displayStatus(code, is_maj,
+                msg, ctx, cont = displayStatus(code, is_maj, mech_type,
                                                message_context=ctx)
                 res.append(msg)
             except GSSError:
@@ -166,6 +303,12 @@ class GSSError(Exception):
                            'code: {0}'.format(code).encode('utf-8'))
                 cont = False
 
+        if is_maj:
+            with _status_cache_lock:
+                _status_cache[key] = tuple(res)
+                while len(_status_cache) > STATUS_CACHE_SIZE:
+                    _status_cache.popitem(last=False)
+
         return res
 
     def gen_message(self):
@@ -60,11 +60,20 @@ cdef class Name:
         # methods
         cdef OM_uint32 maj_stat, min_stat
         if self.raw_name is not NULL and self._free_on_dealloc:
-            maj_stat = gss_release_name(&min_stat, &self.raw_name)
+            with nogil:
+                maj_stat = gss_release_name(&min_stat, &self.raw_name)
             if maj_stat != GSS_S_COMPLETE:
                 raise GSSError(maj_stat, min_stat)
             self.raw_name = NULL
 
+    def __reduce__(self):
+        # mechanism names can be exported exactly; otherwise, fall back
+        # to the displayed form of the name
+        try:
+            return (importName, (exportName(self), NameType.export))
+        except GSSError:
+            return (importName, displayName(self))
+
 
 def importName(name not None, name_type=NameType.hostbased_service):
     """
@@ -85,7 +94,8 @@ def importName(name not None, name_type=NameType.hostbased_service):
         GSSError
     """
 
-    cdef gss_OID nt = c_get_name_type_oid(name_type)
+    cdef gss_OID_desc nt_desc
+    cdef gss_OID nt = c_get_name_type_oid(name_type, &nt_desc)
 
     # GSS_C_EMPTY_BUFFER
     cdef gss_buffer_desc name_buffer = gss_buffer_desc(0, NULL)
@@ -171,8 +181,9 @@ def compareName(Name name1, Name name2):
 
     cdef OM_uint32 maj_stat, min_stat
 
-    maj_stat = gss_compare_name(&min_stat, name1.raw_name,
-                                name2.raw_name, &is_equal)
+    with nogil:
+        maj_stat = gss_compare_name(&min_stat, name1.raw_name,
+                                    name2.raw_name, &is_equal)
 
     if maj_stat == GSS_S_COMPLETE:
         return <bint>is_equal
@@ -210,12 +221,14 @@ def exportName(Name name not None):
 
     cdef OM_uint32 maj_stat, min_stat
 
-    maj_stat = gss_export_name(&min_stat, name.raw_name, &exported_name)
+    with nogil:
+        maj_stat = gss_export_name(&min_stat, name.raw_name, &exported_name)
 
     if maj_stat == GSS_S_COMPLETE:
         # force conversion to a python string with the specified length
         # (we use the slice to tell cython that we know the length already)
         res = exported_name.value[:exported_name.length]
+        gss_release_buffer(&min_stat, &exported_name)
         return res
     else:
         raise GSSError(maj_stat, min_stat)
@@ -242,7 +255,8 @@ def canonicalizeName(Name name not None, mech_type):
         GSSError
     """
 
-    cdef gss_OID mech_oid = c_get_mech_oid(mech_type)
+    cdef gss_OID_desc mech_oid_desc
+    cdef gss_OID mech_oid = c_get_mech_oid(mech_type, &mech_oid_desc)
     cdef gss_name_t canonicalized_name
 
     cdef OM_uint32 maj_stat, min_stat
@@ -278,7 +292,8 @@ def duplicateName(Name name not None):
 
     cdef OM_uint32 maj_stat, min_stat
 
-    maj_stat = gss_duplicate_name(&min_stat, name.raw_name, &new_name)
+    with nogil:
+        maj_stat = gss_duplicate_name(&min_stat, name.raw_name, &new_name)
 
     cdef Name on = Name()
     if maj_stat == GSS_S_COMPLETE:
@@ -301,7 +316,8 @@ def releaseName(Name name not None):
     """
 
     cdef OM_uint32 maj_stat, min_stat
-    maj_stat = gss_release_name(&min_stat, &name.raw_name)
+    with nogil:
+        maj_stat = gss_release_name(&min_stat, &name.raw_name)
     if maj_stat != GSS_S_COMPLETE:
         raise GSSError(maj_stat, min_stat)
     name.raw_name = NULL
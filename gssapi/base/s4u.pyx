@@ -2,7 +2,7 @@ GSSAPI="BASE"  # This ensures that a full module is generated by Cython
 
 from gssapi.base.cython_types cimport *
 from gssapi.base.cython_converters cimport c_get_mech_oid, c_create_mech_list
-from gssapi.base.cython_converters cimport c_get_mech_oid_set
+from gssapi.base.cython_converters cimport _OIDSet, c_get_mech_oid_set
 from gssapi.base.cython_converters cimport c_py_ttl_to_c, c_c_ttl_to_py
 from gssapi.base.creds cimport Creds
 from gssapi.base.names cimport Name
@@ -68,9 +68,11 @@ def acquireCredImpersonateName(Creds impersonator_cred not None,
         GSSError
     """
 
+    cdef _OIDSet mech_set
     cdef gss_OID_set desired_mechs
     if mechs is not None:
-        desired_mechs = c_get_mech_oid_set(mechs)
+        mech_set = c_get_mech_oid_set(mechs)
+        desired_mechs = mech_set.oid_set
     else:
         desired_mechs = GSS_C_NO_OID_SET
 
@@ -97,10 +99,6 @@ def acquireCredImpersonateName(Creds impersonator_cred not None,
             input_ttl, desired_mechs, usage, &creds, &actual_mechs,
             &actual_ttl)
 
-    cdef OM_uint32 tmp_min_stat
-    if mechs is not None:
-        gss_release_oid_set(&tmp_min_stat, &desired_mechs)
-
     cdef Creds rc = Creds()
     if maj_stat == GSS_S_COMPLETE:
         rc.raw_creds = creds
@@ -153,7 +151,8 @@ def addCredImpersonateName(Creds input_cred not None,
         GSSError
     """
 
-    cdef gss_OID desired_mech = c_get_mech_oid(mech)
+    cdef gss_OID_desc desired_mech_desc
+    cdef gss_OID desired_mech = c_get_mech_oid(mech, &desired_mech_desc)
     cdef OM_uint32 input_initiator_ttl = c_py_ttl_to_c(initiator_ttl)
     cdef OM_uint32 input_acceptor_ttl = c_py_ttl_to_c(acceptor_ttl)
     cdef gss_cred_usage_t usage
@@ -1,8 +1,11 @@
 GSSAPI="BASE"  # This ensures that a full module is generated by Cython
 
 from gssapi.base.cython_types cimport *
+from gssapi.base.buffers cimport c_make_output_buffer
 from gssapi.base.cython_converters cimport c_get_mech_oid, c_create_mech_type
 from gssapi.base.cython_converters cimport c_py_ttl_to_c, c_c_ttl_to_py
+from gssapi.base.cython_converters cimport c_get_input_buffer
+from gssapi.base.cython_converters cimport c_release_input_buffer
 from gssapi.base.creds cimport Creds
 from gssapi.base.names cimport Name
 
@@ -67,6 +70,12 @@ cdef extern from "gssapi.h":
                                      const gss_buffer_t interprocess_token,
                                      gss_ctx_id_t *context) nogil
 
+    OM_uint32 gss_release_name(OM_uint32 *min_stat,
+                               gss_name_t *name) nogil
+
+    OM_uint32 gss_release_cred(OM_uint32 *min_stat,
+                               gss_cred_id_t *creds) nogil
+
 
 cdef class SecurityContext:
     """
@@ -88,18 +97,51 @@ cdef class SecurityContext:
         cdef OM_uint32 maj_stat, min_stat
         if self.raw_ctx is not NULL and self._free_on_dealloc:
             # local deletion only
-            maj_stat = gss_delete_sec_context(&min_stat, &self.raw_ctx,
-                                              GSS_C_NO_BUFFER)
+            with nogil:
+                maj_stat = gss_delete_sec_context(&min_stat, &self.raw_ctx,
+                                                  GSS_C_NO_BUFFER)
             if maj_stat != GSS_S_COMPLETE:
                 raise GSSError(maj_stat, min_stat)
 
             self.raw_ctx = NULL
 
+    def __reduce__(self):
+        # pickling moves the context: exporting it deactivates it here,
+        # and it is recreated with importSecContext on unpickling
+        if self.raw_ctx is NULL:
+            raise TypeError('Cannot pickle an empty (or already exported) '
+                            'SecurityContext')
+
+        token, _ = exportSecContext(self)
+        return (importSecContext, (token,))
+
+    def __copy__(self):
+        # copying via __reduce__ would silently invalidate this context
+        raise TypeError('SecurityContext objects cannot be copied')
+
+    def __deepcopy__(self, memo):
+        raise TypeError('SecurityContext objects cannot be copied')
+
+
+# (int value, flag) pairs, and the decoded flags for each combination
+# seen so far (keyed on just the bits of known flags, so this stays small)
+_FLAG_VALUES = tuple((int(flag), flag) for flag in RequirementFlag)
+cdef OM_uint32 _KNOWN_FLAGS = 0
+for _flag_value, _ in _FLAG_VALUES:
+    _KNOWN_FLAGS |= _flag_value
+_flag_lists = {}
+
 
 cdef inline object c_create_flags_list(OM_uint32 flags):
     """Convert an int to a list of RequirementFlag values."""
 
-    return [flag for flag in RequirementFlag if int(flag) & flags > 0]
+    flags &= _KNOWN_FLAGS
+    res = _flag_lists.get(flags)
+    if res is None:
+        res = tuple(flag for value, flag in _FLAG_VALUES if value & flags)
+        _flag_lists[flags] = res
+
+    return list(res)
 
 
 cdef OM_uint32 c_parse_flags(object flags):
@@ -113,18 +155,210 @@ cdef OM_uint32 c_parse_flags(object flags):
     return res
 
 
+cdef class _ContextResult:
+    """
+    The base class for the results of the context functions
+
+    The results behave like the tuples that were previously returned
+    (they may be indexed, unpacked, and so on), but the fields are also
+    available as attributes, and are only converted to Python objects
+    when first accessed.  The flags are kept as a bitmask, which may be
+    tested directly with :meth:`has`.
+    """
+
+    # the names of the fields, in tuple order
+    _fields = ()
+
+    cdef OM_uint32 _flags
+    cdef gss_OID _mech_type
+    cdef object _decoded_flags
+
+    property flags:
+        """The flags in use (a list of RequirementFlag values)"""
+        def __get__(self):
+            if self._decoded_flags is None:
+                self._decoded_flags = c_create_flags_list(self._flags)
+            return self._decoded_flags
+
+    property raw_flags:
+        """The flags in use, as an integer bitmask"""
+        def __get__(self):
+            return self._flags
+
+    property mech_type:
+        """The mechanism in use (or None if not available)"""
+        def __get__(self):
+            if self._mech_type is NULL:
+                return None
+            return c_create_mech_type(self._mech_type[0])
+
+    def has(self, flag):
+        """
+        has(flag) -> bool
+        Check whether or not the given RequirementFlag is set.
+        """
+        return (self._flags & <OM_uint32>flag) != 0
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(getattr(self, field)
+                         for field in self._fields[index])
+        else:
+            return getattr(self, self._fields[index])
+
+    def __iter__(self):
+        for field in self._fields:
+            yield getattr(self, field)
+
+    def __repr__(self):
+        return '{0}({1})'.format(type(self).__name__, ', '.join(
+            '{0}={1!r}'.format(field, getattr(self, field))
+            for field in self._fields))
+
+
+cdef class InitContextResult(_ContextResult):
+    """
+    The result of initSecContext
+
+    Fields: context, mech_type, flags, token, ttl, continue_needed
+    """
+
+    _fields = ('context', 'mech_type', 'flags', 'token', 'ttl',
+               'continue_needed')
+
+    cdef readonly SecurityContext context
+    cdef readonly object token
+    cdef readonly object ttl
+    cdef readonly bint continue_needed
+
+
+cdef class AcceptContextResult(_ContextResult):
+    """
+    The result of acceptSecContext
+
+    Fields: context, initiator_name, mech_type, token, flags, ttl,
+    delegated_creds, continue_needed
+    """
+
+    _fields = ('context', 'initiator_name', 'mech_type', 'token', 'flags',
+               'ttl', 'delegated_creds', 'continue_needed')
+
+    cdef readonly SecurityContext context
+    cdef readonly object token
+    cdef readonly object ttl
+    cdef readonly bint continue_needed
+
+    cdef gss_name_t _initiator_name
+    cdef gss_cred_id_t _delegated_creds
+    cdef Name _initiator_name_obj
+    cdef Creds _delegated_creds_obj
+
+    def __cinit__(self):
+        self._initiator_name = GSS_C_NO_NAME
+        self._delegated_creds = GSS_C_NO_CREDENTIAL
+
+    def __dealloc__(self):
+        # release anything which was never handed out
+        cdef OM_uint32 min_stat
+        if self._initiator_name is not GSS_C_NO_NAME:
+            with nogil:
+                gss_release_name(&min_stat, &self._initiator_name)
+        if self._delegated_creds is not GSS_C_NO_CREDENTIAL:
+            with nogil:
+                gss_release_cred(&min_stat, &self._delegated_creds)
+
+    property initiator_name:
+        """The name of the initiator"""
+        def __get__(self):
+            if self._initiator_name_obj is None:
+                self._initiator_name_obj = Name()
+                self._initiator_name_obj.raw_name = self._initiator_name
+                self._initiator_name = GSS_C_NO_NAME
+            return self._initiator_name_obj
+
+    property delegated_creds:
+        """
+        The delegated credentials
+
+        These are only valid if the delegate_to_peer flag is set.
+        """
+        def __get__(self):
+            if self._delegated_creds_obj is None:
+                self._delegated_creds_obj = Creds()
+                self._delegated_creds_obj.raw_creds = self._delegated_creds
+                self._delegated_creds = GSS_C_NO_CREDENTIAL
+            return self._delegated_creds_obj
+
+
+cdef class InquireContextResult(_ContextResult):
+    """
+    The result of inquireContext
+
+    Fields: initiator_name, target_name, ttl, mech_type, flags,
+    locally_initiated, complete
+    """
+
+    _fields = ('initiator_name', 'target_name', 'ttl', 'mech_type', 'flags',
+               'locally_initiated', 'complete')
+
+    cdef readonly object ttl
+    cdef readonly bint locally_initiated
+    cdef readonly bint complete
+
+    cdef gss_name_t _initiator_name
+    cdef gss_name_t _target_name
+    cdef Name _initiator_name_obj
+    cdef Name _target_name_obj
+
+    def __cinit__(self):
+        self._initiator_name = GSS_C_NO_NAME
+        self._target_name = GSS_C_NO_NAME
+
+    def __dealloc__(self):
+        # release anything which was never handed out
+        cdef OM_uint32 min_stat
+        if self._initiator_name is not GSS_C_NO_NAME:
+            with nogil:
+                gss_release_name(&min_stat, &self._initiator_name)
+        if self._target_name is not GSS_C_NO_NAME:
+            with nogil:
+                gss_release_name(&min_stat, &self._target_name)
+
+    property initiator_name:
+        """The name of the initiator"""
+        def __get__(self):
+            if self._initiator_name_obj is None:
+                self._initiator_name_obj = Name()
+                self._initiator_name_obj.raw_name = self._initiator_name
+                self._initiator_name = GSS_C_NO_NAME
+            return self._initiator_name_obj
+
+    property target_name:
+        """The name of the target (or None if not available)"""
+        def __get__(self):
+            if (self._target_name_obj is None and
+                    self._target_name is not GSS_C_NO_NAME):
+                self._target_name_obj = Name()
+                self._target_name_obj.raw_name = self._target_name
+                self._target_name = GSS_C_NO_NAME
+            return self._target_name_obj
+
+
 # TODO(sross): add support for channel bindings
 # TODO(sross): figure out whether GSS_C_NO_NAME can be passed in here
 def initSecContext(Name target_name not None, Creds cred=None,
                    SecurityContext context=None,
                    mech_type=None,
                    flags=None, ttl=None, channel_bindings=None,
-                   input_token=None):
+                   input_token=None, as_buffer=False):
     """
     initSecContext(target_name, cred=None, context=None, mech_type=None,
                    flags=None, tll=None, channel_bindings=None,
-                   input_token=None) -> (SecurityContext, MechType,
-                                         [RequirementFlag], bytes, int, bool)
+                   input_token=None,
+                   as_buffer=False) -> InitContextResult
     Initiate a GSSAPI Security Context.
 
     This method initiates a GSSAPI security context, targeting the given
@@ -149,23 +383,28 @@ def initSecContext(Name target_name not None, Creds cred=None,
         ttl (int): the request lifetime of the security context (a value of
             0 or None means indefinite)
         channel_bindings (ChannelBindings): NCI
-        input_token (bytes): the token to use to update the security context,
-            or None if you are creating a new context
+        input_token (buffer): the token to use to update the security
+            context (any contiguous buffer, such as bytes, bytearray, or
+            memoryview), or None if you are creating a new context
+        as_buffer (bool): return the output token as a GSSBuffer wrapping
+            the GSSAPI-allocated memory instead of copying it into bytes
 
     Returns:
-        (SecurityContext, MechType, [RequirementFlag], bytes, int, bool): the
-            output security context, the actual mech type, the actual flags
-            used, the output token to send to the acceptor, the actual
-            lifetime of the context (or None if not supported or indefinite),
-            and whether or not more calls are needed to finish the initiation.
+        InitContextResult: the output security context, the actual mech
+            type, the actual flags used, the output token to send to the
+            acceptor, the actual lifetime of the context (or None if not
+            supported or indefinite), and whether or not more calls are
+            needed to finish the initiation (this may be used like the
+            corresponding tuple)
 
     Raises:
         GSSError
     """
 
     cdef gss_OID mech_oid
+    cdef gss_OID_desc mech_oid_desc
     if mech_type is not None:
-        mech_oid = c_get_mech_oid(mech_type)
+        mech_oid = c_get_mech_oid(mech_type, &mech_oid_desc)
     else:
         mech_oid = GSS_C_NO_OID
 
@@ -191,10 +430,6 @@ def initSecContext(Name target_name not None, Creds cred=None,
     else:
         act_cred = GSS_C_NO_CREDENTIAL
 
-    if input_token is not None:
-        input_token_buffer.value = input_token
-        input_token_buffer.length = len(input_token)
-
     cdef gss_OID actual_mech_type
     # TODO(sross): just import GSS_C_EMPTY_BUFFER == gss_buffer_desc(0, NULL)
     cdef gss_buffer_desc output_token_buffer = gss_buffer_desc(0, NULL)
@@ -203,6 +438,11 @@ def initSecContext(Name target_name not None, Creds cred=None,
 
     cdef OM_uint32 maj_stat, min_stat
 
+    cdef Py_buffer input_token_view
+    if input_token is not None:
+        c_get_input_buffer(input_token, &input_token_view,
+                           &input_token_buffer)
+
     with nogil:
         maj_stat = gss_init_sec_context(&min_stat, act_cred,
                                         &act_ctx,
@@ -213,29 +453,33 @@ def initSecContext(Name target_name not None, Creds cred=None,
                                         &output_token_buffer,
                                         &ret_flags, &output_ttl)
 
+    if input_token is not None:
+        c_release_input_buffer(&input_token_view)
+
     if maj_stat == GSS_S_COMPLETE or maj_stat == GSS_S_CONTINUE_NEEDED:
         output_context = context  # we just used a pointer, so reuse it
         if output_context is None:
             output_context = SecurityContext()
             output_context.raw_ctx = act_ctx
-        output_token = output_token_buffer.value[:output_token_buffer.length]
-        res = (output_context, c_create_mech_type(actual_mech_type[0]),
-               c_create_flags_list(ret_flags), output_token,
-               c_c_ttl_to_py(output_ttl), maj_stat == GSS_S_CONTINUE_NEEDED)
-        gss_release_buffer(&min_stat, &output_token_buffer)
+        res = InitContextResult()
+        res.context = output_context
+        res._mech_type = actual_mech_type
+        res._flags = ret_flags
+        res.token = c_make_output_buffer(&output_token_buffer, as_buffer)
+        res.ttl = c_c_ttl_to_py(output_ttl)
+        res.continue_needed = maj_stat == GSS_S_CONTINUE_NEEDED
         return res
     else:
         raise GSSError(maj_stat, min_stat)
 
 
 def acceptSecContext(input_token not None, Creds acceptor_cred=None,
-                     SecurityContext context=None, channel_bindings=None):
+                     SecurityContext context=None, channel_bindings=None,
+                     as_buffer=False):
     """
     acceptSecContext(input_token, acceptor_cred=None, context=None,
-                     channel_bindings=None) -> (SecurityContext, Name,
-                                                MechType, bytes,
-                                                [RequirementFlag], int, Creds,
-                                                bool)
+                     channel_bindings=None,
+                     as_buffer=False) -> AcceptContextResult
     Accept a GSSAPI security context.
 
     This method accepts a GSSAPI security context using a token sent by the
@@ -247,29 +491,30 @@ def acceptSecContext(input_token not None, Creds acceptor_cred=None,
         This changes the input context!
 
     Args:
-        input_token (bytes): the token sent by the context initiator
+        input_token (buffer): the token sent by the context initiator (any
+            contiguous buffer, such as bytes, bytearray, or memoryview)
         acceptor_cred (Creds): the credentials to be used to accept the context
             (or None to use the default credentials)
         context (SecurityContext): the security context to update
             (or None to create a new security context object)
         channel_bindings: NCI
+        as_buffer (bool): return the output token as a GSSBuffer wrapping
+            the GSSAPI-allocated memory instead of copying it into bytes
 
     Returns:
-        (SecurityContext, Name, MechType, bytes, [RequirementFlag], int,
-         Creds, bool): the resulting security context, the initiator name,
-            the mechanism being used, the output token, the flags in use, the
-            lifetime of the context (or None for indefinite or not supported),
-            the delegated credentials (valid only if the delegate_to_peer flag
-            is set), and whether or not further token exchanges are needed to
-            finalize the security context.
+        AcceptContextResult: the resulting security context, the initiator
+            name, the mechanism being used, the output token, the flags in
+            use, the lifetime of the context (or None for indefinite or not
+            supported), the delegated credentials (valid only if the
+            delegate_to_peer flag is set), and whether or not further token
+            exchanges are needed to finalize the security context (this may
+            be used like the corresponding tuple)
 
     Raises:
         GSSError
     """
 
     cdef gss_channel_bindings_t bdng = GSS_C_NO_CHANNEL_BINDINGS
-    cdef gss_buffer_desc input_token_buffer = gss_buffer_desc(len(input_token),
-                                                              input_token)
     cdef gss_ctx_id_t act_ctx
     if context is not None:
         act_ctx = context.raw_ctx
@@ -277,21 +522,25 @@ def acceptSecContext(input_token not None, Creds acceptor_cred=None,
         act_ctx = GSS_C_NO_CONTEXT
 
     cdef gss_cred_id_t act_acceptor_cred
-    if acceptor_cred is None:
+    if acceptor_cred is not None:
         act_acceptor_cred = acceptor_cred.raw_creds
     else:
         act_acceptor_cred = GSS_C_NO_CREDENTIAL
 
-    cdef gss_name_t initiator_name
-    cdef gss_OID mech_type
+    cdef gss_name_t initiator_name = GSS_C_NO_NAME
+    cdef gss_OID mech_type = GSS_C_NO_OID
     # GSS_C_EMPTY_BUFFER
     cdef gss_buffer_desc output_token_buffer = gss_buffer_desc(0, NULL)
-    cdef OM_uint32 ret_flags
+    cdef OM_uint32 ret_flags = 0
     cdef OM_uint32 output_ttl
-    cdef gss_cred_id_t delegated_cred
+    cdef gss_cred_id_t delegated_cred = GSS_C_NO_CREDENTIAL
 
     cdef OM_uint32 maj_stat, min_stat
 
+    cdef Py_buffer input_token_view
+    cdef gss_buffer_desc input_token_buffer
+    c_get_input_buffer(input_token, &input_token_view, &input_token_buffer)
+
     with nogil:
         maj_stat = gss_accept_sec_context(&min_stat, &act_ctx,
                                           act_acceptor_cred,
@@ -301,31 +550,24 @@ def acceptSecContext(input_token not None, Creds acceptor_cred=None,
                                           &ret_flags, &output_ttl,
                                           &delegated_cred)
 
-    cdef Name on = Name()
-    cdef Creds oc = Creds()
-    if maj_stat == GSS_S_COMPLETE or maj_stat == GSS_S_CONTINUE_NEEDED:
-        if output_ttl == GSS_C_INDEFINITE:
-            output_ttl_py = None
-        else:
-            output_ttl_py = output_ttl
+    c_release_input_buffer(&input_token_view)
 
+    cdef AcceptContextResult res
+    if maj_stat == GSS_S_COMPLETE or maj_stat == GSS_S_CONTINUE_NEEDED:
         output_context = context
         if output_context is None:
             output_context = SecurityContext()
             output_context.raw_ctx = act_ctx
-        output_token = output_token_buffer.value[:output_token_buffer.length]
-        on.raw_name = initiator_name
-        oc.raw_creds = delegated_cred
-        if mech_type is not NULL:
-            py_mech_type = c_create_mech_type(mech_type[0])
-        else:
-            py_mech_type = None
 
-        res = (output_context, on, py_mech_type,
-               output_token, c_create_flags_list(ret_flags),
-               output_ttl_py, oc,
-               maj_stat == GSS_S_CONTINUE_NEEDED)
-        gss_release_buffer(&min_stat, &output_token_buffer)
+        res = AcceptContextResult()
+        res.context = output_context
+        res._initiator_name = initiator_name
+        res._mech_type = mech_type
+        res.token = c_make_output_buffer(&output_token_buffer, as_buffer)
+        res._flags = ret_flags
+        res.ttl = c_c_ttl_to_py(output_ttl)
+        res._delegated_creds = delegated_cred
+        res.continue_needed = maj_stat == GSS_S_CONTINUE_NEEDED
         return res
     else:
         raise GSSError(maj_stat, min_stat)
@@ -333,8 +575,7 @@ def acceptSecContext(input_token not None, Creds acceptor_cred=None,
 
 def inquireContext(SecurityContext context not None):
     """
-    inquireContext(context) -> (Name, Name, int, MechType, [RequirementFlag],
-                                bool, bool)
+    inquireContext(context) -> InquireContextResult
     Get information about a security context.
 
     This method obtains information about a security context, including
@@ -347,11 +588,11 @@ def inquireContext(SecurityContext context not None):
         context (SecurityContext): the context in question
 
     Returns:
-        (Name, Name, int, MechType, [RequirementFlag], bool, bool): the
-            initiator name, the target name, the TTL (can be None for
-            indefinite or not supported), the mech type, the
-            flags, whether or not the context was locally initiated,
+        InquireContextResult: the initiator name, the target name, the TTL
+            (can be None for indefinite or not supported), the mech type,
+            the flags, whether or not the context was locally initiated,
             and whether or not the context is currently fully established
+            (this may be used like the corresponding tuple)
 
     Raises:
         GSSError
@@ -360,34 +601,27 @@ def inquireContext(SecurityContext context not None):
     cdef gss_name_t src_name, target_name
     cdef OM_uint32 ttl
     cdef gss_OID mech_type
-    cdef OM_uint32 flags,
+    cdef OM_uint32 flags
     cdef int locally_init, is_complete
 
     cdef OM_uint32 maj_stat, min_stat
 
-    maj_stat = gss_inquire_context(&min_stat, context.raw_ctx, &src_name,
-                                   &target_name, &ttl, &mech_type, &flags,
-                                   &locally_init, &is_complete)
+    with nogil:
+        maj_stat = gss_inquire_context(&min_stat, context.raw_ctx, &src_name,
+                                       &target_name, &ttl, &mech_type,
+                                       &flags, &locally_init, &is_complete)
 
-    cdef Name sn = Name()
-    cdef Name tn
+    cdef InquireContextResult res
     if maj_stat == GSS_S_COMPLETE:
-        sn.raw_name = src_name
-
-        if target_name == GSS_C_NO_NAME:
-            tn = None
-        else:
-            tn = Name()
-            tn.raw_name = target_name
-
-        if ttl == GSS_C_INDEFINITE:
-            output_ttl = None
-        else:
-            output_ttl = ttl
-
-        return (sn, tn, output_ttl, c_create_mech_type(mech_type[0]),
-                c_create_flags_list(flags), <bint>locally_init,
-                <bint>is_complete)
+        res = InquireContextResult()
+        res._initiator_name = src_name
+        res._target_name = target_name
+        res.ttl = c_c_ttl_to_py(ttl)
+        res._mech_type = mech_type
+        res._flags = flags
+        res.locally_initiated = <bint>locally_init
+        res.complete = <bint>is_complete
+        return res
     else:
         raise GSSError(maj_stat, min_stat)
 
@@ -415,7 +649,8 @@ def contextTime(SecurityContext context not None):
 
     cdef OM_uint32 maj_stat, min_stat
 
-    maj_stat = gss_context_time(&min_stat, context.raw_ctx, &ttl)
+    with nogil:
+        maj_stat = gss_context_time(&min_stat, context.raw_ctx, &ttl)
 
     if maj_stat == GSS_S_COMPLETE:
         return ttl
@@ -438,20 +673,25 @@ def processContextToken(SecurityContext context not None, token):
     Args:
         context (SecurityContext): the security context against which
             to process the token
-        token (bytes): the token to process
+        token (buffer): the token to process (any contiguous buffer,
+            such as bytes, bytearray, or memoryview)
 
     Raises:
         GSSError
     """
 
-    cdef gss_buffer_desc token_buffer = gss_buffer_desc(len(token), token)
-
     cdef OM_uint32 maj_stat, min_stat
 
+    cdef Py_buffer token_view
+    cdef gss_buffer_desc token_buffer
+    c_get_input_buffer(token, &token_view, &token_buffer)
+
     with nogil:
         maj_stat = gss_process_context_token(&min_stat, context.raw_ctx,
                                              &token_buffer)
 
+    c_release_input_buffer(&token_view)
+
     if maj_stat != GSS_S_COMPLETE:
         raise GSSError(maj_stat, min_stat)
 
@@ -463,17 +703,23 @@ def importSecContext(token not None):
 
     This method imports a security context established in another process
     by reading the specified token which was output by exportSecContext.
+    The token may be any contiguous buffer, such as bytes, bytearray,
+    or memoryview.
     """
 
-    cdef gss_buffer_desc token_buffer = gss_buffer_desc(len(token), token)
-
     cdef gss_ctx_id_t ctx
 
     cdef OM_uint32 maj_stat, min_stat
 
+    cdef Py_buffer token_view
+    cdef gss_buffer_desc token_buffer
+    c_get_input_buffer(token, &token_view, &token_buffer)
+
     with nogil:
         maj_stat = gss_import_sec_context(&min_stat, &token_buffer, &ctx)
 
+    c_release_input_buffer(&token_view)
+
     if maj_stat == GSS_S_COMPLETE:
         res = SecurityContext()
         res.raw_ctx = ctx
@@ -482,9 +728,10 @@ def importSecContext(token not None):
         raise GSSError(maj_stat, min_stat)
 
 
-def exportSecContext(SecurityContext context not None):
+def exportSecContext(SecurityContext context not None, as_buffer=False):
     """
-    exportSecContext(context) -> (bytes, SecurityContext)
+    exportSecContext(context, as_buffer=False) -> (bytes or GSSBuffer,
+                                                   SecurityContext)
     Export a context for use in another process
 
     This method exports a security context, deactivating in the current process
@@ -495,10 +742,13 @@ def exportSecContext(SecurityContext context not None):
 
     Args:
         context (SecurityContext): the context to send to another process
+        as_buffer (bool): return the token as a GSSBuffer wrapping the
+            GSSAPI-allocated memory instead of copying it into bytes
 
     Returns:
-        (bytes, SecurityContext): the output token to be imported, and the
-            input security token (now deactivated, same as input context)
+        (bytes or GSSBuffer, SecurityContext): the output token to be
+            imported, and the input security token (now deactivated, same
+            as input context)
 
     Raises:
         GSSError
@@ -513,9 +763,7 @@ def exportSecContext(SecurityContext context not None):
                                           &output_token)
 
     if maj_stat == GSS_S_COMPLETE:
-        res_token = output_token.value[:output_token.length]
-        gss_release_buffer(&min_stat, &output_token)
-        return (res_token, context)
+        return (c_make_output_buffer(&output_token, as_buffer), context)
     else:
         raise GSSError(maj_stat, min_stat)
 
@@ -545,15 +793,16 @@ def deleteSecContext(SecurityContext context not None, local_only=True):
     cdef OM_uint32 maj_stat, min_stat
     # GSS_C_EMPTY_BUFFER
     cdef gss_buffer_desc output_token = gss_buffer_desc(0, NULL)
+    cdef gss_buffer_t output_token_ptr = GSS_C_NO_BUFFER
     if not local_only:
+        output_token_ptr = &output_token
+
+    with nogil:
         maj_stat = gss_delete_sec_context(&min_stat, &context.raw_ctx,
-                                          &output_token)
-    else:
-        maj_stat = gss_delete_sec_context(&min_stat, &context.raw_ctx,
-                                          GSS_C_NO_BUFFER)
+                                          output_token_ptr)
 
     if maj_stat == GSS_S_COMPLETE:
-        res = output_token.value[:output_token.length]
+        res = c_make_output_buffer(&output_token, False)
         context.raw_ctx = NULL
         return res
     else:
@@ -16,6 +16,8 @@ class NameType(IntEnum):
     enum members do not correspond to any numbers
     in the GSSAPI C bindings, and are subject
     to change at any point.
+
+    Other name types may be registered with :func:`registerNameType`.
     """
 
     #  hostbased_service = GSS_C_NT_HOSTBASED_SERVICE
@@ -58,6 +60,26 @@ class RequirementFlag(IntEnum):
     transferable = GSS_C_TRANS_FLAG
 
 
+class SupplementaryStatus(IntEnum):
+    """
+    GSSAPI Supplementary Status Bits
+
+    This IntEnum represents the supplementary information bits
+    which may be set in a major status code (for instance, by
+    unwrap or verifyMIC when tokens are duplicated or arrive
+    out of order).
+
+    The numbers behind the values correspond directly
+    to their C counterparts.
+    """
+
+    continue_needed = GSS_S_CONTINUE_NEEDED
+    duplicate_token = GSS_S_DUPLICATE_TOKEN
+    old_token = GSS_S_OLD_TOKEN
+    unseq_token = GSS_S_UNSEQ_TOKEN
+    gap_token = GSS_S_GAP_TOKEN
+
+
 class MechType(IntEnum):
     """
     GSSAPI Mechanism Types
@@ -68,6 +90,10 @@ class MechType(IntEnum):
     Note that the integers behind these enum members do not
     correspond to any numbers in the GSSAPI C bindings, and are
     subject to change at any point.
+
+    Other mechanisms may be registered with :func:`registerMechType`.
     """
 
     kerberos = 0
+    spnego = 1
+    iakerb = 2
@@ -0,0 +1,420 @@
+import contextlib
+import threading
+import time
+
+import gssapi.base as gss
+from gssapi import streams
+
+
+DEFAULT_MAX_IDLE = 4
+DEFAULT_IDLE_TIMEOUT = 300
+DEFAULT_REFRESH_MARGIN = 60
+DEFAULT_CHECK_INTERVAL = 10
+
+_now = getattr(time, 'monotonic', time.time)
+
+
+def send_token(sock, token):
+    """
+    Send a context establishment token over a socket
+
+    The token is sent as a 4-byte big-endian length followed by the
+    token itself (the same framing used by :class:`GSSSocket` records).
+
+    :param sock: the connected socket
+    :type sock: :class:`socket.socket`
+    :param bytes token: the token to send
+    """
+
+    sock.sendall(streams.RECORD_HEADER.pack(len(token)))
+    sock.sendall(token)
+
+
+def recv_token(sock, max_token_size=streams.DEFAULT_MAX_TOKEN_SIZE):
+    """
+    Receive a context establishment token sent with :func:`send_token`
+
+    :param sock: the connected socket
+    :type sock: :class:`socket.socket`
+    :param int max_token_size: the maximum acceptable token size
+    :returns: the received token
+    :rtype: bytes
+    :raises: IOError if the connection is closed or the token is too large
+    """
+
+    header = bytearray(streams.RECORD_HEADER.size)
+    if (streams._read_exact(sock.recv_into, memoryview(header)) <
+            len(header)):
+        raise IOError('Connection closed while receiving a token')
+
+    length, = streams.RECORD_HEADER.unpack(bytes(header))
+    if length > max_token_size:
+        raise IOError('Token of {0} bytes exceeds the maximum token '
+                      'size ({1} bytes)'.format(length, max_token_size))
+
+    token = bytearray(length)
+    if streams._read_exact(sock.recv_into, memoryview(token)) < length:
+        raise IOError('Connection closed while receiving a token')
+
+    return bytes(token)
+
+
+class PooledContext(object):
+    """
+    An established security context bound to a pooled connection
+
+    The context was established over :attr:`connection`, and so may only
+    be used to protect messages sent over that connection.
+    """
+
+    def __init__(self, key, target_name, flags, mech_type, context,
+                 connection):
+        #: the established security context
+        self.context = context
+        #: the connection over which the context was established
+        self.connection = connection
+        #: the name of the target
+        self.target_name = target_name
+        #: the requested flags
+        self.flags = flags
+        #: the requested mechanism
+        self.mech_type = mech_type
+
+        self.last_used = _now()
+        self._key = key
+
+    def remaining_time(self):
+        """
+        Get the remaining lifetime of the context
+
+        :returns: the number of seconds for which the context remains
+                  valid (0 if it has expired)
+        :rtype: int
+        """
+
+        try:
+            return gss.contextTime(self.context)
+        except gss.GSSError:
+            return 0
+
+
+class ContextPool(object):
+    """
+    A pool of established initiator security contexts
+
+    This class keeps established security contexts, along with the
+    connections over which they were established, keyed by target name,
+    requested flags, and mechanism.  Reusing a pooled context avoids both
+    the TGS lookup (on a cold credentials cache) and the full AP-REQ/AP-REP
+    round trip needed to establish a new one.
+
+    Contexts are validated with :func:`gssapi.base.contextTime` before
+    being handed out: contexts with less than refresh_margin seconds
+    remaining are discarded.  A background thread evicts contexts which
+    have been idle for longer than idle_timeout seconds, and replaces
+    idle contexts which are about to expire with freshly established
+    ones, so that callers don't have to wait for establishment.
+
+    Connections are created with the given connect callable, and the
+    context establishment tokens are exchanged over them with the
+    send_token and recv_token callables (by default, length-prefixed
+    over a socket -- see :func:`send_token` and :func:`recv_token`).
+    """
+
+    def __init__(self, connect, cred=None, max_idle=DEFAULT_MAX_IDLE,
+                 idle_timeout=DEFAULT_IDLE_TIMEOUT,
+                 refresh_margin=DEFAULT_REFRESH_MARGIN,
+                 check_interval=DEFAULT_CHECK_INTERVAL,
+                 send_token=send_token, recv_token=recv_token):
+        """
+        Create and start a new ContextPool
+
+        :param connect: a callable which takes a target name and returns
+                        a new connection to that target
+        :param cred: the initiator credentials to use (or None to use
+                     the default credentials)
+        :type cred: :class:`gssapi.base.Creds`
+        :param int max_idle: the maximum number of idle contexts kept
+                             for each target, flags, and mechanism
+        :param int idle_timeout: the number of seconds after which idle
+                                 contexts are evicted
+        :param int refresh_margin: the minimum remaining lifetime of
+                                   contexts handed out, in seconds
+        :param float check_interval: the number of seconds between checks
+                                     for idle and expiring contexts
+        :param send_token: a callable which takes a connection and a
+                           token, and sends the token
+        :param recv_token: a callable which takes a connection, and
+                           returns the next token received
+        """
+
+        self.cred = cred
+        self.max_idle = max_idle
+        self.idle_timeout = idle_timeout
+        self.refresh_margin = refresh_margin
+        self.check_interval = check_interval
+        self.hits = 0
+        self.misses = 0
+
+        self._connect = connect
+        self._send_token = send_token
+        self._recv_token = recv_token
+
+        self._cond = threading.Condition()
+        self._idle = {}
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._run,
+                                        name='ContextPool')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _key(self, target_name, flags, mech_type):
+        if flags is not None:
+            flags = frozenset(flags)
+
+        return (gss.displayName(target_name), flags, mech_type)
+
+    def _establish(self, key, target_name, flags, mech_type):
+        conn = self._connect(target_name)
+
+        ctx = None
+        try:
+            input_token = None
+            while True:
+                res = gss.initSecContext(target_name, cred=self.cred,
+                                         context=ctx, mech_type=mech_type,
+                                         flags=flags,
+                                         input_token=input_token)
+                ctx = res.context
+                if res.token:
+                    self._send_token(conn, res.token)
+
+                if not res.continue_needed:
+                    break
+
+                input_token = self._recv_token(conn)
+        except BaseException:
+            if ctx is not None:
+                _delete_context(ctx)
+            _close_connection(conn)
+            raise
+
+        return PooledContext(key, target_name, flags, mech_type, ctx, conn)
+
+    def _usable(self, pooled):
+        return pooled.remaining_time() > self.refresh_margin
+
+    def acquire(self, target_name, flags=None, mech_type=None):
+        """
+        Get an established context for the given target
+
+        An idle pooled context is used if one is available (and has
+        enough remaining lifetime), and otherwise a new connection is
+        made and a new context is established over it.  The parameters
+        behave like those of :func:`gssapi.base.initSecContext`.
+
+        The context should be returned with :meth:`release` once the
+        caller is finished with it (or :meth:`discard` if the connection
+        is no longer usable).
+
+        :param target_name: the name of the target
+        :type target_name: :class:`gssapi.base.Name`
+        :returns: the pooled context
+        :rtype: :class:`PooledContext`
+        :raises: :class:`gssapi.base.GSSError`, or any error raised by
+                 the connect, send_token, or recv_token callables
+        """
+
+        key = self._key(target_name, flags, mech_type)
+
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError('Cannot acquire from a closed '
+                                       'ContextPool')
+
+                idle = self._idle.get(key)
+                pooled = idle.pop() if idle else None
+
+            if pooled is None:
+                break
+
+            if self._usable(pooled):
+                with self._cond:
+                    self.hits += 1
+                return pooled
+
+            self._close(pooled)
+
+        with self._cond:
+            self.misses += 1
+
+        return self._establish(key, target_name, flags, mech_type)
+
+    def release(self, pooled):
+        """
+        Return a context to the pool
+
+        The context is kept for reuse (unless it is about to expire, or
+        there are already max_idle idle contexts for the same target).
+
+        :param pooled: the context returned by :meth:`acquire`
+        :type pooled: :class:`PooledContext`
+        """
+
+        if not self._usable(pooled):
+            self._close(pooled)
+            return
+
+        pooled.last_used = _now()
+        with self._cond:
+            # checked under the lock, so that nothing is added after
+            # close() has emptied the pool
+            if not self._closed:
+                idle = self._idle.setdefault(pooled._key, [])
+                if len(idle) < self.max_idle:
+                    idle.append(pooled)
+                    pooled = None
+
+        if pooled is not None:
+            self._close(pooled)
+
+    def discard(self, pooled):
+        """
+        Delete a context and close its connection
+
+        :param pooled: the context returned by :meth:`acquire`
+        :type pooled: :class:`PooledContext`
+        """
+
+        self._close(pooled)
+
+    @contextlib.contextmanager
+    def context(self, target_name, flags=None, mech_type=None):
+        """
+        Use a pooled context within a with statement
+
+        The context is acquired as with :meth:`acquire`, and released on
+        exit from the with block (or discarded if the block raised an
+        exception, since the connection may be in an unknown state).
+        """
+
+        pooled = self.acquire(target_name, flags=flags, mech_type=mech_type)
+        try:
+            yield pooled
+        except BaseException:
+            self.discard(pooled)
+            raise
+        else:
+            self.release(pooled)
+
+    def _close(self, pooled):
+        _delete_context(pooled.context)
+        _close_connection(pooled.connection)
+
+    def _maintain(self):
+        # evict idle contexts, and replace the ones expiring before the
+        # next check while they're still idle
+        now = _now()
+        evicted = []
+        expiring = []
+        with self._cond:
+            for key, idle in list(self._idle.items()):
+                keep = []
+                for pooled in idle:
+                    if now - pooled.last_used > self.idle_timeout:
+                        evicted.append(pooled)
+                        continue
+
+                    remaining = pooled.remaining_time()
+                    if remaining <= self.refresh_margin + self.check_interval:
+                        expiring.append((pooled, remaining))
+                    else:
+                        keep.append(pooled)
+
+                if keep:
+                    self._idle[key] = keep
+                else:
+                    del self._idle[key]
+
+        for pooled in evicted + [old for old, _ in expiring]:
+            self._close(pooled)
+
+        for old, remaining in expiring:
+            if self._closed:
+                break
+
+            try:
+                pooled = self._establish(old._key, old.target_name,
+                                         old.flags, old.mech_type)
+            except Exception:
+                # the next acquire will establish a context itself
+                continue
+
+            # a context established with the same cached ticket expires
+            # along with the old one, so keeping it would just mean
+            # replacing it again on every check
+            if pooled.remaining_time() > remaining:
+                self.release(pooled)
+            else:
+                self._close(pooled)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._closed:
+                    self._cond.wait(self.check_interval)
+                if self._closed:
+                    return
+
+            self._maintain()
+
+    def close(self, wait=True):
+        """
+        Stop the pool, deleting all idle contexts
+
+        Contexts which are currently acquired are deleted when released.
+
+        :param bool wait: whether to wait for the background thread
+                          to finish
+        """
+
+        with self._cond:
+            if self._closed:
+                return
+
+            self._closed = True
+            idle = [pooled for entries in self._idle.values()
+                    for pooled in entries]
+            self._idle.clear()
+            self._cond.notify()
+
+        for pooled in idle:
+            self._close(pooled)
+
+        if wait:
+            self._thread.join()
+
+    def __len__(self):
+        with self._cond:
+            return sum(len(idle) for idle in self._idle.values())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def _delete_context(ctx):
+    try:
+        gss.deleteSecContext(ctx)
+    except gss.GSSError:
+        pass  # nothing else can be done at this point
+
+
+def _close_connection(conn):
+    close = getattr(conn, 'close', None)
+    if close is not None:
+        close()
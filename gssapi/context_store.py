@@ -0,0 +1,190 @@
+import os
+import sqlite3
+import threading
+import time
+
+import gssapi.base as gss
+
+
+_now = time.time
+
+
+class ContextStore(object):
+    """
+    A store of exported security contexts, shared between processes
+
+    This class stores security contexts exported with
+    :func:`gssapi.base.exportSecContext` in an SQLite database file,
+    keyed by a session id, so that any process with access to the file
+    can take over an established context with a single call to
+    :func:`gssapi.base.importSecContext` (instead of establishing a new
+    context).
+
+    Each entry expires when the stored context does (as determined by
+    :func:`gssapi.base.contextTime` when it was stored).  Expired entries
+    are never returned, and may be removed with :meth:`evict_expired`.
+
+    A context can only be in use in one place at a time, so :meth:`take`
+    removes the entry from the store; put the context back with
+    :meth:`put` once finished with it.
+
+    The exported tokens contain the contexts' session keys, so the
+    database file is created readable and writable only by its owner.
+    """
+
+    def __init__(self, path, table='gss_contexts', timeout=5.0):
+        """
+        Create a new ContextStore
+
+        :param str path: the path to the SQLite database file (which is
+                         created if needed)
+        :param str table: the name of the table to use
+        :param float timeout: how long to wait for other processes' locks
+                              on the database
+        """
+
+        self.path = path
+        self.table = table
+        self.timeout = timeout
+
+        self._local = threading.local()
+
+        if not os.path.exists(path):
+            os.close(os.open(path, os.O_CREAT | os.O_RDWR, 0o600))
+
+        with self._connection() as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS {0} ('
+                         'session_id TEXT PRIMARY KEY, '
+                         'token BLOB NOT NULL, '
+                         'expires_at REAL NOT NULL)'.format(self.table))
+            conn.execute('CREATE INDEX IF NOT EXISTS {0}_expires_at '
+                         'ON {0} (expires_at)'.format(self.table))
+
+    def _connection(self):
+        # connections can't be shared between threads, or used after a fork
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout,
+                                   isolation_level=None)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+
+        return _Transaction(conn)
+
+    def put(self, session_id, context, ttl=None):
+        """
+        Export a security context into the store
+
+        The context is exported, so it can no longer be used in this
+        process (use :meth:`take` to get it back).  Any existing entry
+        for the session id is replaced.
+
+        :param str session_id: the session id under which to store the
+                               context
+        :param context: the established security context to store
+        :type context: :class:`gssapi.base.SecurityContext`
+        :param ttl: how long to keep the entry (or None to keep it for
+                    as long as the context remains valid)
+        :type ttl: int or None
+        :returns: whether or not the context was stored (expired or
+                  deleted contexts are neither exported nor stored)
+        :rtype: bool
+        :raises: :class:`gssapi.base.GSSError`
+        """
+
+        if ttl is None:
+            try:
+                ttl = gss.contextTime(context)
+            except gss.GSSError:
+                return False  # already expired (or deleted)
+
+        if ttl <= 0:
+            return False
+
+        token, _ = gss.exportSecContext(context)
+
+        with self._connection() as conn:
+            conn.execute('INSERT OR REPLACE INTO {0} (session_id, token, '
+                         'expires_at) VALUES (?, ?, ?)'.format(self.table),
+                         (session_id, sqlite3.Binary(token), _now() + ttl))
+
+        return True
+
+    def take(self, session_id):
+        """
+        Remove a security context from the store and import it
+
+        :param str session_id: the session id of the context
+        :returns: the imported context, or None if there is no unexpired
+                  context for the given session id
+        :rtype: :class:`gssapi.base.SecurityContext`
+        :raises: :class:`gssapi.base.GSSError`
+        """
+
+        with self._connection() as conn:
+            row = conn.execute('SELECT token, expires_at FROM {0} '
+                               'WHERE session_id = ?'.format(self.table),
+                               (session_id,)).fetchone()
+            if row is None:
+                return None
+
+            conn.execute('DELETE FROM {0} WHERE '
+                         'session_id = ?'.format(self.table), (session_id,))
+
+        token, expires_at = row
+        if expires_at <= _now():
+            return None
+
+        return gss.importSecContext(bytes(token))
+
+    def discard(self, session_id):
+        """
+        Remove a security context from the store without importing it
+
+        :param str session_id: the session id of the context
+        """
+
+        with self._connection() as conn:
+            conn.execute('DELETE FROM {0} WHERE '
+                         'session_id = ?'.format(self.table), (session_id,))
+
+    def evict_expired(self):
+        """
+        Remove all expired contexts from the store
+
+        :returns: the number of contexts removed
+        :rtype: int
+        """
+
+        with self._connection() as conn:
+            cursor = conn.execute('DELETE FROM {0} WHERE '
+                                  'expires_at <= ?'.format(self.table),
+                                  (_now(),))
+            return cursor.rowcount
+
+    def __len__(self):
+        with self._connection() as conn:
+            return conn.execute('SELECT COUNT(*) FROM '
+                                '{0}'.format(self.table)).fetchone()[0]
+
+
+class _Transaction(object):
+    """
+    Runs the enclosed statements in a single immediate transaction
+
+    (the write lock is taken up front, so that concurrent takes
+    of the same session can't both see the context)
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute('BEGIN IMMEDIATE')
+        return self.conn
+
+    def __exit__(self, exc_type, exc_value, tb):
+        if exc_type is None:
+            self.conn.execute('COMMIT')
+        else:
+            self.conn.execute('ROLLBACK')
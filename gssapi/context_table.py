@@ -0,0 +1,515 @@
+import collections
+import contextlib
+import threading
+import time
+
+import gssapi.base as gss
+
+
+DEFAULT_MAX_CONTEXTS = 10000
+DEFAULT_SHARDS = 16
+DEFAULT_HANDSHAKE_TIMEOUT = 60
+
+_now = getattr(time, 'monotonic', time.time)
+
+
+class ContextEntry(object):
+    """
+    A security context stored in a :class:`ContextTable`
+
+    Leases (see :meth:`ContextTable.lease`) are exclusive, since GSSAPI
+    contexts must not be used by several threads at once.  While a
+    context is leased (or waited for), removing it from the table only
+    marks it as retired: it is deleted once the last lease is released,
+    so that it is never deleted while a GSSAPI call is using it in
+    another thread.
+    """
+
+    def __init__(self, context, established, expires_at):
+        #: the security context
+        self.context = context
+        #: whether or not the context is fully established
+        self.established = established
+        #: when the context expires (or, for a half-finished handshake,
+        #: when the handshake times out), in terms of the table's clock
+        self.expires_at = expires_at
+        #: when the context was last used
+        self.last_used = _now()
+        #: the number of bytes of tokens and messages processed
+        self.bytes_processed = 0
+
+        self._lock = threading.Lock()
+        self._use_lock = threading.Lock()
+        self._leases = 0
+        self._retired = False
+        self._evicted = False
+        self._transferred = False
+
+    def _lease(self):
+        with self._lock:
+            if self._retired:
+                return False
+
+            self._leases += 1
+            return True
+
+    def _release(self, transfer=False):
+        # returns whether or not the context should now be deleted
+        with self._lock:
+            self._leases -= 1
+            if transfer:
+                # the context now belongs to another entry
+                self._transferred = True
+
+            return self._should_delete()
+
+    def _retire(self):
+        # returns whether or not the context should now be deleted
+        with self._lock:
+            self._retired = True
+            return self._should_delete()
+
+    def _should_delete(self):
+        return (self._retired and not self._leases and
+                not self._transferred)
+
+
+class _Shard(object):
+    def __init__(self):
+        self.lock = threading.Lock()
+        # least recently used first
+        self.entries = collections.OrderedDict()
+
+
+class ContextTable(object):
+    """
+    A table of acceptor security contexts, keyed by session id
+
+    This class holds one security context per client session, recording
+    when each was last used and how many bytes it has processed.  The
+    number of contexts is capped at max_contexts: when the table is
+    full, expired contexts are evicted first, and then the least
+    recently used ones.  Half-finished handshakes time out after
+    handshake_timeout seconds, and (optionally) contexts idle for longer
+    than idle_timeout seconds are evicted as well.
+
+    Evicted contexts are deleted with :func:`gssapi.base.deleteSecContext`
+    immediately (or, if they are in use in another thread, as soon as
+    that thread is done with them), instead of whenever they happen to be
+    garbage collected.  Use :meth:`lease` (or :meth:`wrap` and
+    :meth:`unwrap`) to use a stored context.
+
+    The table is split into shards, each with its own lock, so that
+    threads working on different sessions rarely contend.  The count
+    limit is enforced per shard (each holding max_contexts / shards
+    contexts).  Expired contexts are only evicted lazily (when looked
+    up, or when making room), so call :meth:`evict_expired` periodically
+    to free them sooner.
+    """
+
+    def __init__(self, max_contexts=DEFAULT_MAX_CONTEXTS,
+                 shards=DEFAULT_SHARDS,
+                 handshake_timeout=DEFAULT_HANDSHAKE_TIMEOUT,
+                 idle_timeout=None):
+        """
+        Create a new ContextTable
+
+        :param int max_contexts: the maximum number of contexts to hold
+        :param int shards: the number of independently locked shards
+        :param int handshake_timeout: the number of seconds in which a
+                                      handshake must be completed
+        :param idle_timeout: the number of seconds after which idle
+                             contexts are evicted (or None to only evict
+                             idle contexts to make room)
+        :type idle_timeout: int or None
+        """
+
+        self.max_contexts = max_contexts
+        self.handshake_timeout = handshake_timeout
+        self.idle_timeout = idle_timeout
+
+        self._shards = [_Shard() for i in range(shards)]
+        self._shard_limit = max(1, -(-max_contexts // shards))
+
+        self._stats_lock = threading.Lock()
+        self._evicted = 0
+        self._expired = 0
+
+    def _shard(self, session_id):
+        return self._shards[hash(session_id) % len(self._shards)]
+
+    def _is_expired(self, entry, now):
+        if entry.expires_at <= now:
+            return True
+
+        return (self.idle_timeout is not None and
+                now - entry.last_used > self.idle_timeout)
+
+    def _expires_at(self, context, established):
+        if not established:
+            return _now() + self.handshake_timeout
+
+        try:
+            return _now() + gss.contextTime(context)
+        except gss.GSSError:
+            return _now()  # already expired
+
+    def _delete_context(self, entry):
+        try:
+            gss.deleteSecContext(entry.context)
+        except gss.GSSError:
+            pass  # nothing else can be done at this point
+
+    def _delete(self, entries, expired=0, evicted=0):
+        # contexts still leased are deleted once their last lease ends
+        for entry in entries:
+            if entry._retire():
+                self._delete_context(entry)
+
+        if expired or evicted:
+            with self._stats_lock:
+                self._expired += expired
+                self._evicted += evicted
+
+    def accept(self, session_id, input_token, acceptor_cred=None,
+               channel_bindings=None):
+        """
+        Accept a context establishment token for a session
+
+        This continues the session's handshake (or starts a new one, if
+        the session has no context or an already established context),
+        storing the resulting context.  If acceptSecContext fails, the
+        session's context is removed.  If the session is removed (or
+        replaced) while the token is being accepted, the resulting context
+        is deleted and KeyError is raised.
+
+        :param session_id: the (hashable) session id
+        :param input_token: the token received from the initiator
+        :param acceptor_cred: the acceptor credentials (or None to use
+                              the default credentials)
+        :type acceptor_cred: :class:`gssapi.base.Creds`
+        :param channel_bindings: the channel bindings (or None)
+        :returns: the result of :func:`gssapi.base.acceptSecContext`
+        :raises: :class:`gssapi.base.GSSError`, or KeyError if the session
+                 was removed in the meantime
+        """
+
+        shard = self._shard(session_id)
+        entry = self._acquire(session_id, established=False)
+        context = entry.context if entry is not None else None
+
+        try:
+            res = gss.acceptSecContext(input_token,
+                                       acceptor_cred=acceptor_cred,
+                                       context=context,
+                                       channel_bindings=channel_bindings)
+        except gss.GSSError:
+            if entry is not None:
+                self._release(entry)
+            self.remove(session_id)
+            raise
+
+        established = not res.continue_needed
+        expires_at = self._expires_at(res.context, established)
+        nbytes = memoryview(input_token).nbytes
+
+        bytes_processed = 0
+        if entry is not None:
+            with shard.lock:
+                updated = shard.entries.get(session_id) is entry
+                if updated:
+                    entry.established = established
+                    entry.expires_at = expires_at
+                    entry.bytes_processed += nbytes
+
+            if updated:
+                self._release(entry)
+                return res
+
+            if not entry._evicted:
+                # the session was removed (or replaced) while in progress,
+                # so don't bring it back -- releasing deletes the context
+                self._release(entry)
+                raise KeyError(session_id)
+
+            # the handshake was evicted to make room while in progress, so
+            # store the context in a new entry, which takes over deleting it
+            self._release(entry, transfer=True)
+            bytes_processed = entry.bytes_processed
+
+        new_entry = ContextEntry(res.context, established, expires_at)
+        new_entry.bytes_processed = bytes_processed + nbytes
+        self._put(shard, session_id, new_entry)
+
+        return res
+
+    def put(self, session_id, context, established=True):
+        """
+        Store a security context for a session
+
+        Any existing context for the session is deleted (unless it is
+        the same context, in which case its entry is updated).
+
+        :param session_id: the (hashable) session id
+        :param context: the security context to store
+        :type context: :class:`gssapi.base.SecurityContext`
+        :param bool established: whether or not the context is fully
+                                 established
+        """
+
+        entry = ContextEntry(context, established,
+                             self._expires_at(context, established))
+        self._put(self._shard(session_id), session_id, entry)
+
+    def _put(self, shard, session_id, entry):
+        now = _now()
+        to_delete = []
+        expired = evicted = 0
+        with shard.lock:
+            old_entry = shard.entries.pop(session_id, None)
+            if old_entry is not None:
+                if old_entry.context is entry.context:
+                    # keep the existing entry, along with its leases
+                    old_entry.established = entry.established
+                    old_entry.expires_at = entry.expires_at
+                    old_entry.last_used = entry.last_used
+                    entry = old_entry
+                else:
+                    to_delete.append(old_entry)
+
+            shard.entries[session_id] = entry
+
+            if len(shard.entries) > self._shard_limit:
+                # make room, evicting expired contexts before live ones
+                for key, other in list(shard.entries.items()):
+                    if other is not entry and self._is_expired(other, now):
+                        del shard.entries[key]
+                        to_delete.append(other)
+                        expired += 1
+
+                while len(shard.entries) > self._shard_limit:
+                    key, other = shard.entries.popitem(last=False)
+                    other._evicted = True
+                    to_delete.append(other)
+                    evicted += 1
+
+        self._delete(to_delete, expired=expired, evicted=evicted)
+
+    def _lease_entry(self, session_id, nbytes=0, established=True):
+        # returns the leased entry, or None if the session has no
+        # unexpired entry in the requested state
+        now = _now()
+        shard = self._shard(session_id)
+        with shard.lock:
+            entry = shard.entries.pop(session_id, None)
+            if entry is None:
+                return None
+
+            if self._is_expired(entry, now):
+                expired_entry = entry
+            else:
+                # re-insert to mark the entry as most recently used
+                shard.entries[session_id] = entry
+                expired_entry = None
+                entry.last_used = now
+
+                # entries are only retired after being removed from
+                # their shard (with the lock held), so this always works
+                if entry.established != established or not entry._lease():
+                    return None
+
+                entry.bytes_processed += nbytes
+
+        if expired_entry is not None:
+            self._delete([expired_entry], expired=1)
+            return None
+
+        return entry
+
+    def _acquire(self, session_id, nbytes=0, established=True):
+        # like _lease_entry, but also waits for exclusive use of the
+        # context (outside of the shard lock)
+        entry = self._lease_entry(session_id, nbytes, established)
+        if entry is None:
+            return None
+
+        entry._use_lock.acquire()
+        if entry._retired or entry.established != established:
+            # removed, or finished by another thread, while waiting
+            self._release(entry)
+            return None
+
+        return entry
+
+    def _release(self, entry, transfer=False):
+        entry._use_lock.release()
+        if entry._release(transfer):
+            self._delete_context(entry)
+
+    @contextlib.contextmanager
+    def lease(self, session_id, nbytes=0):
+        """
+        Use the established security context for a session
+
+        This marks the context as recently used, records the given
+        number of bytes as processed by it, and provides the context
+        for use within a with statement.  Only one thread at a time may
+        lease a given session's context: others wait until the with block
+        exits.  The context won't be deleted until the with block exits,
+        even if it is removed from the table in the meantime (so never
+        keep a reference to it past the end of the block).  Expired
+        contexts are removed instead of being used.
+
+        :param session_id: the (hashable) session id
+        :param int nbytes: the number of bytes about to be processed
+        :returns: a context manager providing the context
+        :raises: KeyError if the session has no established, unexpired
+                 context
+        """
+
+        entry = self._acquire(session_id, nbytes)
+        if entry is None:
+            raise KeyError(session_id)
+
+        try:
+            yield entry.context
+        finally:
+            self._release(entry)
+
+    def entry(self, session_id):
+        """
+        Get the table entry for a session, without marking it as used
+
+        :param session_id: the (hashable) session id
+        :returns: the entry, or None if there is no entry for the session
+        :rtype: :class:`ContextEntry`
+        """
+
+        shard = self._shard(session_id)
+        with shard.lock:
+            return shard.entries.get(session_id)
+
+    def wrap(self, session_id, message, *args, **kwargs):
+        """
+        Wrap a message with a session's context
+
+        The remaining parameters behave like those of
+        :func:`gssapi.base.wrap`.
+
+        :raises: KeyError if the session has no established context
+        """
+
+        with self.lease(session_id, memoryview(message).nbytes) as context:
+            return gss.wrap(context, message, *args, **kwargs)
+
+    def unwrap(self, session_id, message, *args, **kwargs):
+        """
+        Unwrap a message with a session's context
+
+        The remaining parameters behave like those of
+        :func:`gssapi.base.unwrap`.
+
+        :raises: KeyError if the session has no established context
+        """
+
+        with self.lease(session_id, memoryview(message).nbytes) as context:
+            return gss.unwrap(context, message, *args, **kwargs)
+
+    def remove(self, session_id):
+        """
+        Remove and delete the context for a session
+
+        :param session_id: the (hashable) session id
+        :returns: whether or not there was a context for the session
+        :rtype: bool
+        """
+
+        shard = self._shard(session_id)
+        with shard.lock:
+            entry = shard.entries.pop(session_id, None)
+
+        if entry is None:
+            return False
+
+        self._delete([entry])
+        return True
+
+    def evict_expired(self):
+        """
+        Remove and delete all expired contexts
+
+        This removes established contexts which have expired,
+        half-finished handshakes which have timed out, and (if
+        idle_timeout is set) idle contexts.
+
+        :returns: the number of contexts removed
+        :rtype: int
+        """
+
+        now = _now()
+        total = 0
+        for shard in self._shards:
+            with shard.lock:
+                expired = [(key, entry)
+                           for key, entry in shard.entries.items()
+                           if self._is_expired(entry, now)]
+                for key, entry in expired:
+                    del shard.entries[key]
+
+            self._delete([entry for key, entry in expired],
+                         expired=len(expired))
+            total += len(expired)
+
+        return total
+
+    def clear(self):
+        """Remove and delete all contexts"""
+        for shard in self._shards:
+            with shard.lock:
+                entries = list(shard.entries.values())
+                shard.entries.clear()
+
+            self._delete(entries)
+
+    def stats(self):
+        """
+        Get the current statistics for this table
+
+        The statistics include the number of contexts (and how many of
+        those are half-finished handshakes), the total number of bytes
+        processed by the current contexts, and the number of contexts
+        evicted to make room and removed for having expired.
+
+        :rtype: dict
+        """
+
+        contexts = handshakes = bytes_processed = 0
+        for shard in self._shards:
+            with shard.lock:
+                for entry in shard.entries.values():
+                    contexts += 1
+                    if not entry.established:
+                        handshakes += 1
+                    bytes_processed += entry.bytes_processed
+
+        with self._stats_lock:
+            return {
+                'contexts': contexts,
+                'handshakes': handshakes,
+                'bytes_processed': bytes_processed,
+                'evicted': self._evicted,
+                'expired': self._expired,
+            }
+
+    def __contains__(self, session_id):
+        shard = self._shard(session_id)
+        with shard.lock:
+            return session_id in shard.entries
+
+    def __len__(self):
+        count = 0
+        for shard in self._shards:
+            with shard.lock:
+                count += len(shard.entries)
+
+        return count
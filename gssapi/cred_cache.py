@@ -0,0 +1,164 @@
+import threading
+import time
+
+import gssapi.base as gss
+from gssapi.type_wrappers import GSSCredentials
+
+
+DEFAULT_REFRESH_MARGIN = 60
+
+_now = getattr(time, 'monotonic', time.time)
+
+
+class _PendingAcquisition(object):
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class CredentialCache(object):
+    """
+    A cache of acquired credentials
+
+    This class caches the results of :meth:`GSSCredentials.acquire`, keyed
+    by name, usage, and mechanisms, so that repeated acquisitions do not
+    re-read the keytab or credentials cache.  Entries expire refresh_margin
+    seconds before the lifetime reported by acquireCred runs out (entries
+    with an indefinite lifetime never expire).
+
+    When several threads miss on the same key at once, only one of them
+    acquires the credentials, and the rest wait for and share its result
+    (or its error).
+
+    The returned credentials are shared between callers, and so must not
+    be released.
+    """
+
+    def __init__(self, refresh_margin=DEFAULT_REFRESH_MARGIN):
+        """
+        Create a new CredentialCache
+
+        :param int refresh_margin: the number of seconds before expiry
+                                   at which entries are refreshed
+        """
+
+        self.refresh_margin = refresh_margin
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._pending = {}
+
+    def _key(self, name, mechs, cred_usage):
+        if name is None:
+            name_key = None
+        else:
+            name_key = gss.displayName(name)
+
+        if mechs is not None:
+            mechs = tuple(mechs)
+
+        return (name_key, cred_usage, mechs)
+
+    def _acquire(self, name, ttl, mechs, cred_usage):
+        return GSSCredentials.acquire(name, ttl=ttl, mechs=mechs,
+                                      cred_usage=cred_usage)
+
+    def acquire(self, name=None, ttl=None, mechs=None, cred_usage='both'):
+        """
+        Get credentials for the given name, acquiring them if needed
+
+        The parameters behave like those of
+        :func:`gssapi.base.acquireCred` (ttl is only used
+        when acquiring new credentials).
+
+        :returns: the cached or newly acquired credentials
+        :rtype: :class:`gssapi.type_wrappers.GSSCredentials`
+        :raises: :class:`gssapi.base.GSSError`
+        """
+
+        key = self._key(name, mechs, cred_usage)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                creds, expires_at = entry
+                if expires_at is None or _now() < expires_at:
+                    self.hits += 1
+                    return creds
+
+                del self._entries[key]
+
+            self.misses += 1
+            pending = self._pending.get(key)
+            is_leader = pending is None
+            if is_leader:
+                pending = _PendingAcquisition()
+                self._pending[key] = pending
+
+        if not is_leader:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.result
+
+        try:
+            creds = self._acquire(name, ttl, mechs, cred_usage)
+        except BaseException as e:
+            pending.error = e
+            raise
+        else:
+            pending.result = creds
+        finally:
+            with self._lock:
+                del self._pending[key]
+                if pending.error is None:
+                    self._store(key, creds)
+            pending.done.set()
+
+        return creds
+
+    def _store(self, key, creds):
+        if creds.ttl is None:
+            self._entries[key] = (creds, None)
+        elif creds.ttl > self.refresh_margin:
+            expires_at = _now() + creds.ttl - self.refresh_margin
+            self._entries[key] = (creds, expires_at)
+        # otherwise, the credentials are already due for a refresh
+
+    def invalidate(self, name=None, mechs=None, cred_usage='both'):
+        """
+        Remove the entry for the given name, mechanisms, and usage
+
+        The next call to :meth:`acquire` with the same parameters will
+        acquire new credentials.
+        """
+
+        key = self._key(name, mechs, cred_usage)
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Remove all entries from the cache"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+default_cache = CredentialCache()
+
+
+def acquire(name=None, ttl=None, mechs=None, cred_usage='both'):
+    """
+    Get credentials from the process-wide cache
+
+    See :meth:`CredentialCache.acquire`.
+    """
+
+    return default_cache.acquire(name, ttl=ttl, mechs=mechs,
+                                 cred_usage=cred_usage)
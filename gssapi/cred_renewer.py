@@ -0,0 +1,246 @@
+import heapq
+import itertools
+import threading
+import time
+
+from gssapi.type_wrappers import GSSCredentials
+
+
+DEFAULT_REFRESH_MARGIN = 300
+DEFAULT_RETRY_INTERVAL = 30
+
+_now = getattr(time, 'monotonic', time.time)
+
+
+class RenewedCredentials(object):
+    """
+    A set of credentials kept fresh by a :class:`CredentialRenewer`
+
+    The current credentials are available as :attr:`creds`.  When the
+    credentials are renewed, the new credentials replace the old ones in
+    a single assignment, so readers always see a complete set of
+    credentials (callers should read :attr:`creds` each time they need
+    it, instead of holding on to it).
+    """
+
+    def __init__(self, acquire_args):
+        #: the current credentials (:class:`GSSCredentials`)
+        self.creds = None
+        #: the number of times the credentials have been renewed
+        self.renewals = 0
+        #: the error from the last failed renewal (or None)
+        self.last_error = None
+
+        self._acquire_args = acquire_args
+        self._lock = threading.Lock()
+        self._due = None
+        self._active = True
+
+    def _acquire(self):
+        return GSSCredentials.acquire(**self._acquire_args)
+
+
+class CredentialRenewer(object):
+    """
+    Renews credentials in the background before they expire
+
+    This class re-acquires registered credentials on a background thread
+    refresh_margin seconds before they expire, so that a long-running
+    initiator never has a request fail (or pay for re-acquisition) because
+    its credentials (e.g. its Kerberos TGT) ran out.  Credentials with an
+    indefinite lifetime are never renewed.
+
+    The pending renewals are kept in a heap ordered by due time, so the
+    background thread only wakes up when the next renewal is due.
+
+    Credentials are renewed by acquiring them again with the same
+    parameters (GSSAPI has no separate renewal call), so renewal only
+    yields fresh credentials when the mechanism can obtain them itself
+    -- for Kerberos, this means a client keytab must be available.
+    """
+
+    def __init__(self, refresh_margin=DEFAULT_REFRESH_MARGIN,
+                 retry_interval=DEFAULT_RETRY_INTERVAL):
+        """
+        Create and start a new CredentialRenewer
+
+        :param int refresh_margin: the number of seconds before expiry
+                                   at which credentials are renewed
+        :param float retry_interval: the number of seconds to wait before
+                                     retrying a failed renewal (this is
+                                     also the minimum time between
+                                     renewals of the same credentials)
+        """
+
+        self.refresh_margin = refresh_margin
+        self.retry_interval = retry_interval
+
+        self._cond = threading.Condition()
+        self._heap = []
+        self._counter = itertools.count()
+        self._handles = set()
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._run,
+                                        name='CredentialRenewer')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def register(self, name=None, ttl=None, mechs=None, cred_usage='both',
+                 store=None):
+        """
+        Acquire credentials and keep them renewed
+
+        The parameters behave like those of
+        :meth:`GSSCredentials.acquire`, and are reused for each
+        renewal.  The initial acquisition happens immediately, in the
+        calling thread.
+
+        :returns: the handle holding the current credentials
+        :rtype: :class:`RenewedCredentials`
+        :raises: :class:`gssapi.base.GSSError`
+        """
+
+        if self._closed:
+            raise RuntimeError('Cannot register with a closed '
+                               'CredentialRenewer')
+
+        acquire_args = {'name': name, 'ttl': ttl, 'mechs': mechs,
+                        'cred_usage': cred_usage}
+        if store is not None:
+            acquire_args['store'] = store
+
+        handle = RenewedCredentials(acquire_args)
+        handle.creds = handle._acquire()
+
+        with self._cond:
+            self._handles.add(handle)
+            self._schedule(handle, self._renewal_delay(handle.creds))
+
+        return handle
+
+    def unregister(self, handle):
+        """
+        Stop renewing the given credentials
+
+        The handle's current credentials remain usable until they expire.
+
+        :param handle: the handle returned by :meth:`register`
+        :type handle: :class:`RenewedCredentials`
+        """
+
+        with self._cond:
+            handle._active = False
+            handle._due = None
+            self._handles.discard(handle)
+
+    def renew(self, handle):
+        """
+        Renew the given credentials now, in the calling thread
+
+        :param handle: the handle returned by :meth:`register`
+        :type handle: :class:`RenewedCredentials`
+        :raises: :class:`gssapi.base.GSSError`
+        """
+
+        error = self._renew(handle)
+        if error is not None:
+            raise error
+
+    def _renewal_delay(self, creds):
+        if creds.ttl is None:
+            return None
+
+        return max(creds.ttl - self.refresh_margin, self.retry_interval)
+
+    def _schedule(self, handle, delay):
+        # must be called with the lock held; any previous heap entry for
+        # the handle is left in place, and skipped once it comes up
+        if delay is None or not handle._active:
+            handle._due = None
+            return
+
+        handle._due = _now() + delay
+        heapq.heappush(self._heap, (handle._due, next(self._counter), handle))
+        self._cond.notify()
+
+    def _renew(self, handle):
+        # returns the error from the renewal, if any
+        with handle._lock:
+            try:
+                creds = handle._acquire()
+            except Exception as e:
+                error = e
+                delay = self.retry_interval
+            else:
+                handle.creds = creds
+                handle.renewals += 1
+                error = None
+                delay = self._renewal_delay(creds)
+
+            handle.last_error = error
+            with self._cond:
+                self._schedule(handle, delay)
+
+        return error
+
+    def _next_due(self):
+        # returns the next handle to renew, or None once closed
+        with self._cond:
+            while not self._closed:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+
+                due, _, handle = self._heap[0]
+                if due != handle._due:
+                    # the handle was renewed early or unregistered
+                    heapq.heappop(self._heap)
+                    continue
+
+                delay = due - _now()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+
+                heapq.heappop(self._heap)
+                handle._due = None
+                return handle
+
+        return None
+
+    def _run(self):
+        while True:
+            handle = self._next_due()
+            if handle is None:
+                return
+
+            self._renew(handle)
+
+    def close(self, wait=True):
+        """
+        Stop renewing credentials
+
+        :param bool wait: whether to wait for the background thread
+                          to finish
+        """
+
+        with self._cond:
+            if self._closed:
+                return
+
+            self._closed = True
+            self._cond.notify()
+
+        if wait:
+            self._thread.join()
+
+    def __len__(self):
+        with self._cond:
+            return len(self._handles)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
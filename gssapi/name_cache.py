@@ -0,0 +1,104 @@
+import collections
+import threading
+
+import six
+
+import gssapi.base as gss
+
+
+DEFAULT_MAX_SIZE = 512
+
+
+class NameCache(object):
+    """
+    A bounded LRU cache of imported names
+
+    This class caches the results of :func:`gssapi.base.importName`
+    (and, optionally, :func:`gssapi.base.canonicalizeName`), keyed by
+    the name string, the name type, and the mechanism, so that
+    frequently used names (such as the same few services) are not
+    re-imported each time.
+
+    The cached names themselves are never handed out -- each lookup
+    returns a new copy made with :func:`gssapi.base.duplicateName`, which
+    the caller owns and may release as usual.
+    """
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE):
+        """
+        Create a new NameCache
+
+        :param int max_size: the maximum number of names to keep
+        """
+
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._names = collections.OrderedDict()
+
+    def import_name(self, name, name_type=gss.NameType.hostbased_service,
+                    mech=None):
+        """
+        Import a name, using a cached copy if possible
+
+        :param name: the name to import
+        :type name: str or bytes
+        :param name_type: the type of the name
+        :type name_type: :class:`gssapi.base.types.NameType`
+        :param mech: the mechanism for which to canonicalize the name
+                     (or None to skip canonicalization)
+        :type mech: :class:`gssapi.base.types.MechType`
+        :returns: a new copy of the imported name
+        :rtype: :class:`gssapi.base.Name`
+        :raises: :class:`gssapi.base.GSSError`
+        """
+
+        if isinstance(name, six.text_type):
+            name = name.encode('utf-8')
+
+        key = (name, name_type, mech)
+
+        with self._lock:
+            cached_name = self._names.pop(key, None)
+            if cached_name is not None:
+                # re-insert to mark the entry as most recently used
+                self._names[key] = cached_name
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if cached_name is None:
+            cached_name = gss.importName(name, name_type)
+            if mech is not None:
+                cached_name = gss.canonicalizeName(cached_name, mech)
+
+            with self._lock:
+                self._names[key] = cached_name
+                while len(self._names) > self.max_size:
+                    self._names.popitem(last=False)
+
+        return gss.duplicateName(cached_name)
+
+    def clear(self):
+        """Remove all names from the cache"""
+        with self._lock:
+            self._names.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._names)
+
+
+default_cache = NameCache()
+
+
+def import_name(name, name_type=gss.NameType.hostbased_service, mech=None):
+    """
+    Import a name using the process-wide cache
+
+    See :meth:`NameCache.import_name`.
+    """
+
+    return default_cache.import_name(name, name_type, mech)
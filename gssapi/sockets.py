@@ -0,0 +1,187 @@
+import io
+
+from gssapi import streams
+
+
+class _GSSSocketIO(io.RawIOBase):
+    """
+    A raw stream on top of a GSSSocket, for use with makefile
+    """
+
+    def __init__(self, gss_sock, mode):
+        self._gss_sock = gss_sock
+        self._mode = mode
+
+    def readable(self):
+        return 'r' in self._mode
+
+    def writable(self):
+        return 'w' in self._mode
+
+    def readinto(self, b):
+        return self._gss_sock.recv_into(b)
+
+    def write(self, b):
+        self._gss_sock.sendall(b)
+        return len(memoryview(b))
+
+    def fileno(self):
+        return self._gss_sock.fileno()
+
+
+class GSSSocket(object):
+    """
+    A socket which wraps and unwraps all data sent and received
+
+    This class provides an interface similar to that of
+    :class:`ssl.SSLSocket`: data passed to :meth:`sendall` is wrapped
+    (and, by default, encrypted) using the given security context, and
+    sent as records of a 4-byte big-endian length followed by the wrapped
+    token.  Data received is unwrapped into a reusable receive buffer.
+    The wrap and unwrap calls release the GIL.
+
+    Each call to :meth:`sendall` sends at least one record.  To coalesce
+    small writes into records of up to :attr:`max_chunk_size` bytes,
+    use a file returned by ``makefile('wb')``, which buffers writes.
+
+    The underlying socket must be in blocking mode (it may have a timeout,
+    but a timeout in the middle of a record leaves the stream unusable).
+    """
+
+    def __init__(self, sock, context, confidential=True, qop=None,
+                 max_token_size=streams.DEFAULT_MAX_TOKEN_SIZE):
+        """
+        Create a new GSSSocket
+
+        :param sock: the underlying connected socket
+        :type sock: :class:`socket.socket`
+        :param context: the established security context to use
+        :type context: :class:`gssapi.base.SecurityContext`
+        :param bool confidential: whether or not to encrypt the data
+        :param qop: the QoP to use (or None for the default)
+        :param int max_token_size: the maximum size of a single wrapped token
+        """
+
+        self.sock = sock
+        self.context = context
+        self._writer = streams._RecordWriter(context, self._send_record,
+                                             confidential=confidential,
+                                             qop=qop,
+                                             max_token_size=max_token_size)
+        self._reader = streams._RecordReader(context, sock.recv_into,
+                                             max_token_size=max_token_size)
+
+    @property
+    def max_chunk_size(self):
+        """The maximum amount of data sent in a single record"""
+        return self._writer.max_chunk_size
+
+    def _send_record(self, header, token):
+        if not hasattr(self.sock, 'sendmsg'):
+            self.sock.sendall(header)
+            self.sock.sendall(token)
+            return
+
+        # try to send the header and token with a single system call
+        sent = self.sock.sendmsg([header, token])
+        if sent < len(header):
+            self.sock.sendall(header[sent:])
+            sent = len(header)
+
+        token_view = memoryview(token)[sent - len(header):]
+        if len(token_view):
+            self.sock.sendall(token_view)
+
+    def sendall(self, data):
+        """
+        Wrap and send all of the given data
+
+        :param data: the data to send (any contiguous buffer)
+        """
+
+        self._writer.write(data)
+
+    def recv_into(self, buffer, nbytes=0):
+        """
+        Receive and unwrap data into the given buffer
+
+        At most one record is read from the socket.  A return value
+        of 0 indicates that the remote end has closed the connection.
+
+        :param buffer: the writable buffer to fill
+        :param int nbytes: the maximum number of bytes to receive
+                           (or 0 to fill the whole buffer)
+        :returns: the number of bytes received
+        :rtype: int
+        """
+
+        view = memoryview(buffer)
+        if nbytes:
+            view = view[:nbytes]
+
+        return self._reader.readinto(view)
+
+    def recv(self, bufsize):
+        """
+        Receive and unwrap up to bufsize bytes
+
+        :param int bufsize: the maximum number of bytes to receive
+        :returns: the received data (empty if the connection was closed)
+        :rtype: bytes
+        """
+
+        buffer = bytearray(bufsize)
+        count = self.recv_into(buffer)
+        return bytes(buffer[:count])
+
+    def makefile(self, mode='rb', buffering=None):
+        """
+        Create a file object for this socket
+
+        Files opened for writing buffer up to :attr:`max_chunk_size`
+        bytes before wrapping them, so that many small writes are
+        sent as a single record.
+
+        :param str mode: 'rb' or 'wb'
+        :param int buffering: the buffer size (or None for the default)
+        """
+
+        if mode not in ('rb', 'wb'):
+            raise ValueError("Invalid mode {0!r} (only 'rb' and 'wb' are "
+                             "supported)".format(mode))
+
+        raw = _GSSSocketIO(self, mode)
+        if buffering == 0:
+            return raw
+        elif mode == 'rb':
+            return io.BufferedReader(raw,
+                                     buffering or io.DEFAULT_BUFFER_SIZE)
+        else:
+            return io.BufferedWriter(raw, buffering or self.max_chunk_size)
+
+    def fileno(self):
+        return self.sock.fileno()
+
+    def settimeout(self, timeout):
+        self.sock.settimeout(timeout)
+
+    def gettimeout(self):
+        return self.sock.gettimeout()
+
+    def getpeername(self):
+        return self.sock.getpeername()
+
+    def getsockname(self):
+        return self.sock.getsockname()
+
+    def shutdown(self, how):
+        self.sock.shutdown(how)
+
+    def close(self):
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,236 @@
+import io
+import struct
+
+import gssapi.base as gss
+
+
+# each record is a 4-byte big-endian length followed by a wrapped token
+RECORD_HEADER = struct.Struct('>I')
+
+DEFAULT_MAX_TOKEN_SIZE = 65536
+
+
+def _write_all(write, data):
+    view = memoryview(data)
+    while len(view):
+        written = write(view)
+        if written is None:
+            raise IOError('Cannot write records to a non-blocking stream')
+        view = view[written:]
+
+
+def _read_exact(readinto, view):
+    """Fill the given memoryview, returning the number of bytes read.
+
+    Anything less than len(view) means that EOF was reached.
+    """
+
+    pos = 0
+    while pos < len(view):
+        read = readinto(view[pos:])
+        if not read:
+            break
+        pos += read
+
+    return pos
+
+
+class _RecordWriter(object):
+    """
+    Splits data into wrapped, length-prefixed records
+
+    The maximum chunk size is computed once with wrapSizeLimit, so that
+    every output token (not including the 4-byte length header) fits
+    within max_token_size.
+    """
+
+    def __init__(self, context, send_record, confidential=True, qop=None,
+                 max_token_size=DEFAULT_MAX_TOKEN_SIZE):
+        self.context = context
+        self.confidential = confidential
+        self.qop = qop
+        self.max_token_size = max_token_size
+        self._send_record = send_record
+        self._max_chunk = None
+
+    @property
+    def max_chunk_size(self):
+        """The maximum amount of plaintext sent in a single record"""
+        if self._max_chunk is None:
+            self._max_chunk = gss.wrapSizeLimit(self.context,
+                                                self.max_token_size,
+                                                confidential=self.confidential,
+                                                qop=self.qop)
+        return self._max_chunk
+
+    def write(self, data):
+        view = memoryview(data)
+        max_chunk = self.max_chunk_size
+        for pos in range(0, len(view), max_chunk):
+            token, _ = gss.wrap(self.context, view[pos:pos + max_chunk],
+                                confidential=self.confidential,
+                                qop=self.qop, as_buffer=True)
+            self._send_record(RECORD_HEADER.pack(len(token)), token)
+
+        return len(view)
+
+
+class _RecordReader(object):
+    """
+    Reads length-prefixed records and unwraps them incrementally
+
+    Records are read into a single reusable buffer (which never grows
+    beyond max_token_size), and the plaintext of at most one record is
+    held at any given time.
+    """
+
+    def __init__(self, context, readinto,
+                 max_token_size=DEFAULT_MAX_TOKEN_SIZE):
+        self.context = context
+        self.max_token_size = max_token_size
+        self._readinto = readinto
+        self._header = bytearray(RECORD_HEADER.size)
+        self._record = bytearray()
+        self._pending = None
+        self._pending_pos = 0
+
+    def _next_record(self):
+        """Read and unwrap the next record, returning False on EOF"""
+
+        read = _read_exact(self._readinto, memoryview(self._header))
+        if read == 0:
+            return False
+        elif read < len(self._header):
+            raise EOFError('Truncated record header')
+
+        (length,) = RECORD_HEADER.unpack(bytes(self._header))
+        if length > self.max_token_size:
+            raise IOError('Record of {0} bytes exceeds the maximum token '
+                          'size of {1}'.format(length, self.max_token_size))
+
+        if len(self._record) < length:
+            self._record = bytearray(length)
+
+        token = memoryview(self._record)[:length]
+        if _read_exact(self._readinto, token) < length:
+            raise EOFError('Truncated record')
+
+        plaintext, _, _ = gss.unwrap(self.context, token, as_buffer=True)
+        self._pending = memoryview(plaintext)
+        self._pending_pos = 0
+        return True
+
+    def readinto(self, b):
+        out = memoryview(b)
+        while self._pending is None or self._pending_pos >= len(self._pending):
+            self._pending = None
+            if not self._next_record():
+                return 0
+
+        count = min(len(out), len(self._pending) - self._pending_pos)
+        out[:count] = self._pending[self._pending_pos:self._pending_pos +
+                                    count]
+        self._pending_pos += count
+        return count
+
+
+class WrapWriter(io.RawIOBase):
+    """
+    A writable stream that wraps data written to it
+
+    This class wraps (and, by default, encrypts) everything written to it
+    using the given security context, writing the results to the underlying
+    raw stream as records consisting of a 4-byte big-endian length followed
+    by the wrapped token.  Data is split into chunks sized using a cached
+    wrapSizeLimit result, so no record's token exceeds max_token_size, and
+    memory usage is independent of the total amount of data written.
+
+    To coalesce small writes into fewer records, wrap the writer in an
+    :class:`io.BufferedWriter` (with a buffer size of max_chunk_size).
+    """
+
+    def __init__(self, raw, context, confidential=True, qop=None,
+                 max_token_size=DEFAULT_MAX_TOKEN_SIZE):
+        """
+        Create a new WrapWriter
+
+        :param raw: the underlying writable stream
+        :param context: the established security context to use
+        :type context: :class:`gssapi.base.SecurityContext`
+        :param bool confidential: whether or not to encrypt the data
+        :param qop: the QoP to use (or None for the default)
+        :param int max_token_size: the maximum size of a single wrapped token
+        """
+
+        self.raw = raw
+        self._writer = _RecordWriter(context, self._send_record,
+                                     confidential=confidential, qop=qop,
+                                     max_token_size=max_token_size)
+
+    @property
+    def max_chunk_size(self):
+        return self._writer.max_chunk_size
+
+    def _send_record(self, header, token):
+        _write_all(self.raw.write, header)
+        _write_all(self.raw.write, token)
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        if self.closed:
+            raise ValueError('I/O operation on closed file')
+        return self._writer.write(b)
+
+    def flush(self):
+        super(WrapWriter, self).flush()
+        if hasattr(self.raw, 'flush'):
+            self.raw.flush()
+
+    def close(self):
+        if not self.closed:
+            try:
+                self.flush()
+            finally:
+                super(WrapWriter, self).close()
+                self.raw.close()
+
+
+class UnwrapReader(io.RawIOBase):
+    """
+    A readable stream that unwraps data read from it
+
+    This class reads records (as written by :class:`WrapWriter`) from the
+    underlying raw stream, and unwraps them using the given security
+    context.  Records are decrypted one at a time into a reusable buffer,
+    so memory usage is independent of the total amount of data read.
+    """
+
+    def __init__(self, raw, context, max_token_size=DEFAULT_MAX_TOKEN_SIZE):
+        """
+        Create a new UnwrapReader
+
+        :param raw: the underlying readable stream (which must support
+                    readinto)
+        :param context: the established security context to use
+        :type context: :class:`gssapi.base.SecurityContext`
+        :param int max_token_size: the maximum size of a single wrapped token
+        """
+
+        self.raw = raw
+        self._reader = _RecordReader(context, raw.readinto,
+                                     max_token_size=max_token_size)
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        if self.closed:
+            raise ValueError('I/O operation on closed file')
+        return self._reader.readinto(b)
+
+    def close(self):
+        if not self.closed:
+            super(UnwrapReader, self).close()
+            self.raw.close()
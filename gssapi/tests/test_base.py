@@ -1,10 +1,16 @@
 import copy
+import multiprocessing
 import os
+import pickle
 import socket
+import threading
+import time
+import unittest
 
 import should_be.all  # noqa
 
 import gssapi.base as gb
+from gssapi.base import cython_converters
 from gssapi.tests import k5test as kt
 
 
@@ -82,6 +88,18 @@ class TestBaseUtilities(_GSSAPIKerberosTestCase):
         exported_name.should_be_a(bytes)
         exported_name.shouldnt_be_empty()
 
+    def test_pickle_name(self):
+        service_name = gb.importName(TARGET_SERVICE_NAME)
+        unpickled_name = pickle.loads(pickle.dumps(service_name))
+        unpickled_name.should_be_a(gb.Name)
+        gb.compareName(service_name, unpickled_name).should_be_true()
+
+        mech_name = gb.canonicalizeName(
+            gb.importName(self.ADMIN_PRINC, gb.NameType.principal),
+            gb.MechType.kerberos)
+        unpickled_name = pickle.loads(pickle.dumps(mech_name))
+        gb.exportName(unpickled_name).should_be(gb.exportName(mech_name))
+
     def test_duplicate_name(self):
         orig_name = gb.importName(TARGET_SERVICE_NAME)
         new_name = gb.duplicateName(orig_name)
@@ -133,6 +151,55 @@ class TestBaseUtilities(_GSSAPIKerberosTestCase):
         cont.should_be_a(bool)
         cont.should_be_false()
 
+    def test_gss_error_message(self):
+        # GSS_S_BAD_NAME, with no minor code
+        err = gb.GSSError(0x20000, 0)
+        err._args.should_be_none()
+
+        str(err).should_include('Major (131072)')
+        err.args.should_have_length(1)
+        err.args[0].should_be(str(err))
+
+        copied = pickle.loads(pickle.dumps(err))
+        copied.maj_code.should_be(err.maj_code)
+        copied.min_code.should_be(err.min_code)
+        str(copied).should_be(str(err))
+
+    def test_acquire_creds_explicit_mechs(self):
+        name = gb.importName(SERVICE_PRINCIPAL,
+                             gb.NameType.principal)
+
+        for i in range(2):
+            creds, actual_mechs, _ = gb.acquireCred(
+                name, mechs=[gb.MechType.kerberos])
+            actual_mechs.should_be([gb.MechType.kerberos])
+
+        # unregistered mechanisms may be specified by their OID elements
+        krb5_oid = b'\x2a\x86\x48\x86\xf7\x12\x01\x02\x02'
+        registered = len(cython_converters._mechs_by_value)
+        mech_sets = len(cython_converters._mech_sets)
+        creds, actual_mechs, _ = gb.acquireCred(name, mechs=[krb5_oid])
+        actual_mechs.should_be([gb.MechType.kerberos])
+
+        # ...without being added to the registry
+        len(cython_converters._mechs_by_value).should_be(registered)
+        len(cython_converters._mech_sets).should_be(mech_sets)
+
+        gb.acquireCred.should_raise(ValueError, name,
+                                    mechs=['not a mechanism'])
+
+    def test_register_mech_type(self):
+        test_oid = b'\x2b\x06\x01\x04\x01\x99\x99'
+        gb.registerMechType('test-mech', test_oid)
+        gb.registerMechType('test-mech', test_oid)  # no-op
+
+        gb.registerMechType.should_raise(ValueError, 'spnego-alias',
+                                         b'\x2b\x06\x01\x05\x05\x02')
+        gb.registerMechType.should_raise(ValueError, gb.MechType.kerberos,
+                                         b'\x2b\x06\x01\x05\x05\x99')
+        gb.registerNameType.should_raise(ValueError, gb.NameType.user,
+                                         b'\x2b\x06\x01\x05\x06\x99')
+
     def test_acquire_creds(self):
         name = gb.importName(SERVICE_PRINCIPAL,
                              gb.NameType.principal)
@@ -152,6 +219,90 @@ class TestBaseUtilities(_GSSAPIKerberosTestCase):
         gb.releaseName(name)
         gb.releaseCred(creds)
 
+    def test_inquire_creds(self):
+        name = gb.importName(SERVICE_PRINCIPAL,
+                             gb.NameType.principal)
+        creds = gb.acquireCred(name, cred_usage='initiate')[0]
+
+        inq_name, ttl, usage, mechs = gb.inquireCred(creds)
+        gb.compareName(inq_name, name).should_be_true()
+        ttl.should_be_an_integer()
+        usage.should_be('initiate')
+        mechs.should_include(gb.MechType.kerberos)
+
+        res = gb.inquireCred(creds, name=False, cred_usage=False,
+                             mechs=False)
+        res[0].should_be_none()
+        res[2].should_be_none()
+        res[3].should_be_none()
+
+        # the lifetime may have ticked down between the two calls
+        elapsed = ttl - res[1]
+        elapsed.should_be_at_least(0)
+        elapsed.should_be_less_than(5)
+
+    def test_inquire_creds_by_mech(self):
+        name = gb.importName(SERVICE_PRINCIPAL,
+                             gb.NameType.principal)
+        creds = gb.acquireCred(name, cred_usage='initiate')[0]
+
+        inq_name, init_ttl, accept_ttl, usage = gb.inquireCredByMech(
+            creds, gb.MechType.kerberos)
+        gb.compareName(inq_name, name).should_be_true()
+        init_ttl.should_be_an_integer()
+        usage.should_be('initiate')
+
+        gb.inquireCredByMech(creds, gb.MechType.kerberos, name=False,
+                             acceptor_ttl=False, cred_usage=False)[0] \
+            .should_be_none()
+
+    def test_acquire_creds_from_store(self):
+        name = gb.importName(SERVICE_PRINCIPAL,
+                             gb.NameType.principal)
+
+        store = {'keytab': self.realm.keytab,
+                 'ccache': 'MEMORY:acquire_from_store'}
+        creds, actual_mechs, ttl = gb.acquireCred(name, cred_usage='accept',
+                                                  store=store)
+        creds.should_be_a(gb.Creds)
+        actual_mechs.should_include(gb.MechType.kerberos)
+
+        # byte strings work too, as does calling acquireCredFrom directly
+        store = {b'ccache': self.realm.ccache.encode('utf-8')}
+        creds = gb.acquireCredFrom(store, name, cred_usage='initiate')[0]
+        creds.should_be_a(gb.Creds)
+
+        gb.acquireCred.should_raise(TypeError, name, store={'keytab': 1})
+        gb.acquireCred.should_raise(gb.GSSError, name, cred_usage='accept',
+                                    store={'keytab': '/nonexistent'})
+
+    def test_export_import_creds(self):
+        name = gb.importName(SERVICE_PRINCIPAL,
+                             gb.NameType.principal)
+        creds = gb.acquireCred(name)[0]
+
+        token = gb.exportCred(creds)
+        token.should_be_a(bytes)
+        token.shouldnt_be_empty()
+
+        imported_creds = gb.importCred(token)
+        imported_creds.should_be_a(gb.Creds)
+
+        # the original credentials are still usable after exporting
+        gb.exportCred(creds).should_be(token)
+        gb.importCred(bytearray(token)).should_be_a(gb.Creds)
+
+    def test_pickle_creds(self):
+        name = gb.importName(SERVICE_PRINCIPAL,
+                             gb.NameType.principal)
+        creds = gb.acquireCred(name)[0]
+
+        unpickled_creds = pickle.loads(pickle.dumps(creds))
+        unpickled_creds.should_be_a(gb.Creds)
+        gb.exportCred(unpickled_creds).should_be(gb.exportCred(creds))
+
+        pickle.dumps.should_raise(TypeError, gb.Creds())
+
     def test_context_time(self):
         target_name = gb.importName(TARGET_SERVICE_NAME)
         ctx_resp = gb.initSecContext(target_name)
@@ -285,6 +436,62 @@ class TestBaseUtilities(_GSSAPIKerberosTestCase):
         # __dealloc__ (b/c cython)
 
 
+class TestThreadedCalls(_GSSAPIKerberosTestCase):
+    ITERATIONS = 100
+    THREADS = 4
+
+    def _name_and_cred_calls(self, errors):
+        try:
+            for i in range(self.ITERATIONS):
+                name = gb.importName(SERVICE_PRINCIPAL,
+                                     gb.NameType.principal)
+                canon_name = gb.canonicalizeName(name, gb.MechType.kerberos)
+                gb.exportName(canon_name)
+                gb.displayName(canon_name)
+                gb.compareName(name, gb.duplicateName(name))
+
+                creds, _, _ = gb.acquireCred(canon_name,
+                                             cred_usage='accept')
+                gb.releaseCred(creds)
+        except Exception as e:
+            errors.append(e)
+
+    def _run_threads(self, count):
+        errors = []
+        threads = [threading.Thread(target=self._name_and_cred_calls,
+                                    args=(errors,))
+                   for i in range(count)]
+
+        start = time.time()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.time() - start
+
+        errors.should_be_empty()
+        return elapsed
+
+    def test_concurrent_calls(self):
+        self._run_threads(self.THREADS)
+
+    # timing depends on the load on the machine, so this is a benchmark
+    # which must be explicitly enabled, rather than a regular test
+    @unittest.skipUnless(os.environ.get('GSSAPI_RUN_BENCHMARKS'),
+                         'set GSSAPI_RUN_BENCHMARKS to run benchmarks')
+    @unittest.skipIf(multiprocessing.cpu_count() < THREADS,
+                     'scaling requires at least one core per thread')
+    def test_concurrent_calls_scale(self):
+        # warm up the keytab and ccache before timing anything
+        self._run_threads(1)
+
+        serial = sum(self._run_threads(1) for i in range(self.THREADS))
+        parallel = self._run_threads(self.THREADS)
+
+        # with the GIL held, the threads would run one at a time
+        parallel.should_be_less_than(serial * 0.75)
+
+
 class TestInitContext(_GSSAPIKerberosTestCase):
     def setUp(self):
         self.target_name = gb.importName(TARGET_SERVICE_NAME)
@@ -369,6 +576,26 @@ class TestAcceptContext(_GSSAPIKerberosTestCase):
 
         cont_needed.should_be_a(bool)
 
+    def test_accept_context_result_fields(self):
+        server_resp = gb.acceptSecContext(self.client_token,
+                                          acceptor_cred=self.server_creds)
+        self.server_ctx = server_resp.context
+
+        server_resp.should_be_a(gb.AcceptContextResult)
+        len(server_resp).should_be(8)
+        server_resp[0].should_be(server_resp.context)
+        server_resp[-1].should_be(server_resp.continue_needed)
+        server_resp[2:4].should_be((gb.MechType.kerberos, server_resp.token))
+
+        server_resp.initiator_name.should_be_a(gb.Name)
+        server_resp.initiator_name.should_be(server_resp[1])
+
+        server_resp.has(gb.RequirementFlag.mutual_authentication).should_be(
+            gb.RequirementFlag.mutual_authentication in server_resp.flags)
+        server_resp.has(gb.RequirementFlag.delegate_to_peer).should_be_false()
+        (server_resp.raw_flags &
+         gb.RequirementFlag.mutual_authentication).shouldnt_be(0)
+
 
 class TestWrapUnwrap(_GSSAPIKerberosTestCase):
     def setUp(self):
@@ -489,3 +716,223 @@ class TestWrapUnwrap(_GSSAPIKerberosTestCase):
         unwrapped_message.should_be_a(bytes)
         unwrapped_message.shouldnt_be_empty()
         unwrapped_message.should_be(b'test message')
+
+    def test_wrap_unwrap_buffer_inputs(self):
+        message = bytearray(b'test message')
+        (wrapped_message, conf) = gb.wrap(self.client_ctx, message)
+
+        wrapped_message.should_be_a(bytes)
+        wrapped_message.shouldnt_be_empty()
+
+        recv_buffer = bytearray(len(wrapped_message) + 16)
+        recv_buffer[:len(wrapped_message)] = wrapped_message
+        token_view = memoryview(recv_buffer)[:len(wrapped_message)]
+
+        (unwrapped_message, conf, qop) = gb.unwrap(self.server_ctx,
+                                                   token_view)
+        unwrapped_message.should_be(b'test message')
+
+    def test_get_verify_mic_buffer_inputs(self):
+        message = memoryview(b'some message')
+        mic_token = gb.getMIC(self.client_ctx, message)
+
+        qop_used = gb.verifyMIC(self.server_ctx, bytearray(b'some message'),
+                                bytearray(mic_token))
+        qop_used.should_be_an_integer()
+
+        gb.wrap.should_raise(TypeError, self.client_ctx, 12345)
+
+    def test_wrap_unwrap_as_buffer(self):
+        (wrapped_message, conf) = gb.wrap(self.client_ctx, b'test message',
+                                          as_buffer=True)
+
+        wrapped_message.should_be_a(gb.GSSBuffer)
+        len(wrapped_message).should_be_greater_than(len(b'test message'))
+
+        (unwrapped_message, conf, qop) = gb.unwrap(self.server_ctx,
+                                                   wrapped_message,
+                                                   as_buffer=True)
+
+        unwrapped_message.should_be_a(gb.GSSBuffer)
+        bytes(memoryview(unwrapped_message)).should_be(b'test message')
+        unwrapped_message.tobytes().should_be(b'test message')
+
+        view = memoryview(unwrapped_message)
+        unwrapped_message.release.should_raise(BufferError)
+        view.release()
+        unwrapped_message.release()
+        len(unwrapped_message).should_be(0)
+
+    def test_wrap_unwrap_many(self):
+        messages = [b'message one', bytearray(b'message two'), b'']
+        wrapped = gb.wrapMany(self.client_ctx, messages)
+
+        wrapped.should_have_length(3)
+        for (tok, conf) in wrapped:
+            tok.should_be_a(bytes)
+            tok.shouldnt_be_empty()
+            conf.should_be_true()
+
+        tokens = [tok for (tok, conf) in wrapped]
+        tokens[2] = b'not a valid token'
+        unwrapped = gb.unwrapMany(self.server_ctx, tokens)
+
+        unwrapped.should_have_length(3)
+        for (msg, conf, qop), expected in zip(unwrapped[:2],
+                                              [b'message one',
+                                               b'message two']):
+            msg.should_be(expected)
+            conf.should_be_true()
+            qop.should_be_an_integer()
+
+        unwrapped[2].should_be_a(gb.GSSError)
+
+    def test_unwrap_many_duplicate_token(self):
+        (tok, conf) = gb.wrap(self.client_ctx, b'test message')
+
+        unwrapped = gb.unwrapMany(self.server_ctx, [tok, tok])
+
+        unwrapped.should_have_length(2)
+        unwrapped[0][0].should_be(b'test message')
+
+        # the replayed token is reported, not silently accepted
+        unwrapped[1].should_be_a(gb.GSSError)
+        dup = unwrapped[1].maj_code & gb.SupplementaryStatus.duplicate_token
+        dup.shouldnt_be(0)
+
+    def test_get_verify_mic_many(self):
+        messages = [b'line one', b'line two', b'line three']
+        tokens = gb.getMICMany(self.client_ctx, messages)
+
+        tokens.should_have_length(3)
+        for tok in tokens:
+            tok.should_be_a(bytes)
+            tok.shouldnt_be_empty()
+
+        tokens[2] = b'some invalid mic'
+        valid = gb.verifyMICMany(self.server_ctx, messages, tokens)
+
+        valid.should_be_a(bytearray)
+        list(valid).should_be([1, 1, 0])
+
+        (valid, codes) = gb.verifyMICMany(self.server_ctx, messages[:1],
+                                          tokens[:1], return_codes=True)
+        list(valid).should_be([1])
+        codes.should_have_length(1)
+
+        gb.verifyMICMany.should_raise(ValueError, self.server_ctx,
+                                      messages, tokens[:1])
+
+    def test_pickle_sec_context(self):
+        pickled = pickle.dumps(self.server_ctx)
+
+        # pickling moves the context out of the original object
+        pickle.dumps.should_raise(TypeError, self.server_ctx)
+        self.server_ctx = pickle.loads(pickled)
+
+        wrapped, _ = gb.wrap(self.client_ctx, b'test message')
+        gb.unwrap(self.server_ctx, wrapped)[0].should_be(b'test message')
+
+        copy.copy.should_raise(TypeError, self.server_ctx)
+
+    def test_message_calls_return_status(self):
+        (res, maj_stat, min_stat) = gb.wrap(self.client_ctx, b'test message',
+                                            return_status=True)
+        maj_stat.should_be(0)
+        (wrapped, conf) = res
+
+        (res, maj_stat, min_stat) = gb.unwrap(self.server_ctx, wrapped,
+                                              return_status=True)
+        maj_stat.should_be(0)
+        res[0].should_be(b'test message')
+
+        # a replayed token is flagged, but not an error
+        (res, maj_stat, min_stat) = gb.unwrap(self.server_ctx, wrapped,
+                                              return_status=True)
+        gb.isErrorStatus(maj_stat).should_be_false()
+        gb.supplementaryStatus(maj_stat).shouldnt_be_empty()
+
+        (res, maj_stat, min_stat) = gb.unwrap(self.server_ctx,
+                                              b'not a valid token',
+                                              return_status=True)
+        res.should_be_none()
+        gb.isErrorStatus(maj_stat).should_be_true()
+
+        (mic, maj_stat, min_stat) = gb.getMIC(self.client_ctx, b'message',
+                                              return_status=True)
+        maj_stat.should_be(0)
+
+        (qop, maj_stat, min_stat) = gb.verifyMIC(self.server_ctx, b'message',
+                                                 mic, return_status=True)
+        qop.should_be_an_integer()
+        maj_stat.should_be(0)
+
+        (qop, maj_stat, min_stat) = gb.verifyMIC(self.server_ctx, b'other',
+                                                 mic, return_status=True)
+        qop.should_be_none()
+        gb.isErrorStatus(maj_stat).should_be_true()
+
+    def test_wrap_unwrap_iov(self):
+        data = bytearray(b'some secret data')
+        sign_only = b'some header'
+
+        lengths = gb.wrapIOVLength(self.client_ctx,
+                                   [(gb.IOVBufferType.header, None),
+                                    (gb.IOVBufferType.sign_only,
+                                     len(sign_only)),
+                                    (gb.IOVBufferType.data, len(data)),
+                                    (gb.IOVBufferType.padding, None),
+                                    (gb.IOVBufferType.trailer, None)])
+
+        lengths.should_have_length(5)
+        lengths[0].should_be_greater_than(0)
+        lengths[2].should_be(len(data))
+
+        header = bytearray(lengths[0])
+        padding = bytearray(lengths[3])
+        trailer = bytearray(lengths[4])
+        buffers = [(gb.IOVBufferType.header, header),
+                   (gb.IOVBufferType.sign_only, sign_only),
+                   (gb.IOVBufferType.data, data),
+                   (gb.IOVBufferType.padding, padding),
+                   (gb.IOVBufferType.trailer, trailer)]
+
+        (conf, out_lengths) = gb.wrapIOV(self.client_ctx, buffers)
+
+        conf.should_be_true()
+        out_lengths.should_have_length(5)
+        data.shouldnt_be(bytearray(b'some secret data'))
+
+        (conf, qop) = gb.unwrapIOV(self.server_ctx, buffers)
+
+        conf.should_be_true()
+        qop.should_be_an_integer()
+        data.should_be(bytearray(b'some secret data'))
+
+        gb.wrapIOV.should_raise(BufferError, self.client_ctx,
+                                [(gb.IOVBufferType.data, b'read-only')])
+
+    def test_wrap_unwrap_aead(self):
+        header = b'some clear header'
+        (wrapped_message, conf) = gb.wrapAEAD(self.client_ctx, header,
+                                              b'test message')
+
+        conf.should_be_true()
+        wrapped_message.should_be_a(bytes)
+        wrapped_message.shouldnt_be_empty()
+
+        (unwrapped_message, conf, qop) = gb.unwrapAEAD(self.server_ctx,
+                                                       header,
+                                                       wrapped_message)
+
+        conf.should_be_true()
+        qop.should_be_an_integer()
+        unwrapped_message.should_be(b'test message')
+
+    def test_unwrap_aead_bad_assoc_data(self):
+        (wrapped_message, conf) = gb.wrapAEAD(self.client_ctx,
+                                              b'some clear header',
+                                              b'test message')
+
+        gb.unwrapAEAD.should_raise(gb.GSSError, self.server_ctx,
+                                   b'some other header', wrapped_message)
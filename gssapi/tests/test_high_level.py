@@ -0,0 +1,765 @@
+import io
+import os
+import pickle
+import socket
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+import should_be.all  # noqa
+from six.moves import queue
+
+import gssapi.base as gb
+from gssapi import acceptor_pool
+from gssapi import context_pool
+from gssapi import context_store
+from gssapi import context_table
+from gssapi import cred_cache
+from gssapi import cred_renewer
+from gssapi import name_cache
+from gssapi import sockets
+from gssapi import streams
+from gssapi import type_wrappers
+from gssapi.tests.test_base import _GSSAPIKerberosTestCase
+from gssapi.tests.test_base import SERVICE_PRINCIPAL, TARGET_SERVICE_NAME
+
+
+class _EstablishedContextTestCase(_GSSAPIKerberosTestCase):
+    def setUp(self):
+        self.target_name = gb.importName(TARGET_SERVICE_NAME)
+        ctx_resp = gb.initSecContext(self.target_name)
+
+        self.server_name = gb.importName(SERVICE_PRINCIPAL,
+                                         gb.NameType.principal)
+        self.server_creds = gb.acquireCred(self.server_name)[0]
+        server_resp = gb.acceptSecContext(ctx_resp[3],
+                                          acceptor_cred=self.server_creds)
+        self.server_ctx = server_resp[0]
+
+        client_resp2 = gb.initSecContext(self.target_name,
+                                         context=ctx_resp[0],
+                                         input_token=server_resp[3])
+        self.client_ctx = client_resp2[0]
+
+
+class TestStreams(_EstablishedContextTestCase):
+    def test_wrap_writer_unwrap_reader(self):
+        payload = b'some secret data ' * 1000
+        raw_out = io.BytesIO()
+
+        writer = streams.WrapWriter(raw_out, self.client_ctx,
+                                    max_token_size=1024)
+        writer.max_chunk_size.should_be_less_than(1024)
+
+        writer.write(payload[:10])
+        writer.write(payload[10:])
+
+        wrapped = raw_out.getvalue()
+        wrapped.shouldnt_include(b'some secret data')
+
+        reader = io.BufferedReader(
+            streams.UnwrapReader(io.BytesIO(wrapped), self.server_ctx,
+                                 max_token_size=1024))
+
+        reader.read(10).should_be(payload[:10])
+        reader.read().should_be(payload[10:])
+
+    def test_unwrap_reader_rejects_oversized_records(self):
+        raw_out = io.BytesIO()
+        writer = streams.WrapWriter(raw_out, self.client_ctx)
+        writer.write(b'x' * 4096)
+
+        reader = streams.UnwrapReader(io.BytesIO(raw_out.getvalue()),
+                                      self.server_ctx, max_token_size=512)
+        reader.read.should_raise(IOError)
+
+
+class TestGSSSocket(_EstablishedContextTestCase):
+    def setUp(self):
+        super(TestGSSSocket, self).setUp()
+        client_sock, server_sock = socket.socketpair()
+        self.client = sockets.GSSSocket(client_sock, self.client_ctx)
+        self.server = sockets.GSSSocket(server_sock, self.server_ctx)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.close()
+
+    def test_sendall_recv(self):
+        self.client.sendall(b'some secret data')
+        self.server.recv(1024).should_be(b'some secret data')
+
+        self.server.sendall(bytearray(b'a reply'))
+        buff = bytearray(4)
+        self.client.recv_into(buff).should_be(4)
+        buff.should_be(bytearray(b'a re'))
+        self.client.recv(1024).should_be(b'ply')
+
+    def test_makefile_coalesces_writes(self):
+        writer = self.client.makefile('wb')
+        for i in range(10):
+            writer.write(b'x')
+        writer.flush()
+
+        # all ten writes should have been sent as a single record
+        self.server.recv(1024).should_be(b'x' * 10)
+
+    def test_recv_after_close(self):
+        self.client.close()
+        self.server.recv(1024).should_be(b'')
+
+
+@unittest.skipIf(sys.version_info < (3, 7), 'asyncio support requires 3.7+')
+class TestAsyncIO(_GSSAPIKerberosTestCase):
+    def setUp(self):
+        import asyncio
+        from gssapi import aio
+
+        self.asyncio = asyncio
+        self.aio = aio
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_handshake_and_wrap(self):
+        target_name = gb.importName(TARGET_SERVICE_NAME)
+        server_name = gb.importName(SERVICE_PRINCIPAL, gb.NameType.principal)
+
+        server_creds = self.loop.run_until_complete(
+            self.aio.acquireCred(server_name, cred_usage='accept'))[0]
+        server_creds.should_be_a(gb.Creds)
+
+        client_resp = self.loop.run_until_complete(
+            self.aio.initSecContext(target_name))
+        server_resp = self.loop.run_until_complete(
+            self.aio.acceptSecContext(client_resp[3],
+                                      acceptor_cred=server_creds))
+        client_resp = self.loop.run_until_complete(
+            self.aio.initSecContext(target_name, context=client_resp[0],
+                                    input_token=server_resp[3]))
+
+        wrapped, _ = self.loop.run_until_complete(
+            self.aio.wrap(client_resp[0], b'test message'))
+        unwrapped, _, _ = self.loop.run_until_complete(
+            self.aio.unwrap(server_resp[0], wrapped))
+
+        unwrapped.should_be(b'test message')
+
+    def test_cancel_after_call_finishes(self):
+        finish = threading.Event()
+        released = []
+        call = self.aio._BlockingCall(released.append, finish.wait)
+
+        task = self.asyncio.ensure_future(call, loop=self.loop)
+        self.loop.run_until_complete(self.asyncio.sleep(0))
+
+        # cancel once the call is done, but before the task resumes
+        call._future.add_done_callback(lambda future: task.cancel())
+        finish.set()
+        self.loop.run_until_complete.should_raise(
+            self.asyncio.CancelledError, task)
+
+        self.loop.run_until_complete(self.asyncio.sleep(0))
+        released.should_be([True])
+
+    def test_await_twice(self):
+        calls = []
+        call = self.aio._BlockingCall(None, lambda: calls.append(1) or 42)
+
+        self.loop.run_until_complete(call).should_be(42)
+        self.loop.run_until_complete(call).should_be(42)
+        calls.should_have_length(1)
+
+
+class TestAcceptorPool(_GSSAPIKerberosTestCase):
+    def setUp(self):
+        self.target_name = gb.importName(TARGET_SERVICE_NAME)
+        server_name = gb.importName(SERVICE_PRINCIPAL, gb.NameType.principal)
+        self.server_creds = gb.acquireCred(server_name,
+                                           cred_usage='accept')[0]
+
+    def test_accept(self):
+        tokens = [gb.initSecContext(self.target_name)[3] for i in range(8)]
+
+        with acceptor_pool.AcceptorPool(self.server_creds,
+                                        workers=4) as pool:
+            futures = [pool.submit(token) for token in tokens]
+            for future in futures:
+                server_resp = future.result()
+                server_resp[0].should_be_a(gb.SecurityContext)
+                server_resp[3].shouldnt_be_empty()
+
+            pool.accept.should_raise(gb.GSSError, b'not a valid token')
+
+            stats = pool.stats()
+            stats['completed'].should_be(8)
+            stats['failed'].should_be(1)
+            stats['in_flight'].should_be(0)
+
+    def test_submit_racing_close(self):
+        pool = acceptor_pool.AcceptorPool(self.server_creds, workers=2)
+        futures = []
+
+        def submit():
+            while True:
+                try:
+                    futures.append(pool.submit(b'not a valid token'))
+                except RuntimeError:
+                    return
+                except queue.Full:
+                    pass
+
+        submitter = threading.Thread(target=submit)
+        submitter.start()
+        time.sleep(0.05)
+        pool.close()
+        submitter.join()
+
+        # everything queued before the pool closed is still processed
+        for future in futures:
+            future.exception(timeout=5).should_be_a(gb.GSSError)
+
+        pool.submit.should_raise(RuntimeError, b'not a valid token')
+
+
+class TestCredentialCache(_GSSAPIKerberosTestCase):
+    def setUp(self):
+        self.server_name = gb.importName(SERVICE_PRINCIPAL,
+                                         gb.NameType.principal)
+
+    def test_acquire_caches(self):
+        cache = cred_cache.CredentialCache(refresh_margin=0)
+
+        creds = cache.acquire(self.server_name, cred_usage='accept')
+        creds.should_be_a(gb.Creds)
+
+        cache.acquire(self.server_name, cred_usage='accept').should_be(creds)
+        cache.acquire(self.server_name,
+                      cred_usage='initiate').shouldnt_be(creds)
+
+        cache.hits.should_be(1)
+        cache.misses.should_be(2)
+
+        cache.invalidate(self.server_name, cred_usage='accept')
+        cache.acquire(self.server_name,
+                      cred_usage='accept').shouldnt_be(creds)
+
+    def test_acquire_refreshes_before_expiry(self):
+        cache = cred_cache.CredentialCache(refresh_margin=10 ** 9)
+
+        creds = cache.acquire(self.server_name, cred_usage='initiate')
+        cache.acquire(self.server_name,
+                      cred_usage='initiate').shouldnt_be(creds)
+        cache.misses.should_be(2)
+
+    def test_concurrent_misses_are_coalesced(self):
+        cache = cred_cache.CredentialCache(refresh_margin=0)
+        real_acquire = cache._acquire
+        calls = []
+
+        def slow_acquire(*args):
+            calls.append(args)
+            time.sleep(0.2)
+            return real_acquire(*args)
+
+        cache._acquire = slow_acquire
+
+        results = []
+        threads = [threading.Thread(
+            target=lambda: results.append(cache.acquire(self.server_name)))
+            for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        calls.should_have_length(1)
+        results.should_have_length(8)
+        for creds in results:
+            creds.should_be(results[0])
+
+
+class TestCredentialRenewer(_GSSAPIKerberosTestCase):
+    def setUp(self):
+        self.server_name = gb.importName(SERVICE_PRINCIPAL,
+                                         gb.NameType.principal)
+
+    def test_register_and_renew(self):
+        with cred_renewer.CredentialRenewer() as renewer:
+            handle = renewer.register(self.server_name,
+                                      cred_usage='initiate')
+            handle.creds.should_be_a(type_wrappers.GSSCredentials)
+            len(renewer).should_be(1)
+
+            old_creds = handle.creds
+            renewer.renew(handle)
+            handle.creds.shouldnt_be(old_creds)
+            handle.renewals.should_be(1)
+
+            renewer.unregister(handle)
+            len(renewer).should_be(0)
+
+    def test_renews_in_background(self):
+        # with a huge margin, the credentials are always due for renewal
+        renewer = cred_renewer.CredentialRenewer(refresh_margin=10 ** 9,
+                                                 retry_interval=0.05)
+        with renewer:
+            handle = renewer.register(self.server_name,
+                                      cred_usage='initiate')
+
+            deadline = time.time() + 5
+            while handle.renewals < 2 and time.time() < deadline:
+                time.sleep(0.01)
+
+            handle.renewals.should_be_greater_than(1)
+            handle.last_error.should_be_none()
+
+
+class TestNameCache(_GSSAPIKerberosTestCase):
+    def test_import_name(self):
+        cache = name_cache.NameCache()
+
+        name1 = cache.import_name(TARGET_SERVICE_NAME)
+        name2 = cache.import_name(TARGET_SERVICE_NAME.decode('utf-8'))
+
+        name1.should_be_a(gb.Name)
+        name1.shouldnt_be(name2)
+        gb.compareName(name1, name2).should_be_true()
+
+        cache.hits.should_be(1)
+        cache.misses.should_be(1)
+
+        # the caller owns the returned copies
+        gb.releaseName(name1)
+        gb.displayName(cache.import_name(TARGET_SERVICE_NAME))[0].should_be(
+            TARGET_SERVICE_NAME)
+
+    def test_import_name_canonicalized(self):
+        cache = name_cache.NameCache()
+
+        name = cache.import_name(SERVICE_PRINCIPAL, gb.NameType.principal,
+                                 mech=gb.MechType.kerberos)
+        gb.exportName(name).shouldnt_be_empty()
+
+    def test_evicts_least_recently_used(self):
+        cache = name_cache.NameCache(max_size=2)
+
+        cache.import_name(b'host')
+        cache.import_name(b'HTTP')
+        cache.import_name(b'host')
+        cache.import_name(b'ldap')
+
+        len(cache).should_be(2)
+        cache.import_name(b'host')
+        cache.hits.should_be(2)
+        cache.import_name(b'HTTP')
+        cache.misses.should_be(4)
+
+
+class TestTypeWrappers(_GSSAPIKerberosTestCase):
+    def test_accept_new_wraps_lazily(self):
+        target_name = gb.importName(TARGET_SERVICE_NAME)
+        client_token = gb.initSecContext(target_name)[3]
+
+        ctx = type_wrappers.GSSContext.accept_new(client_token)
+
+        ctx._initiator_name.shouldnt_be_a(type_wrappers.GSSName)
+        ctx.initiator_name.should_be_a(type_wrappers.GSSName)
+        ctx.initiator_name.should_be(ctx.initiator_name)
+        ctx.initiator_name.name.should_be(
+            SERVICE_PRINCIPAL.decode('utf-8') + '@' + self.realm.realm)
+
+        # no delegation was requested
+        ctx.delegated_credentials.should_be_none()
+
+    def test_credentials_inquired_lazily(self):
+        server_name = gb.importName(SERVICE_PRINCIPAL, gb.NameType.principal)
+        base_creds = gb.acquireCred(server_name, cred_usage='initiate')[0]
+        creds = type_wrappers.GSSCredentials(base_creds)
+
+        creds.ttl.should_be_an_integer()
+        creds.mechs.should_include(gb.MechType.kerberos)
+        creds.lifetime.should_be_less_than(creds.ttl + 1)
+
+    def test_name_displayed_lazily(self):
+        base_name = gb.importName(TARGET_SERVICE_NAME)
+        name = type_wrappers.GSSName(base_name=base_name)
+
+        name._name.should_be_none()
+        name.name.should_be(TARGET_SERVICE_NAME.decode('utf-8'))
+        name.name_type.should_be(gb.NameType.hostbased_service)
+
+    def test_pickle_context(self):
+        target_name = gb.importName(TARGET_SERVICE_NAME)
+        client_token = gb.initSecContext(target_name)[3]
+        ctx = type_wrappers.GSSContext.accept_new(client_token)
+
+        unpickled_ctx = pickle.loads(pickle.dumps(ctx))
+        unpickled_ctx.should_be_a(type_wrappers.GSSContext)
+        unpickled_ctx.mech_type.should_be(ctx.mech_type)
+        unpickled_ctx.flags.should_be(ctx.flags)
+        unpickled_ctx.ttl.should_be(ctx.ttl)
+        unpickled_ctx.continue_needed.should_be(ctx.continue_needed)
+        unpickled_ctx.initiator_name.should_be(ctx.initiator_name)
+        gb.contextTime(unpickled_ctx).should_be_greater_than(0)
+
+    def test_pickle_credentials(self):
+        server_name = gb.importName(SERVICE_PRINCIPAL, gb.NameType.principal)
+        creds = type_wrappers.GSSCredentials.acquire(server_name)
+
+        unpickled_creds = pickle.loads(pickle.dumps(creds))
+        unpickled_creds.should_be_a(type_wrappers.GSSCredentials)
+        unpickled_creds.ttl.should_be(creds.ttl)
+        unpickled_creds.mechs.should_be(creds.mechs)
+
+
+class _ClosingConnection(object):
+    # wraps a socket, recording whether it has been closed
+    def __init__(self, sock):
+        self.sock = sock
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+        self.sock.close()
+
+    def __getattr__(self, attr):
+        return getattr(self.sock, attr)
+
+
+class TestContextPool(_GSSAPIKerberosTestCase):
+    def setUp(self):
+        self.target_name = gb.importName(TARGET_SERVICE_NAME)
+        server_name = gb.importName(SERVICE_PRINCIPAL, gb.NameType.principal)
+        self.server_creds = gb.acquireCred(server_name,
+                                           cred_usage='accept')[0]
+        self.server_socks = []
+
+    def tearDown(self):
+        for sock in self.server_socks:
+            sock.close()
+
+    def _serve(self, sock):
+        ctx = None
+        continue_needed = True
+        while continue_needed:
+            token = context_pool.recv_token(sock)
+            ctx_resp = gb.acceptSecContext(token, context=ctx,
+                                           acceptor_cred=self.server_creds)
+            ctx = ctx_resp[0]
+            continue_needed = ctx_resp[7]
+            if ctx_resp[3]:
+                context_pool.send_token(sock, ctx_resp[3])
+
+    def _connect(self, target_name):
+        client_sock, server_sock = socket.socketpair()
+        self.server_socks.append(server_sock)
+
+        server = threading.Thread(target=self._serve, args=(server_sock,))
+        server.daemon = True
+        server.start()
+
+        return client_sock
+
+    def test_acquire_reuses_contexts(self):
+        with context_pool.ContextPool(self._connect) as pool:
+            pooled = pool.acquire(self.target_name)
+            pooled.context.should_be_a(gb.SecurityContext)
+            pooled.remaining_time().should_be_greater_than(0)
+            pool.misses.should_be(1)
+
+            pool.release(pooled)
+            len(pool).should_be(1)
+
+            with pool.context(self.target_name) as reused:
+                reused.should_be(pooled)
+            pool.hits.should_be(1)
+
+            # different flags get a different context
+            flags = [gb.RequirementFlag.mutual_authentication]
+            pool.acquire(self.target_name, flags=flags).shouldnt_be(pooled)
+            pool.misses.should_be(2)
+
+    def test_expiring_contexts_are_not_reused(self):
+        def connect(target_name):
+            return _ClosingConnection(self._connect(target_name))
+
+        pool = context_pool.ContextPool(connect, refresh_margin=10 ** 9)
+        with pool:
+            pooled = pool.acquire(self.target_name)
+            pooled.connection.closed.should_be_false()
+
+            pool.release(pooled)
+            len(pool).should_be(0)
+            pooled.connection.closed.should_be_true()
+
+    def test_release_after_close(self):
+        def connect(target_name):
+            return _ClosingConnection(self._connect(target_name))
+
+        pool = context_pool.ContextPool(connect)
+        pooled = pool.acquire(self.target_name)
+        pool.close()
+
+        pool.release(pooled)
+        len(pool).should_be(0)
+        pooled.connection.closed.should_be_true()
+        pool.acquire.should_raise(RuntimeError, self.target_name)
+
+    def test_expiring_idle_contexts_are_replaced(self):
+        # maintenance is run by hand, and considers every context to be
+        # expiring before the next check
+        pool = context_pool.ContextPool(self._connect, refresh_margin=0,
+                                        check_interval=10 ** 6)
+        with pool:
+            pooled = pool.acquire(self.target_name)
+            pooled.remaining_time = lambda: 1
+            pool.release(pooled)
+
+            pool._maintain()
+            len(pool).should_be(1)
+
+            replacement = pool.acquire(self.target_name)
+            replacement.shouldnt_be(pooled)
+            replacement.remaining_time().should_be_greater_than(1)
+            pool.misses.should_be(1)
+
+            # a replacement using the same ticket wouldn't live any longer
+            pool.release(replacement)
+            pool._maintain()
+            len(pool).should_be(0)
+
+    def test_idle_contexts_are_evicted(self):
+        pool = context_pool.ContextPool(self._connect, idle_timeout=0,
+                                        check_interval=0.05)
+        with pool:
+            pool.release(pool.acquire(self.target_name))
+
+            deadline = time.time() + 5
+            while len(pool) and time.time() < deadline:
+                time.sleep(0.01)
+
+            len(pool).should_be(0)
+
+
+class TestContextTable(_GSSAPIKerberosTestCase):
+    def setUp(self):
+        self.target_name = gb.importName(TARGET_SERVICE_NAME)
+        server_name = gb.importName(SERVICE_PRINCIPAL, gb.NameType.principal)
+        self.server_creds = gb.acquireCred(server_name,
+                                           cred_usage='accept')[0]
+
+    def _establish(self, table, session_id, flags=None):
+        client_resp = gb.initSecContext(self.target_name, flags=flags)
+        server_resp = table.accept(session_id, client_resp[3],
+                                   acceptor_cred=self.server_creds)
+        gb.initSecContext(self.target_name, context=client_resp[0],
+                          input_token=server_resp[3])
+        return client_resp[0]
+
+    def test_accept_and_use(self):
+        table = context_table.ContextTable()
+        client_ctx = self._establish(table, 'session')
+
+        with table.lease('session') as server_ctx:
+            server_ctx.should_be_a(gb.SecurityContext)
+        table.entry('session').established.should_be_true()
+
+        wrapped = gb.wrap(client_ctx, b'test message')[0]
+        table.unwrap('session', wrapped)[0].should_be(b'test message')
+        table.wrap.should_raise(KeyError, 'other', b'test message')
+
+        table.entry('session').bytes_processed.should_be_greater_than(
+            len(wrapped))
+
+        table.remove('session').should_be_true()
+        table.entry('session').should_be_none()
+
+    def test_failed_handshakes_are_removed(self):
+        table = context_table.ContextTable()
+        self._establish(table, 'session')
+
+        table.accept.should_raise(gb.GSSError, 'session',
+                                  b'not a valid token')
+        len(table).should_be(0)
+
+    def test_lru_eviction(self):
+        table = context_table.ContextTable(max_contexts=2, shards=1)
+        for session_id in ('a', 'b'):
+            self._establish(table, session_id)
+
+        with table.lease('a'):
+            pass
+        self._establish(table, 'c')
+
+        ('a' in table).should_be_true()
+        ('b' in table).should_be_false()
+        ('c' in table).should_be_true()
+        table.stats()['evicted'].should_be(1)
+
+    def test_eviction_while_unwrapping(self):
+        # each new session evicts an older one, which may be in use
+        table = context_table.ContextTable(max_contexts=2, shards=1)
+        sessions = []
+        errors = []
+        done = threading.Event()
+
+        def unwrap_recent(thread_num):
+            # contexts may not be shared between threads, so each thread
+            # only uses its own sessions
+            try:
+                while not done.is_set():
+                    for i, session_id, wrapped in list(sessions[-8:]):
+                        if i % len(threads) != thread_num:
+                            continue
+
+                        try:
+                            msg = table.unwrap(session_id, wrapped)[0]
+                        except KeyError:
+                            continue  # already evicted
+                        msg.should_be(b'test message')
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=unwrap_recent, args=(i,))
+                   for i in range(4)]
+        for thread in threads:
+            thread.start()
+
+        try:
+            # without replay detection, tokens may be unwrapped repeatedly
+            flags = [gb.RequirementFlag.mutual_authentication,
+                     gb.RequirementFlag.confidentiality,
+                     gb.RequirementFlag.integrity]
+            for i in range(50):
+                session_id = 'session-{0}'.format(i)
+                client_ctx = self._establish(table, session_id, flags)
+                wrapped = gb.wrap(client_ctx, b'test message')[0]
+                sessions.append((i, session_id, wrapped))
+        finally:
+            done.set()
+            for thread in threads:
+                thread.join()
+
+        errors.should_be_empty()
+        len(table).should_be(2)
+        table.stats()['evicted'].should_be(48)
+
+    def _accept_during(self, table, session_id, during):
+        # store a half-finished handshake for the session, and then
+        # accept a new token for it, calling during() in the middle of
+        # acceptSecContext
+        client_token = gb.initSecContext(self.target_name)[3]
+        table.put(session_id, gb.acceptSecContext(
+            client_token, acceptor_cred=self.server_creds)[0],
+            established=False)
+
+        class _InterruptedGSS(object):
+            def __getattr__(self, attr):
+                return getattr(gb, attr)
+
+            def acceptSecContext(self, input_token, context=None, **kwargs):
+                during()
+                return gb.acceptSecContext(input_token, **kwargs)
+
+        real_gss = context_table.gss
+        context_table.gss = _InterruptedGSS()
+        try:
+            client_token = gb.initSecContext(self.target_name)[3]
+            return table.accept(session_id, client_token,
+                                acceptor_cred=self.server_creds)
+        finally:
+            context_table.gss = real_gss
+
+    def test_removal_during_accept(self):
+        table = context_table.ContextTable()
+
+        self._accept_during.should_raise(KeyError, table, 'session',
+                                         lambda: table.remove('session'))
+        ('session' in table).should_be_false()
+
+    def test_eviction_during_accept(self):
+        table = context_table.ContextTable(max_contexts=1, shards=1)
+        client_token = gb.initSecContext(self.target_name)[3]
+        other_ctx = gb.acceptSecContext(
+            client_token, acceptor_cred=self.server_creds)[0]
+
+        self._accept_during(table, 'session',
+                            lambda: table.put('other', other_ctx))
+
+        # the evicted handshake is stored again, evicting the other one
+        ('session' in table).should_be_true()
+        ('other' in table).should_be_false()
+        table.stats()['evicted'].should_be(2)
+
+    def test_evict_expired(self):
+        table = context_table.ContextTable(handshake_timeout=10)
+        self._establish(table, 'established')
+        client_token = gb.initSecContext(self.target_name)[3]
+        table.put('handshake', gb.acceptSecContext(
+            client_token, acceptor_cred=self.server_creds)[0],
+            established=False)
+
+        stats = table.stats()
+        stats['contexts'].should_be(2)
+        stats['handshakes'].should_be(1)
+
+        real_now = context_table._now
+        context_table._now = lambda: real_now() + 20
+        try:
+            table.evict_expired().should_be(1)
+            ('handshake' in table).should_be_false()
+            with table.lease('established') as server_ctx:
+                server_ctx.should_be_a(gb.SecurityContext)
+        finally:
+            context_table._now = real_now
+
+
+class TestContextStore(_EstablishedContextTestCase):
+    def setUp(self):
+        super(TestContextStore, self).setUp()
+        self.tmpdir = tempfile.mkdtemp()
+        self.store = context_store.ContextStore(
+            os.path.join(self.tmpdir, 'contexts.db'))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_put_take(self):
+        self.store.put('session', self.server_ctx).should_be_true()
+        len(self.store).should_be(1)
+
+        # another "worker" opening the same file takes over the context
+        other_store = context_store.ContextStore(self.store.path)
+        server_ctx = other_store.take('session')
+        server_ctx.should_be_a(gb.SecurityContext)
+        len(self.store).should_be(0)
+
+        wrapped, _ = gb.wrap(self.client_ctx, b'test message')
+        gb.unwrap(server_ctx, wrapped)[0].should_be(b'test message')
+
+        self.store.take('session').should_be_none()
+
+    def test_put_deleted_context(self):
+        ctx = gb.initSecContext(self.target_name)[0]
+        gb.deleteSecContext(ctx)
+
+        self.store.put('session', ctx).should_be_false()
+        len(self.store).should_be(0)
+
+    def test_evict_expired(self):
+        self.store.put('server', self.server_ctx, ttl=10).should_be_true()
+        self.store.put('client', self.client_ctx, ttl=100).should_be_true()
+
+        real_now = context_store._now
+        context_store._now = lambda: real_now() + 20
+        try:
+            self.store.evict_expired().should_be(1)
+            self.store.take('server').should_be_none()
+            self.store.take('client').should_be_a(gb.SecurityContext)
+        finally:
+            context_store._now = real_now
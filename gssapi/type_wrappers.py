@@ -1,6 +1,28 @@
 import six
 
 import gssapi.base as gss
+from gssapi import name_cache
+
+
+_UNKNOWN = object()
+
+
+def _rebuild_name(cls, func, args):
+    return cls(base_name=func(*args))
+
+
+def _rebuild_creds(cls, func, args, ttl, mechs):
+    res = cls(func(*args))
+    res.ttl = ttl
+    res.mechs = mechs
+    return res
+
+
+def _rebuild_context(cls, func, args, mech_type, token, flags, ttl,
+                     continue_needed, delegated_credentials, initiator_name):
+    return cls(func(*args), mech_type, token, flags, ttl, continue_needed,
+               delegated_credentials=delegated_credentials,
+               initiator_name=initiator_name)
 
 
 class GSSContext(gss.SecurityContext):
@@ -18,6 +40,55 @@ class GSSContext(gss.SecurityContext):
         self.delegated_credentials = delegated_credentials
         self.continue_needed = continue_needed
 
+    def __reduce__(self):
+        func, args = super(GSSContext, self).__reduce__()
+        return (_rebuild_context, (type(self), func, args, self.mech_type,
+                                   self.token, self.flags, self.ttl,
+                                   self.continue_needed,
+                                   self.delegated_credentials,
+                                   self._initiator_name))
+
+    # the initiator name and delegated credentials are stored as returned
+    # by acceptSecContext, and only wrapped when first accessed, so that
+    # accepting a context does not make any extra GSSAPI calls
+
+    @property
+    def initiator_name(self):
+        """The name of the initiator (as a :class:`GSSName`), if known"""
+        if (self._initiator_name is not None and
+                not isinstance(self._initiator_name, GSSName)):
+            self._initiator_name = GSSName(base_name=self._initiator_name)
+
+        return self._initiator_name
+
+    @initiator_name.setter
+    def initiator_name(self, value):
+        self._initiator_name = value
+
+    @property
+    def delegated_credentials(self):
+        """
+        The credentials delegated by the initiator
+
+        This is None unless the initiator requested delegation.
+        """
+        creds = self._delegated_credentials
+        if creds is None or isinstance(creds, GSSCredentials):
+            return creds
+
+        if (self.flags is None or
+                gss.RequirementFlag.delegate_to_peer not in self.flags):
+            # no credentials were delegated, so don't bother wrapping them
+            self._delegated_credentials = None
+        else:
+            self._delegated_credentials = GSSCredentials(creds)
+
+        return self._delegated_credentials
+
+    @delegated_credentials.setter
+    def delegated_credentials(self, value):
+        self._delegated_credentials = value
+
     def accept(self, *args, **kwargs):
         """
         Accept updates to a security context
@@ -26,12 +97,12 @@ class GSSContext(gss.SecurityContext):
         updates the current context in-place
         """
         res = gss.acceptSecContext(*args, context=self, **kwargs)
-        self.initiator_name = GSSName(base_name=res[1])
+        self.initiator_name = res[1]
         self.mech_type = res[2]
         self.token = res[3]
         self.flags = res[4]
         self.ttl = res[5]
-        self.delegated_credentials = GSSCredentials(res[6])
+        self.delegated_credentials = res[6]
         self.continue_needed = res[7]
 
         return self
@@ -75,12 +146,12 @@ class GSSContext(gss.SecurityContext):
                                     context=context)
 
         return GSSContext(resp[0],
-                          initiator_name=GSSName(base_name=resp[1]),
+                          initiator_name=resp[1],
                           mech_type=resp[2],
                           token=resp[3],
                           flags=resp[4],
                           ttl=resp[5],
-                          delegated_credentials=GSSCredentials(resp[6]),
+                          delegated_credentials=resp[6],
                           continue_needed=resp[7])
 
     @classmethod
@@ -108,10 +179,60 @@ class GSSCredentials(gss.Creds):
         return super(GSSCredentials, cls).__new__(cls, base_creds)
 
     def __init__(self, base_creds):
-        # TODO(sross): use introspection methods
-        #              to discover these
-        self.ttl = 0
-        self.mechs = None
+        # the lifetime and mechanisms are looked up on first access,
+        # unless already known (e.g. from acquireCred)
+        self._ttl = _UNKNOWN
+        self._mechs = _UNKNOWN
+
+    def _inquire(self):
+        _, ttl, _, mechs = gss.inquireCred(self, name=False,
+                                           cred_usage=False)
+        if self._ttl is _UNKNOWN:
+            self._ttl = ttl
+        if self._mechs is _UNKNOWN:
+            self._mechs = mechs
+
+    @property
+    def ttl(self):
+        """
+        The lifetime of the credentials when they were obtained
+
+        (or None for indefinite)
+        """
+        if self._ttl is _UNKNOWN:
+            self._inquire()
+        return self._ttl
+
+    @ttl.setter
+    def ttl(self, value):
+        self._ttl = value
+
+    @property
+    def mechs(self):
+        """The mechanisms with which the credentials may be used"""
+        if self._mechs is _UNKNOWN:
+            self._inquire()
+        return self._mechs
+
+    @mechs.setter
+    def mechs(self, value):
+        self._mechs = value
+
+    @property
+    def lifetime(self):
+        """
+        The current remaining lifetime of the credentials
+
+        (or None for indefinite).  Unlike :attr:`ttl`, this is looked
+        up each time it is accessed.
+        """
+        return gss.inquireCred(self, name=False, cred_usage=False,
+                               mechs=False)[1]
+
+    def __reduce__(self):
+        func, args = super(GSSCredentials, self).__reduce__()
+        return (_rebuild_creds, (type(self), func, args,
+                                 self.ttl, self.mechs))
 
     def impersonate(self, *args, **kwargs):
         """
@@ -166,6 +287,10 @@ class GSSCredentials(gss.Creds):
 
         :param usage: the cred usage
         :type usage: 'both', 'initiate', 'accept'
+        :param store: the credential store from which to acquire the
+                      credentials (e.g. {'ccache': 'MEMORY:tenant1'}),
+                      instead of the default keytab and credentials cache
+        :type store: dict or None
         :returns: the acquired credentials
         :rtype: GSSCredentials
         """
@@ -192,7 +317,7 @@ class GSSName(gss.Name):
     def __new__(cls, name=None, name_type=gss.NameType.hostbased_service,
                 base_name=None):
         if base_name is None:
-            base_res = gss.importName(name.encode('utf-8'), name_type)
+            base_res = name_cache.import_name(name, name_type)
         else:
             base_res = base_name
 
@@ -211,12 +336,39 @@ class GSSName(gss.Name):
         """
 
         if base_name is not None and (name is None):
-            displ_resp = gss.displayName(self)
-            self.name_type = displ_resp[1]
-            self.name = displ_resp[0].decode('utf-8')
-
-        self.name_type = name_type
-        self.name = name
+            # the name and type are looked up on first access
+            self._name = None
+            self._name_type = None
+        else:
+            self._name = name
+            self._name_type = name_type
+
+    def _display(self):
+        name, name_type = gss.displayName(self)
+        self._name = name.decode('utf-8')
+        self._name_type = name_type
+
+    @property
+    def name(self):
+        """The string part of the name"""
+        if self._name is None:
+            self._display()
+        return self._name
+
+    @name.setter
+    def name(self, value):
+        self._name = value
+
+    @property
+    def name_type(self):
+        """The type of the name"""
+        if self._name_type is None:
+            self._display()
+        return self._name_type
+
+    @name_type.setter
+    def name_type(self, value):
+        self._name_type = value
 
     # del isn't needed, because __dealloc__ takes care of it for us
 
@@ -260,6 +412,13 @@ class GSSName(gss.Name):
     def __eq__(self, target):
         return gss.compareName(self.capsule, target.capsule)
 
+    def __reduce__(self):
+        func, args = super(GSSName, self).__reduce__()
+        return (_rebuild_name, (type(self), func, args))
+
     def __deepcopy__(self, memo):
         cpy = gss.duplicateName(self)
-        return type(self)(self.name, self.name_type, base_name=cpy)
+        res = type(self)(base_name=cpy)
+        res._name = self._name
+        res._name_type = self._name_type
+        return res
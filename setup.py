@@ -48,6 +48,33 @@ ext_module_s4u = Extension(
     ]
 )
 
+ext_module_dce = Extension(
+    'gssapi.base.dce',
+    extra_link_args = get_output('krb5-config --libs gssapi').split(),
+    extra_compile_args = get_output('krb5-config --cflags gssapi').split(),
+    sources = [
+        'gssapi/base/dce.pyx',
+    ]
+)
+
+ext_module_cred_imp_exp = Extension(
+    'gssapi.base.cred_imp_exp',
+    extra_link_args = get_output('krb5-config --libs gssapi').split(),
+    extra_compile_args = get_output('krb5-config --cflags gssapi').split(),
+    sources = [
+        'gssapi/base/cred_imp_exp.pyx',
+    ]
+)
+
+ext_module_cred_store = Extension(
+    'gssapi.base.cred_store',
+    extra_link_args = get_output('krb5-config --libs gssapi').split(),
+    extra_compile_args = get_output('krb5-config --cflags gssapi').split(),
+    sources = [
+        'gssapi/base/cred_store.pyx',
+    ]
+)
+
 ext_module_names = Extension(
     'gssapi.base.names',
     extra_link_args = get_output('krb5-config --libs gssapi').split(),
@@ -88,6 +115,15 @@ ext_module_message = Extension(
     ]
 )
 
+ext_module_buffers = Extension(
+    'gssapi.base.buffers',
+    extra_link_args = get_output('krb5-config --libs gssapi').split(),
+    extra_compile_args = get_output('krb5-config --cflags gssapi').split(),
+    sources = [
+        'gssapi/base/buffers.pyx',
+    ]
+)
+
 ext_module_cython_converters = Extension(
     'gssapi.base.cython_converters',
     extra_link_args = get_output('krb5-config --libs gssapi').split(),
@@ -103,6 +139,15 @@ long_desc = re.sub('\.\. role:: \w+\(code\)\s*\n\s*.+', '',
                           re.sub(r'\.\. code-block:: \w+', '::',
                                  open('README.txt').read())))
 
+install_requires = [
+    'flufl.enum >= 4.0'
+]
+
+# concurrent.futures (used by gssapi.acceptor_pool) is only in the
+# standard library as of Python 3.2
+if sys.version_info < (3, 2):
+    install_requires.append('futures')
+
 setup(
     name='PyGSSAPI',
     version='1.0.0',
@@ -134,11 +179,13 @@ setup(
         ext_module_types,
         ext_module_message,
         ext_module_cython_converters,
+        ext_module_buffers,
         ext_module_s4u,
+        ext_module_dce,
+        ext_module_cred_imp_exp,
+        ext_module_cred_store,
     ],
-    install_requires=[
-        'flufl.enum >= 4.0'
-    ],
+    install_requires=install_requires,
     tests_require=[
         'tox'
     ]